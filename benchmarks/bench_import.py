@@ -0,0 +1,111 @@
+"""
+批量导入基准
+
+对学生、课程和成绩的合成导入数据，分别测量单进程校验和进程池并行校验的耗时，
+并在临时数据库上测量完整的控制器导入(校验 + 单线程写入)。
+
+用法:
+    python benchmarks/bench_import.py [--rows 10000,100000] [--workers 4] [--json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import logging
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import DATABASE_CONFIG, IMPORT_VALIDATION_WORKERS
+from models.database import Database
+from models.user import User
+from controllers.lazy_controllers import LazyControllers
+from utils import import_validation
+
+# 每生成多少行放入一行校验失败的数据
+INVALID_EVERY = 50
+
+def generate_rows(count):
+    """
+    生成导入数据，学生和成绩各 count 行，课程 count/100 行
+    
+    返回:
+        dict: {导入类型: 行数据列表}
+    """
+    course_count = max(count // 100, 1)
+    students = []
+    for index in range(count):
+        students.append({
+            'student_id': f"B{index:08d}" if index % INVALID_EVERY else f"B-{index}",
+            'name': f"学生{index}",
+            'gender': '男' if index % 2 else '女',
+            'class_name': f"班级{index % 40}",
+            'email': f"s{index}@example.com",
+            'contact_phone': f"138{index:08d}"
+        })
+    courses = [{'course_id': f"BC{index:05d}", 'course_name': f"课程{index}", 'credit': '3', 'teacher': '王老师'}
+               for index in range(course_count)]
+    grades = []
+    for index in range(count):
+        grades.append({
+            'student_id': f"B{index:08d}",
+            'course_id': f"BC{index % course_count:05d}",
+            'semester': '2030-2031-1',
+            'score': str(index % 101) if index % INVALID_EVERY else 'abc'
+        })
+    return {'students': students, 'courses': courses, 'grades': grades}
+
+def timed(func, *args, **kwargs):
+    """返回 (结果, 耗时毫秒数)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, round((time.perf_counter() - start) * 1000, 1)
+
+def main():
+    parser = argparse.ArgumentParser(description='批量导入基准')
+    parser.add_argument('--rows', default='10000,100000', help='导入行数，以逗号分隔')
+    parser.add_argument('--workers', type=int, default=IMPORT_VALIDATION_WORKERS, help='并行校验的进程数')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出结果')
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    
+    results = {'workers': args.workers, 'runs': []}
+    for count in (int(value) for value in args.rows.split(',')):
+        data = generate_rows(count)
+        run = {'rows': count, 'validate_serial_ms': {}, 'validate_parallel_ms': {}, 'import_ms': {}}
+        for kind, rows in data.items():
+            serial, run['validate_serial_ms'][kind] = timed(import_validation.validate_rows, kind, rows, workers=1)
+            parallel, run['validate_parallel_ms'][kind] = timed(
+                import_validation.validate_rows, kind, rows, workers=args.workers, min_parallel_rows=0)
+            assert serial == parallel
+        
+        # 完整导入，课程和学生先于成绩导入
+        with tempfile.TemporaryDirectory() as work_dir:
+            db = Database(dict(DATABASE_CONFIG, name=os.path.join(work_dir, 'bench.db')))
+            db.init_database()
+            controllers = LazyControllers(db, User(db).get_user('admin'))
+            for kind, controller, method in (('courses', 'course', 'import_courses'),
+                                             ('students', 'student', 'import_students'),
+                                             ('grades', 'grade', 'import_grades')):
+                result, run['import_ms'][kind] = timed(getattr(controllers[controller], method), data[kind])
+                assert result['success'], result['message']
+                run.setdefault('failed', {})[kind] = result['data']['failed_count']
+            db.close()
+        results['runs'].append(run)
+    
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    
+    print(f"并行校验进程数: {results['workers']}")
+    for run in results['runs']:
+        print(f"{run['rows']} 行:")
+        for kind in ('students', 'courses', 'grades'):
+            print(f"  {kind:9s} 校验 单进程 {run['validate_serial_ms'][kind]:9.1f} ms  "
+                  f"并行 {run['validate_parallel_ms'][kind]:9.1f} ms  "
+                  f"完整导入 {run['import_ms'][kind]:9.1f} ms  (失败 {run['failed'][kind]} 行)")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""
+登录吞吐量基准
+
+测量单核每秒可完成的密码验证次数，以及启用密码哈希进程池后多个并发登录线程的总吞吐量，
+最后在临时数据库上测量完整的 User.authenticate 调用。
+
+用法:
+    python benchmarks/bench_login.py [--logins 50] [--workers 4] [--iterations 150000] [--json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import DATABASE_CONFIG
+from models.database import Database
+from models.user import User
+from utils import passwords
+
+def logins_per_second(count, threads, hashed):
+    """用指定数量的线程并发验证密码，返回每秒验证次数"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(lambda _: passwords._compute('benchmark', *hashed), range(count)))
+    assert len(results) == count
+    return count / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description='登录吞吐量基准')
+    parser.add_argument('--logins', type=int, default=50, help='每个场景的登录次数')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='密码哈希进程池大小')
+    parser.add_argument('--iterations', type=int, default=passwords.PASSWORD_HASH_ITERATIONS, help='PBKDF2迭代次数')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出结果')
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    
+    # 固定盐值和迭代次数，只测量哈希计算本身
+    hashed = ('benchmark-salt', args.iterations)
+    results = {'iterations': args.iterations, 'workers': args.workers}
+    
+    passwords.init_hash_pool(0)
+    results['inline_single_thread'] = logins_per_second(args.logins, 1, hashed)
+    
+    passwords.init_hash_pool(args.workers)
+    # 预热进程池
+    logins_per_second(args.workers, args.workers, hashed)
+    results['pool_concurrent'] = logins_per_second(args.logins, args.workers * 2, hashed)
+    results['pool_per_core'] = results['pool_concurrent'] / args.workers
+    
+    # 完整的认证流程(查询用户、验证密码、更新最后登录时间)，包括旧密码首次登录时的重新哈希
+    passwords.init_hash_pool(0)
+    with tempfile.TemporaryDirectory() as work_dir:
+        db = Database(dict(DATABASE_CONFIG, name=os.path.join(work_dir, 'bench.db')))
+        db.init_database()
+        user_model = User(db)
+        user_model.add_user({'username': 'bench', 'password': 'benchmark', 'role': 'student'})
+        
+        start = time.perf_counter()
+        for _ in range(args.logins):
+            assert user_model.authenticate('bench', 'benchmark')
+        results['authenticate_cached'] = args.logins / (time.perf_counter() - start)
+        
+        passwords._verified.invalidate()
+        start = time.perf_counter()
+        for _ in range(args.logins):
+            assert user_model.authenticate('bench', 'benchmark')
+            passwords._verified.invalidate()
+        results['authenticate_uncached'] = args.logins / (time.perf_counter() - start)
+        db.close()
+    
+    results = {key: round(value, 1) if isinstance(value, float) else value for key, value in results.items()}
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    
+    print(f"PBKDF2迭代次数: {results['iterations']}")
+    print(f"单线程(请求线程内计算): {results['inline_single_thread']} 次/秒")
+    print(f"进程池({results['workers']}进程)并发: {results['pool_concurrent']} 次/秒，每核 {results['pool_per_core']} 次/秒")
+    print(f"User.authenticate(未命中验证缓存): {results['authenticate_uncached']} 次/秒")
+    print(f"User.authenticate(命中验证缓存): {results['authenticate_cached']} 次/秒")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
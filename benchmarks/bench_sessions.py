@@ -0,0 +1,113 @@
+"""
+会话后端性能基准
+
+比较各会话后端每个请求的会话开销(加载+保存)，使用Flask测试客户端，不经过网络。
+
+用法:
+    python benchmarks/bench_sessions.py [--requests 2000] [--backends cookie sqlite filesystem] [--json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, session
+
+from web.session_backends import configure_sessions
+
+def build_app(backend, work_dir):
+    """创建只包含会话操作的测试应用"""
+    app = Flask(__name__)
+    app.config.update(
+        SECRET_KEY='benchmark-secret-key',
+        SESSION_PERMANENT=False,
+        PERMANENT_SESSION_LIFETIME=1800
+    )
+    configure_sessions(
+        app,
+        backend,
+        session_db=os.path.join(work_dir, f'{backend}_sessions.db'),
+        file_dir=os.path.join(work_dir, f'{backend}_flask_session')
+    )
+    
+    @app.route('/login')
+    def login():
+        session['user'] = {'username': 'teacher01', 'role': 'teacher', 'real_name': '张老师'}
+        return 'ok'
+    
+    @app.route('/read')
+    def read():
+        return session['user']['username']
+    
+    @app.route('/write')
+    def write():
+        session['counter'] = session.get('counter', 0) + 1
+        return 'ok'
+    
+    @app.route('/none')
+    def none():
+        return 'ok'
+    
+    return app
+
+def time_requests(client, path, count):
+    """返回每个请求的平均耗时(微秒)"""
+    start = time.perf_counter()
+    for _ in range(count):
+        response = client.get(path)
+        assert response.status_code == 200, response.status_code
+    return (time.perf_counter() - start) / count * 1e6
+
+def run_backend(backend, count, work_dir):
+    """对单个会话后端运行基准测试"""
+    client = build_app(backend, work_dir).test_client()
+    client.get('/login')
+    
+    # 预热
+    for path in ('/none', '/read', '/write'):
+        time_requests(client, path, min(50, count))
+    
+    baseline = time_requests(client, '/none', count)
+    read = time_requests(client, '/read', count)
+    write = time_requests(client, '/write', count)
+    return {
+        'backend': backend,
+        'requests': count,
+        'no_session_us': round(baseline, 1),
+        'read_us': round(read, 1),
+        'write_us': round(write, 1),
+        'read_overhead_us': round(read - baseline, 1),
+        'write_overhead_us': round(write - baseline, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='会话后端性能基准')
+    parser.add_argument('--requests', type=int, default=2000, help='每个场景的请求数')
+    parser.add_argument('--backends', nargs='+', default=['cookie', 'sqlite', 'filesystem'], help='要测试的会话后端')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出结果')
+    args = parser.parse_args()
+    
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for backend in args.backends:
+            try:
+                results.append(run_backend(backend, args.requests, work_dir))
+            except ImportError as e:
+                print(f"跳过 {backend}: {e}", file=sys.stderr)
+    
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    
+    print(f"{'后端':<12}{'无会话(us)':>12}{'读取(us)':>12}{'写入(us)':>12}{'读开销(us)':>12}{'写开销(us)':>12}")
+    for result in results:
+        print(f"{result['backend']:<12}{result['no_session_us']:>12}{result['read_us']:>12}"
+              f"{result['write_us']:>12}{result['read_overhead_us']:>12}{result['write_overhead_us']:>12}")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
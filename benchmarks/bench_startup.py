@@ -0,0 +1,125 @@
+"""
+启动耗时预算检查
+
+用 python -X importtime 测量入口模块的导入耗时，检查菜单子视图和控制器等按需加载的模块没有在启动时导入，
+并测量表结构已是最新版本时 init_database 的耗时。超出预算或按需加载的模块被提前导入时退出码为1，
+可在提交前本地运行。
+
+用法:
+    python benchmarks/bench_startup.py [--budget-ms 100] [--web-budget-ms 400] [--repeat 5] [--json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import logging
+import importlib.util
+import subprocess
+
+# 添加项目根目录到系统路径
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+# 启动时不应导入的模块，它们在第一次进入菜单或处理请求时才加载
+LAZY_MODULES = {
+    'main': ('controllers.student_controller', 'controllers.grade_controller', 'controllers.user_controller',
+             'views.cli_student_view', 'views.cli_grade_view', 'views.cli_batch_view', 'utils.transcript_export'),
+    'web.app': ('controllers.student_controller', 'controllers.grade_controller', 'controllers.schedule_controller')
+}
+
+def import_time(module, repeat):
+    """
+    在子进程中导入模块并解析 -X importtime 的输出
+    
+    参数:
+        module (str): 模块名
+        repeat (int): 重复次数，取最短的一次
+    
+    返回:
+        tuple: (导入耗时毫秒数, 导入的模块名集合)
+    """
+    best = None
+    imported = set()
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                cwd=ROOT_DIR, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"导入 {module} 失败:\n{result.stderr}")
+        
+        total = None
+        imported = set()
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or '|' not in line:
+                continue
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if not cumulative.strip().isdigit():
+                continue  # 表头
+            imported.add(name.strip())
+            if name.strip() == module:
+                total = int(cumulative) / 1000
+        if total is not None and (best is None or total < best):
+            best = total
+    return best, imported
+
+def init_database_times():
+    """测量新建数据库和表结构已是最新版本时 init_database 的耗时(毫秒)"""
+    from config.settings import DATABASE_CONFIG
+    from models.database import Database
+    
+    times = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        config = dict(DATABASE_CONFIG, name=os.path.join(work_dir, 'startup.db'))
+        for key in ('init_database_new_ms', 'init_database_current_ms'):
+            db = Database(config)
+            start = time.perf_counter()
+            assert db.init_database()
+            times[key] = round((time.perf_counter() - start) * 1000, 2)
+            db.close()
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description='启动耗时预算检查')
+    parser.add_argument('--budget-ms', type=float, default=100, help='命令行入口 main 的导入耗时预算')
+    parser.add_argument('--web-budget-ms', type=float, default=400, help='Web入口 web.app 的导入耗时预算')
+    parser.add_argument('--repeat', type=int, default=5, help='每个模块的测量次数，取最短的一次')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出结果')
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    
+    budgets = {'main': args.budget_ms, 'web.app': args.web_budget_ms}
+    results = {'modules': {}, 'failures': []}
+    for module, budget in budgets.items():
+        # 未安装Flask时无法导入Web入口
+        if module == 'web.app' and importlib.util.find_spec('flask') is None:
+            results['modules'][module] = {'skipped': '未安装Flask'}
+            continue
+        
+        elapsed, imported = import_time(module, args.repeat)
+        eager = sorted(name for name in LAZY_MODULES[module] if name in imported)
+        results['modules'][module] = {'import_ms': elapsed, 'budget_ms': budget, 'eager_modules': eager}
+        if elapsed > budget:
+            results['failures'].append(f"{module} 导入耗时 {elapsed:.1f}ms 超出预算 {budget:.0f}ms")
+        if eager:
+            results['failures'].append(f"{module} 启动时导入了应按需加载的模块: {', '.join(eager)}")
+    
+    results.update(init_database_times())
+    
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        for module, result in results['modules'].items():
+            if 'skipped' in result:
+                print(f"{module:10s} 跳过: {result['skipped']}")
+            else:
+                print(f"{module:10s} {result['import_ms']:8.1f} ms  (预算 {result['budget_ms']:.0f} ms)")
+        print(f"init_database 新建数据库      {results['init_database_new_ms']:8.2f} ms")
+        print(f"init_database 表结构已是最新  {results['init_database_current_ms']:8.2f} ms")
+        for failure in results['failures']:
+            print(f"失败: {failure}")
+    
+    sys.exit(1 if results['failures'] else 0)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
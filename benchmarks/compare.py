@@ -0,0 +1,48 @@
+"""
+比较两次基准测试结果
+
+用法:
+    python -m benchmarks.compare old.json new.json [--threshold 10]
+"""
+import sys
+import json
+import argparse
+
+def load(path):
+    """读取基准测试结果文件"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description='比较两次基准测试结果')
+    parser.add_argument('old', help='基准结果文件')
+    parser.add_argument('new', help='对比结果文件')
+    parser.add_argument('--threshold', type=float, default=10, help='变化超过该百分比时标记')
+    args = parser.parse_args()
+    
+    old, new = load(args.old), load(args.new)
+    print(f"基准: {old['meta'].get('revision')}  对比: {new['meta'].get('revision')}")
+    print(f"{'场景':<40}{'基准(ms)':>12}{'对比(ms)':>12}{'变化':>10}")
+    
+    regressions = 0
+    for name in sorted(set(old['results']) | set(new['results'])):
+        before = old['results'].get(name, {}).get('median_ms')
+        after = new['results'].get(name, {}).get('median_ms')
+        if before is None or after is None:
+            print(f"{name:<40}{before or '-':>12}{after or '-':>12}{'':>10}")
+            continue
+        
+        change = (after - before) / before * 100 if before else 0
+        mark = ''
+        if change > args.threshold:
+            mark = ' ▲'
+            regressions += 1
+        elif change < -args.threshold:
+            mark = ' ▼'
+        print(f"{name:<40}{before:>12.3f}{after:>12.3f}{change:>+9.1f}%{mark}")
+    
+    # 有性能退化时以非零状态退出，便于在脚本中使用
+    sys.exit(1 if regressions else 0)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
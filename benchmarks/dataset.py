@@ -0,0 +1,187 @@
+"""
+基准测试数据生成模块
+
+通过现有模型向临时数据库写入可复现的合成数据：学生、班级、课程、
+每个学生每门课程每个学期的成绩、完整的课程表以及大量操作日志。
+"""
+import random
+import logging
+import time
+from datetime import datetime, timedelta
+
+from config.database import TABLES
+from models.student import Student
+from models.course import Course
+from models.grade import Grade
+from models.schedule import Schedule
+from models.log import Log
+from models.user import User
+
+logger = logging.getLogger(__name__)
+
+# 基准测试使用的管理员账户
+BENCH_ADMIN = {'username': 'bench_admin', 'role': 'admin', 'real_name': '基准测试管理员'}
+BENCH_PASSWORD = 'bench-password'
+
+SURNAMES = '赵钱孙李周吴郑王冯陈褚卫蒋沈韩杨朱秦尤许何吕施张孔曹严华金魏陶姜'
+GIVEN_NAMES = '伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂英华玉兰'
+TEACHERS = ['王老师', '李老师', '张老师', '刘老师', '陈老师', '杨老师', '赵老师', '黄老师']
+OPERATIONS = ['登录', '添加学生', '更新学生', '添加成绩', '更新成绩', '导入成绩', '导出成绩', '查询成绩']
+
+# 互不冲突的课程表时间段：星期一至五 × 5个大节 × 前后半学期 × 单双周
+SCHEDULE_SLOTS = [
+    (day, start, weeks, week_type)
+    for day in range(1, 6)
+    for start in (1, 3, 5, 7, 9)
+    for weeks in ((1, 8), (9, 16))
+    for week_type in (1, 2)
+]
+
+def semester_names(count, first_year=2020):
+    """生成学期名称列表，如 2020-2021-1, 2020-2021-2, ..."""
+    names = []
+    for index in range(count):
+        year = first_year + index // 2
+        names.append(f"{year}-{year + 1}-{index % 2 + 1}")
+    return names
+
+def _tune_for_bulk_load(db):
+    """临时数据库不需要持久性保证，关闭同步以加快写入"""
+    db.connection.execute("PRAGMA synchronous = OFF")
+    db.connection.execute("PRAGMA journal_mode = MEMORY")
+
+def generate_dataset(db, students=1000, classes=20, courses=30, semesters=4, logs=20000, seed=42):
+    """
+    生成合成数据集
+    
+    参数:
+        db (Database): 已初始化表结构的数据库实例
+        students (int): 学生数量
+        classes (int): 班级数量
+        courses (int): 课程数量
+        semesters (int): 学期数量
+        logs (int): 操作日志数量
+        seed (int): 随机种子
+    
+    返回:
+        dict: 数据集描述，包含各类记录数、学期列表和生成耗时
+    """
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    _tune_for_bulk_load(db)
+    
+    user_model = User(db)
+    student_model = Student(db)
+    course_model = Course(db)
+    grade_model = Grade(db)
+    schedule_model = Schedule(db)
+    log_model = Log(db)
+    
+    user_model.add_user(dict(BENCH_ADMIN, password=BENCH_PASSWORD))
+    
+    class_names = [f"计算机{2020 + index // 4}级{index % 4 + 1}班" for index in range(classes)]
+    student_ids = []
+    # 每个学生有自己的水平，成绩围绕该水平波动
+    levels = {}
+    for index in range(students):
+        student_id = f"S{2020000000 + index}"
+        student_model.add_student({
+            'student_id': student_id,
+            'name': rng.choice(SURNAMES) + ''.join(rng.choice(GIVEN_NAMES) for _ in range(rng.randint(1, 2))),
+            'gender': rng.choice(['男', '女']),
+            'class_name': class_names[index % classes],
+            'admission_date': f"{2020 + index % 4}-09-01",
+            'status': '在读',
+        })
+        student_ids.append(student_id)
+        levels[student_id] = rng.randint(60, 89)
+    
+    semester_list = semester_names(semesters)
+    course_ids = []
+    for index in range(courses):
+        course_id = f"C{1000 + index}"
+        course_model.add_course({
+            'course_id': course_id,
+            'course_name': f"课程{index + 1:03d}",
+            'credit': rng.choice([1, 1.5, 2, 3, 4]),
+            'teacher': TEACHERS[index % len(TEACHERS)],
+            'semester': semester_list[index % semesters],
+        })
+        course_ids.append(course_id)
+    
+    grade_count = 0
+    for semester in semester_list:
+        for student_id in student_ids:
+            for course_id in course_ids:
+                score = max(0, min(100, round(rng.gauss(levels[student_id], 10), 1)))
+                if grade_model.add_grade({
+                    'student_id': student_id,
+                    'course_id': course_id,
+                    'semester': semester,
+                    'score': score,
+                }):
+                    grade_count += 1
+    
+    schedule_count = 0
+    for semester in semester_list:
+        for index, course_id in enumerate(course_ids[:len(SCHEDULE_SLOTS)]):
+            day, start, weeks, week_type = SCHEDULE_SLOTS[index]
+            success, _ = schedule_model.add_schedule_item({
+                'course_id': course_id,
+                'semester': semester,
+                'day_of_week': day,
+                'start_section': start,
+                'end_section': start + 1,
+                'location': f"教学楼{index % 5 + 1}-{101 + index}",
+                'teacher': TEACHERS[index % len(TEACHERS)],
+                'week_type': week_type,
+                'start_week': weeks[0],
+                'end_week': weeks[1],
+            })
+            if success:
+                schedule_count += 1
+    
+    now = datetime.now()
+    for index in range(logs):
+        log_model.add_log({
+            'username': BENCH_ADMIN['username'] if index % 3 else f"teacher{index % 8}",
+            'operation': rng.choice(OPERATIONS),
+            'target': f"记录{index}",
+            'details': f"基准测试日志 {index}",
+            'ip_address': f"10.0.{index % 256}.{index % 200 + 1}",
+            'timestamp': (now - timedelta(minutes=rng.randint(0, 60 * 24 * 60))).strftime('%Y-%m-%d %H:%M:%S'),
+        })
+    
+    db.execute("ANALYZE")
+    return {
+        'students': students,
+        'classes': classes,
+        'courses': courses,
+        'semesters': semester_list,
+        'grades': grade_count,
+        'schedules': schedule_count,
+        'logs': logs,
+        'seed': seed,
+        'generation_seconds': round(time.perf_counter() - started, 2),
+    }
+
+def describe_dataset(db):
+    """
+    读取已有数据库的数据集描述，用于复用之前生成的临时数据库
+    
+    参数:
+        db (Database): 数据库实例
+    
+    返回:
+        dict: 数据集描述
+    """
+    counts = {}
+    for key in ('students', 'courses', 'grades', 'schedules', 'logs'):
+        db.execute(f"SELECT COUNT(*) as count FROM {TABLES[key]}")
+        counts[key] = db.fetchone()['count']
+    
+    db.execute(f"SELECT COUNT(DISTINCT class_name) as count FROM {TABLES['students']}")
+    counts['classes'] = db.fetchone()['count']
+    db.execute(f"SELECT DISTINCT semester FROM {TABLES['grades']} ORDER BY semester")
+    counts['semesters'] = [row['semester'] for row in db.fetchall()]
+    return counts
\ No newline at end of file
@@ -0,0 +1,140 @@
+"""
+基准测试入口
+
+生成(或复用)临时数据库，依次运行各场景并输出JSON结果，便于在不同提交之间比较。
+
+用法:
+    python -m benchmarks.run [--students 1000] [--courses 30] [--semesters 4] [--logs 20000]
+                             [--repeat 5] [--only grade.] [--skip-web] [--db path] [--output result.json]
+
+比较两次结果:
+    python -m benchmarks.compare old.json new.json
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+import logging
+from datetime import datetime
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import DATABASE_CONFIG
+from models.database import Database
+from benchmarks.dataset import generate_dataset, describe_dataset
+from benchmarks.scenarios import SCENARIOS, BenchContext
+
+def git_revision():
+    """获取当前代码的提交号，不在git仓库中时返回None"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def time_scenario(func, ctx, repeat, warmup):
+    """运行场景并统计耗时(毫秒)"""
+    for run in range(warmup):
+        func(ctx, -1 - run)
+    
+    timings = []
+    for run in range(repeat):
+        start = time.perf_counter()
+        func(ctx, run)
+        timings.append((time.perf_counter() - start) * 1000)
+    
+    return {
+        'runs': repeat,
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'max_ms': round(max(timings), 3),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='学生管理系统基准测试')
+    parser.add_argument('--students', type=int, default=1000, help='学生数量')
+    parser.add_argument('--classes', type=int, default=20, help='班级数量')
+    parser.add_argument('--courses', type=int, default=30, help='课程数量')
+    parser.add_argument('--semesters', type=int, default=4, help='学期数量')
+    parser.add_argument('--logs', type=int, default=20000, help='操作日志数量')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--repeat', type=int, default=5, help='每个场景的运行次数')
+    parser.add_argument('--warmup', type=int, default=1, help='每个场景的预热次数')
+    parser.add_argument('--only', default='', help='只运行名称以该前缀开头的场景')
+    parser.add_argument('--skip-web', action='store_true', help='跳过Web路由场景')
+    parser.add_argument('--db', help='临时数据库路径，文件已存在时直接复用')
+    parser.add_argument('--output', help='结果输出文件，不提供则输出到标准输出')
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    
+    work_dir = None
+    db_path = args.db
+    if not db_path:
+        work_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(work_dir.name, 'bench.db')
+    
+    database_config = dict(DATABASE_CONFIG, name=os.path.abspath(db_path))
+    reuse = os.path.exists(database_config['name'])
+    db = Database(database_config)
+    db.init_database()
+    
+    if reuse:
+        dataset = describe_dataset(db)
+        print(f"复用已有数据库: {database_config['name']}", file=sys.stderr)
+    else:
+        print("正在生成数据集...", file=sys.stderr)
+        dataset = generate_dataset(
+            db, students=args.students, classes=args.classes, courses=args.courses,
+            semesters=args.semesters, logs=args.logs, seed=args.seed
+        )
+        print(f"数据集生成完成，耗时 {dataset['generation_seconds']} 秒", file=sys.stderr)
+    
+    ctx = BenchContext(db, dataset, database_config)
+    results = {}
+    for name, group, func in SCENARIOS:
+        if args.only and not name.startswith(args.only):
+            continue
+        if group == 'web' and args.skip_web:
+            continue
+        try:
+            results[name] = time_scenario(func, ctx, args.repeat, args.warmup)
+            print(f"{name:<40}{results[name]['median_ms']:>12.3f} ms", file=sys.stderr)
+        except ImportError as e:
+            results[name] = {'skipped': f"缺少依赖: {e}"}
+            print(f"{name:<40}{'跳过':>12}", file=sys.stderr)
+    
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sqlite': db.connection.execute('SELECT sqlite_version()').fetchone()[0],
+            'repeat': args.repeat,
+        },
+        'dataset': dataset,
+        'results': results,
+    }
+    db.close()
+    if work_dir:
+        work_dir.cleanup()
+    
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
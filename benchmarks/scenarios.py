@@ -0,0 +1,171 @@
+"""
+基准测试场景模块
+
+每个场景是一个接收 (上下文, 运行序号) 的函数，执行一次被测操作。
+写入类场景使用运行序号生成互不重复的数据，保证每次运行的工作量相同。
+"""
+import logging
+
+from benchmarks.dataset import BENCH_ADMIN, SCHEDULE_SLOTS
+
+logger = logging.getLogger(__name__)
+
+# 已注册的场景 [(名称, 分组, 函数)]
+SCENARIOS = []
+
+def scenario(name, group='model'):
+    """注册基准测试场景"""
+    def decorator(func):
+        SCENARIOS.append((name, group, func))
+        return func
+    return decorator
+
+class BenchContext:
+    """场景运行上下文，按需创建控制器和Web测试客户端"""
+    
+    def __init__(self, db, dataset, database_config):
+        """
+        初始化运行上下文
+        
+        参数:
+            db (Database): 数据库实例
+            dataset (dict): 数据集描述
+            database_config (dict): 数据库配置，Web场景使用
+        """
+        self.db = db
+        self.dataset = dataset
+        self.database_config = database_config
+        self._controllers = {}
+        self._client = None
+    
+    def controller(self, name):
+        """获取以基准测试管理员身份创建的控制器"""
+        if name not in self._controllers:
+            if name == 'grade':
+                from controllers.grade_controller import GradeController as controller_class
+            elif name == 'student':
+                from controllers.student_controller import StudentController as controller_class
+            elif name == 'schedule':
+                from controllers.schedule_controller import ScheduleController as controller_class
+            else:
+                from controllers.log_controller import LogController as controller_class
+            self._controllers[name] = controller_class(self.db, BENCH_ADMIN)
+        return self._controllers[name]
+    
+    @property
+    def client(self):
+        """已登录为基准测试管理员的Flask测试客户端"""
+        if self._client is None:
+            from web.app import create_app
+            
+            app = create_app(database_config=self.database_config)
+            # 基准测试会在短时间内发出大量请求，关闭限流；配置中已关闭限流时不会注册限流器
+            rate_limiter = app.extensions.get('rate_limiter')
+            if rate_limiter is not None:
+                rate_limiter.limits = {}
+            self._client = app.test_client()
+            with self._client.session_transaction() as session:
+                session['user'] = dict(BENCH_ADMIN)
+        return self._client
+    
+    def get(self, path):
+        """发出GET请求并检查状态码"""
+        response = self.client.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f"请求 {path} 返回状态码 {response.status_code}")
+        return response
+
+@scenario('grade.get_statistics')
+def grade_statistics_all(ctx, run):
+    ctx.controller('grade').grade_model.get_statistics({})
+
+@scenario('grade.get_statistics[semester]')
+def grade_statistics_semester(ctx, run):
+    ctx.controller('grade').grade_model.get_statistics({'semester': ctx.dataset['semesters'][-1]})
+
+@scenario('grade.get_grades[first_page]')
+def grade_first_page(ctx, run):
+    ctx.controller('grade').grade_model.get_grades({}, limit=20, offset=0)
+
+@scenario('grade.get_grades[middle_page]')
+def grade_middle_page(ctx, run):
+    ctx.controller('grade').grade_model.get_grades({}, limit=20, offset=ctx.dataset['grades'] // 2)
+
+@scenario('grade.get_grades[last_page]')
+def grade_last_page(ctx, run):
+    ctx.controller('grade').grade_model.get_grades({}, limit=20, offset=max(0, ctx.dataset['grades'] - 20))
+
+@scenario('student.search_students[id]')
+def search_students_id(ctx, run):
+    ctx.controller('student').search_students('S2020000')
+
+@scenario('student.search_students[name]')
+def search_students_name(ctx, run):
+    ctx.controller('student').search_students('王')
+
+@scenario('grade.import_grades[500]', group='write')
+def import_grades(ctx, run):
+    db = ctx.db
+    db.execute("SELECT student_id FROM students ORDER BY student_id LIMIT 50")
+    student_ids = [row['student_id'] for row in db.fetchall()]
+    db.execute("SELECT course_id FROM courses ORDER BY course_id LIMIT 10")
+    course_ids = [row['course_id'] for row in db.fetchall()]
+    
+    semester = f"bench-import-{run}"
+    rows = [
+        {'student_id': student_id, 'course_id': course_id, 'semester': semester, 'score': 60 + (index % 40)}
+        for index, (student_id, course_id) in enumerate(
+            (student_id, course_id) for student_id in student_ids for course_id in course_ids
+        )
+    ]
+    result = ctx.controller('grade').import_grades(rows)
+    if not result['success'] or result['data']['failed_count']:
+        raise RuntimeError(f"导入成绩失败: {result['message']}")
+
+@scenario('schedule.batch_import_schedule', group='write')
+def batch_import_schedule(ctx, run):
+    ctx.db.execute("SELECT course_id FROM courses ORDER BY course_id")
+    course_ids = [row['course_id'] for row in ctx.db.fetchall()]
+    
+    semester = f"bench-schedule-{run}"
+    items = []
+    for index, course_id in enumerate(course_ids[:len(SCHEDULE_SLOTS)]):
+        day, start, weeks, week_type = SCHEDULE_SLOTS[index]
+        items.append({
+            'course_id': course_id,
+            'semester': semester,
+            'day_of_week': day,
+            'start_section': start,
+            'end_section': start + 1,
+            'location': f"实验楼-{index}",
+            'week_type': week_type,
+            'start_week': weeks[0],
+            'end_week': weeks[1],
+        })
+    result = ctx.controller('schedule').batch_import_schedule(items)
+    if not result['success'] or result['data']['failed_count']:
+        raise RuntimeError(f"导入课程表失败: {result['message']}")
+
+@scenario('log.get_operation_stats')
+def operation_stats(ctx, run):
+    ctx.controller('log').get_operation_stats(30)
+
+@scenario('web./students/list', group='web')
+def web_students(ctx, run):
+    ctx.get('/students/list')
+
+@scenario('web./courses/list', group='web')
+def web_courses(ctx, run):
+    ctx.get('/courses/list')
+
+@scenario('web./grades/list', group='web')
+def web_grades(ctx, run):
+    ctx.get('/grades/list')
+
+@scenario('web./grades/statistics', group='web')
+def web_statistics(ctx, run):
+    ctx.get('/grades/statistics')
+
+@scenario('web./api/courses', group='web')
+def web_api_courses(ctx, run):
+    ctx.get('/api/courses')
\ No newline at end of file
@@ -13,5 +13,15 @@ TABLES = {
     'courses': 'courses',
     'grades': 'grades',
     'users': 'users',
-    'logs': 'operation_logs'
-}
\ No newline at end of file
+    'logs': 'operation_logs',
+    'schedules': 'schedules',
+    'data_versions': 'data_versions',
+    'grade_changes': 'grade_changes',
+    'schema_version': 'schema_version',
+    'import_jobs': 'import_jobs',
+    'import_job_errors': 'import_job_errors',
+    'jobs': 'jobs'
+}
+
+# 记录数据版本的实体，这些表的任何写入都会使对应的版本号加1
+VERSIONED_TABLES = ('students', 'courses', 'grades', 'schedules', 'users')
\ No newline at end of file
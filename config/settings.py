@@ -29,6 +29,38 @@ PERMISSION_LEVELS = {
 # 数据导出配置
 EXPORT_DIR = os.path.join(BASE_DIR, 'data', 'exports')
 SUPPORTED_EXPORT_FORMATS = ['csv', 'excel', 'pdf']
+TRANSCRIPT_EXPORT_DIR = os.path.join(EXPORT_DIR, 'transcripts')  # 批量成绩单输出目录
+TRANSCRIPT_EXPORT_JOBS = os.cpu_count() or 1  # 批量成绩单渲染进程数
+
+# 数据导入配置
+IMPORT_UPLOAD_DIR = os.path.join(BASE_DIR, 'data', 'imports')  # 上传的导入文件保存目录，导入完成后删除
+IMPORT_CHUNK_SIZE = 1000  # 流式导入每批处理的行数，每批与导入进度在同一事务中提交
+IMPORT_PREVIEW_DIR = os.path.join(IMPORT_UPLOAD_DIR, 'previews')  # 预览导入时上传的文件，确认或放弃导入后删除
+IMPORT_PREVIEW_MAX_AGE = 24 * 3600  # 未确认也未放弃的预览文件保留的秒数，超时后清理
+IMPORT_VALIDATION_WORKERS = os.cpu_count() or 1  # 并行校验导入数据的进程数
+IMPORT_VALIDATION_CHUNK_SIZE = 5000  # 并行校验时每个进程任务包含的行数
+IMPORT_PARALLEL_MIN_ROWS = 20000  # 导入行数达到该值时才并行校验，行数较少时启动进程的开销大于收益
+IMPORT_PLAN_SAMPLE_LIMIT = 200  # 预览导入时显示的更新明细条数
+
+# 绩点配置
+# 绩点表，每项为 (分数下限, 绩点)，分数不低于下限时取该绩点，低于所有下限时绩点为0。
+# 修改后需执行 "python main.py recompute-grade-points" 或在后台任务页面重新计算已有成绩的绩点
+GRADE_POINT_SCALE = (
+    (90, 4.0),
+    (85, 3.7),
+    (80, 3.3),
+    (75, 3.0),
+    (70, 2.7),
+    (65, 2.3),
+    (60, 2.0),
+    (0, 0.0)
+)
+GRADE_POINT_BATCH_SIZE = 5000  # 重新计算绩点时每个事务更新的成绩ID区间大小
+
+# 后台任务配置
+JOB_WORKERS = 2  # 每个进程中执行后台任务的线程数
+JOB_STALE_SECONDS = 300  # 运行中的任务超过该秒数没有进度时视为已中断(如服务重启)
+JOB_RETENTION_DAYS = 7  # 已结束的任务及其结果保留的天数
 
 # 日志配置字典
 LOGGING_CONFIG = {
@@ -69,4 +101,66 @@ DATABASE_CONFIG = {
     'create_if_not_exists': True,
     'timeout': 15,
     'isolation_level': None,  # 自动提交
-}
\ No newline at end of file
+}
+# 课程表日历导出(iCalendar)配置
+ICS_CACHE_DIR = os.path.join(BASE_DIR, 'data', 'ics_cache')
+ICS_CACHE_TTL = 300  # 缓存文件在该秒数内直接返回，不查询数据库
+ICS_TIMEZONE = 'Asia/Shanghai'
+ICS_UTC_OFFSET = '+0800'
+
+# 各学期第一周周一的日期，未配置时按学期编号推算（第1学期9月，第2学期3月）
+SEMESTER_START_DATES = {
+    # '2024-2025-1': '2024-09-02',
+}
+
+# 各学期停课日期（节假日等），导出日历时作为例外日期(EXDATE)
+SEMESTER_EXCLUDED_DATES = {
+    # '2024-2025-1': ['2024-10-01', '2024-10-02', '2024-10-03'],
+}
+
+# 参考数据(班级、学期、课程下拉列表)进程级缓存配置
+REFERENCE_CACHE_SIZE = 256  # 最多缓存的条目数
+REFERENCE_CACHE_TTL = 600  # 缓存条目的最长存活秒数
+RANKING_CACHE_SIZE = 64  # 课程/班级排名结果的缓存条目数
+RANKING_CACHE_TTL = 600
+
+# 模板片段缓存配置
+FRAGMENT_CACHE_SIZE = 128
+FRAGMENT_CACHE_TTL = 600
+
+# Web会话配置
+SECRET_KEY_FILE = os.path.join(BASE_DIR, 'data', 'secret_key')  # 未设置环境变量SECRET_KEY时使用，首次启动自动生成
+SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'sqlite')  # cookie, sqlite 或 filesystem
+SESSION_DB_PATH = os.path.join(BASE_DIR, 'data', 'sessions.db')
+SESSION_LIFETIME = 1800  # 30分钟
+SESSION_PURGE_INTERVAL = 600  # 清理过期会话的间隔秒数
+
+# 密码哈希配置
+PASSWORD_HASH_ITERATIONS = 150000  # PBKDF2迭代次数，调整后用户下次登录时自动按新值重新哈希
+PASSWORD_HASH_WORKERS = os.cpu_count() or 1  # Web应用中用于密码哈希的进程数，0表示在请求线程中计算
+PASSWORD_VERIFY_CACHE_TTL = 300  # 成功验证结果的缓存秒数，0表示不缓存
+
+# 请求限流配置(令牌桶)，格式为 (次数, 秒数)：每个键在该秒数内最多允许的请求数，可突发
+RATE_LIMIT_ENABLED = True
+RATE_LIMITS = {
+    'login_ip': (20, 60),     # 每个IP每分钟最多提交20次登录
+    'login_user': (5, 60),    # 每个用户名在每个IP上每分钟最多登录失败5次
+    'api_ip': (60, 60),       # 未登录的API请求每个IP每分钟60次
+    'api_user': (600, 60),    # 已登录用户的API请求每分钟600次
+}
+
+# SQL执行统计配置，默认关闭；启用后记录每条语句的耗时并按请求/菜单操作汇总
+SQL_STATS_ENABLED = os.environ.get('SQL_STATS', '0') == '1'
+SQL_SLOW_QUERY_MS = 100  # 慢查询阈值(毫秒)，0表示不记录
+SQL_EXPLAIN_SLOW_QUERIES = True  # 慢查询日志中附加 EXPLAIN QUERY PLAN 结果
+SQL_SLOW_QUERY_LOG = os.path.join(LOG_DIR, 'slow_queries.log')
+SQL_STATS_DUMP = os.path.join(LOG_DIR, 'sql_stats.json')  # 命令行程序退出时写入开销最大的SQL指纹
+
+# 请求指标配置，指标通过 /metrics 以Prometheus文本格式输出
+METRICS_ENABLED = True
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # 设置后Prometheus可使用 "Authorization: Bearer <令牌>" 抓取，否则仅管理员可访问
+
+# 性能分析配置，管理员可按请求或命令行菜单操作开启
+PROFILE_DIR = os.path.join(LOG_DIR, 'profiles')
+PROFILE_SAMPLE_INTERVAL = 0.005  # sample模式的采样间隔(秒)
+PROFILE_CLI_MODE = os.environ.get('PROFILE_CLI')  # 命令行启动时默认的分析模式: cprofile 或 sample，未设置表示关闭
\ No newline at end of file
@@ -2,6 +2,7 @@
 基础控制器模块
 """
 import logging
+import functools
 from datetime import datetime
 
 from models.database import Database
@@ -10,6 +11,17 @@ from models.user import User
 
 logger = logging.getLogger(__name__)
 
+def unit_of_work(method):
+    """
+    控制器方法装饰器，在方法执行期间激活数据库的身份映射，
+    方法内重复的主键查询直接从内存返回
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.db.identity_map.scope():
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class BaseController:
     """基础控制器类，提供通用功能和权限控制"""
     
@@ -3,10 +3,12 @@
 """
 import logging
 from datetime import datetime
-import re
 
-from controllers.base_controller import BaseController
+from config.database import TABLES
+from controllers.base_controller import BaseController, unit_of_work
 from models.course import Course
+from utils import import_validation
+from utils.cache import cached_query
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +26,7 @@ class CourseController(BaseController):
         super().__init__(db, current_user)
         self.course_model = Course(self.db)
     
+    @unit_of_work
     def add_course(self, course_data):
         """
         添加新课程
@@ -82,6 +85,7 @@ class CourseController(BaseController):
             # 使用模型返回的具体错误信息
             return self.format_response(False, message=error_msg or "添加课程失败，请稍后重试或联系管理员")
     
+    @unit_of_work
     def update_course(self, course_id, update_data):
         """
         更新课程信息
@@ -126,6 +130,7 @@ class CourseController(BaseController):
         else:
             return self.format_response(False, message="更新课程信息失败")
     
+    @unit_of_work
     def delete_course(self, course_id):
         """
         删除课程
@@ -198,6 +203,18 @@ class CourseController(BaseController):
         if not self.check_permission('student'):
             return self.format_response(False, message="权限不足，需要登录")
         
+        # 课程列表常用于下拉框，结果按课程数据版本缓存
+        pagination = cached_query(
+            self.db, 'course_list', (TABLES['courses'],), self._load_courses,
+            tuple(sorted((filters or {}).items())), page, page_size, order_by
+        )
+        
+        return self.format_response(True, data=pagination)
+    
+    def _load_courses(self, filter_items, page, page_size, order_by):
+        """查询一页课程列表"""
+        filters = dict(filter_items)
+        
         # 获取课程总数
         total = self.course_model.count_courses(filters)
         
@@ -213,15 +230,13 @@ class CourseController(BaseController):
         )
         
         # 构建分页结果
-        pagination = {
+        return {
             'items': courses,
             'page': page,
             'page_size': page_size,
             'total_items': total,
             'total_pages': (total + page_size - 1) // page_size
         }
-        
-        return self.format_response(True, data=pagination)
     
     def search_courses(self, keyword, page=1, page_size=20):
         """
@@ -247,10 +262,13 @@ class CourseController(BaseController):
         
         return self.format_response(True, data=paginated_results)
     
+    @unit_of_work
     def import_courses(self, courses_data):
         """
         批量导入课程
         
+        行数较多时先在进程池中并行校验，再在一个事务中写入所有通过校验的课程。
+        
         参数:
             courses_data (list): 课程数据列表
         
@@ -264,78 +282,26 @@ class CourseController(BaseController):
         if not courses_data:
             return self.format_response(False, message="没有提供课程数据")
         
-        success_count = 0
-        failed_count = 0
-        failed_records = []
-        
-        # 添加创建时间和更新时间
         now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        for course_data in courses_data:
-            # 验证必填字段
-            required_fields = ['course_id', 'course_name', 'credit']
-            valid, error_message = self.validate_required_fields(course_data, required_fields)
-            
-            if not valid:
-                failed_count += 1
-                failed_records.append({
-                    'data': course_data,
-                    'reason': error_message
-                })
-                continue
-            
-            # 验证课程编号格式
-            if not self._validate_course_id(course_data['course_id']):
-                failed_count += 1
-                failed_records.append({
-                    'data': course_data,
-                    'reason': "课程编号格式不正确，应为字母和数字的组合"
-                })
-                continue
-                
-            # 检查课程编号是否已存在
-            existing_course = self.course_model.get_course(course_data['course_id'])
-            if existing_course:
-                failed_count += 1
-                failed_records.append({
-                    'data': course_data,
-                    'reason': f"课程编号 {course_data['course_id']} 已存在，请使用其他编号"
-                })
-                continue
-            
-            # 验证学分
-            try:
-                credit = float(course_data['credit'])
-                if credit <= 0:
-                    failed_count += 1
-                    failed_records.append({
-                        'data': course_data,
-                        'reason': "学分必须为正数"
-                    })
-                    continue
-                course_data['credit'] = credit
-            except ValueError:
-                failed_count += 1
-                failed_records.append({
-                    'data': course_data,
-                    'reason': "学分必须为数字"
-                })
-                continue
-            
-            # 添加时间戳
-            course_data['created_at'] = now
-            course_data['updated_at'] = now
-            
-            # 添加课程
-            success, error_msg = self.course_model.add_course(course_data)
-            if success:
-                success_count += 1
+        failed_rows = []
+        valid_rows = []
+        for index, (reason, credit) in enumerate(import_validation.validate_rows('courses', courses_data)):
+            if reason:
+                failed_rows.append((index, reason))
             else:
-                failed_count += 1
-                failed_records.append({
-                    'data': course_data,
-                    'reason': error_msg or "添加失败，未知错误"
-                })
+                valid_rows.append((index, dict(courses_data[index], credit=credit, created_at=now, updated_at=now)))
+        
+        # 单线程写入，所有课程在一个事务中提交
+        with self.db.transaction():
+            results = self.course_model.insert_import_rows([course_data for _, course_data in valid_rows])
+        for (index, course_data), inserted in zip(valid_rows, results):
+            if not inserted:
+                failed_rows.append((index, f"课程编号 {course_data['course_id']} 已存在，请使用其他编号"))
+        failed_rows.sort()
+        
+        success_count = len(courses_data) - len(failed_rows)
+        failed_count = len(failed_rows)
+        failed_records = [{'data': courses_data[index], 'reason': reason} for index, reason in failed_rows]
         
         # 记录操作日志
         self.log_operation(
@@ -364,9 +330,7 @@ class CourseController(BaseController):
         返回:
             bool: 格式正确返回True，否则返回False
         """
-        # 课程编号应为字母和数字的组合，长度在2-20之间
-        pattern = r'^[A-Za-z0-9]{2,20}$'
-        return bool(re.match(pattern, course_id))
+        return import_validation.is_valid_course_id(course_id)
         
     def get_semester_list(self):
         """
@@ -380,16 +344,19 @@ class CourseController(BaseController):
             return self.format_response(False, message="权限不足，需要登录")
         
         try:
-            # 查询所有不同的学期
-            self.db.execute("""
-            SELECT DISTINCT semester
-            FROM grades
-            WHERE semester IS NOT NULL AND semester != ''
-            ORDER BY semester DESC
-            """)
-            
-            semesters = [row['semester'] for row in self.db.fetchall()]
+            semesters = cached_query(self.db, 'semester_list', (TABLES['grades'],), self._load_semesters)
             return self.format_response(True, data=semesters)
         except Exception as e:
             logger.error(f"获取学期列表失败: {e}")
-            return self.format_response(False, message=f"获取学期列表失败: {str(e)}")
\ No newline at end of file
+            return self.format_response(False, message=f"获取学期列表失败: {str(e)}")
+    
+    def _load_semesters(self):
+        """查询所有不同的学期"""
+        self.db.execute("""
+        SELECT DISTINCT semester
+        FROM grades
+        WHERE semester IS NOT NULL AND semester != ''
+        ORDER BY semester DESC
+        """)
+        
+        return [row['semester'] for row in self.db.fetchall()]
\ No newline at end of file
@@ -2,12 +2,19 @@
 成绩控制器模块
 """
 import logging
+import sqlite3
 from datetime import datetime
 
-from controllers.base_controller import BaseController
+from controllers.base_controller import BaseController, unit_of_work
 from models.grade import Grade
 from models.student import Student
 from models.course import Course
+from models.ranking import Ranking
+from models.grade_cube import DIMENSIONS, get_grade_cube, rebuild_grade_cube
+from config.database import TABLES
+from config.settings import IMPORT_PLAN_SAMPLE_LIMIT
+from utils import analytics, import_validation, transcript_export
+from utils.cache import cached_query, ranking_cache
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +33,9 @@ class GradeController(BaseController):
         self.grade_model = Grade(self.db)
         self.student_model = Student(self.db)
         self.course_model = Course(self.db)
+        self.ranking_model = Ranking(self.db)
     
+    @unit_of_work
     def add_grade(self, grade_data):
         """
         添加新成绩
@@ -80,6 +89,7 @@ class GradeController(BaseController):
         else:
             return self.format_response(False, message="添加成绩失败，可能是该学生在该学期已有该课程的成绩记录")
     
+    @unit_of_work
     def update_grade(self, grade_id, update_data):
         """
         更新成绩
@@ -128,6 +138,7 @@ class GradeController(BaseController):
         else:
             return self.format_response(False, message="更新成绩失败")
     
+    @unit_of_work
     def update_grade_by_keys(self, student_id, course_id, semester, update_data):
         """
         通过学号、课程编号和学期更新成绩
@@ -178,6 +189,7 @@ class GradeController(BaseController):
         else:
             return self.format_response(False, message="更新成绩失败")
     
+    @unit_of_work
     def delete_grade(self, grade_id):
         """
         删除成绩记录
@@ -316,9 +328,97 @@ class GradeController(BaseController):
         # 添加学生信息
         gpa_data['student_name'] = student['name']
         gpa_data['class_name'] = student['class_name']
-        
+
         return self.format_response(True, data=gpa_data)
     
+    def get_student_transcript(self, student_id):
+        """
+        获取学生成绩单，包含所有课程成绩、每学期GPA和加权平均分以及累计GPA
+        
+        参数:
+            student_id (str): 学号
+        
+        返回:
+            dict: 响应结果
+        """
+        # 检查权限
+        if not self.check_permission('student'):
+            return self.format_response(False, message="权限不足，需要登录")
+        
+        # 如果当前用户是学生，只能查看自己的成绩单
+        if self.user_role == 'student' and self.username != student_id:
+            return self.format_response(False, message="权限不足，学生只能查看自己的成绩单")
+        
+        transcripts = self.grade_model.get_transcripts(student_ids=[student_id])
+        if not transcripts:
+            return self.format_response(False, message=f"未找到学号为 {student_id} 的学生")
+        
+        return self.format_response(True, data=transcripts[0])
+    
+    def get_transcripts(self, student_ids=None, class_name=None):
+        """
+        批量获取成绩单，用于打印多名学生或整个班级的成绩单
+        
+        参数:
+            student_ids (list, optional): 学号列表
+            class_name (str, optional): 班级
+        
+        返回:
+            dict: 响应结果
+        """
+        # 检查权限
+        if not self.check_permission('teacher'):
+            return self.format_response(False, message="权限不足，需要教师或管理员权限")
+        
+        if not student_ids and not class_name:
+            return self.format_response(False, message="学号列表和班级不能同时为空")
+        
+        transcripts = self.grade_model.get_transcripts(student_ids, class_name)
+        return self.format_response(True, data=transcripts)
+    
+    def export_transcripts(self, output_dir=None, class_name=None, formats=None, jobs=None, resume=False, progress=None):
+        """
+        批量导出成绩单文件，用于毕业等需要为整届学生生成成绩单的场景
+        
+        参数:
+            output_dir (str, optional): 输出目录，默认为 data/exports/transcripts
+            class_name (str, optional): 班级，不提供时导出所有学生
+            formats (tuple, optional): 成绩单格式，默认为 csv 和 html
+            jobs (int, optional): 渲染进程数
+            resume (bool): 是否跳过清单中已完成的学生
+            progress (callable, optional): 进度回调，参数为 (已处理人数, 总人数)
+        
+        返回:
+            dict: 响应结果
+        """
+        # 检查权限
+        if not self.check_permission('admin'):
+            return self.format_response(False, message="权限不足，需要管理员权限")
+        
+        try:
+            summary = transcript_export.export_transcripts(
+                self.db,
+                output_dir or transcript_export.TRANSCRIPT_EXPORT_DIR,
+                class_name,
+                formats or transcript_export.TRANSCRIPT_FORMATS,
+                jobs or transcript_export.TRANSCRIPT_EXPORT_JOBS,
+                resume,
+                progress
+            )
+        except (ValueError, OSError) as e:
+            logger.error(f"批量导出成绩单失败: {e}")
+            return self.format_response(False, message=f"批量导出成绩单失败: {str(e)}")
+        
+        self.log_operation(
+            operation="导出成绩单",
+            target=class_name or "所有学生",
+            details=f"写入 {summary['written']} 份成绩单，跳过 {summary['skipped']}，失败 {summary['failed']}，清单: {summary['manifest']}"
+        )
+        if summary['failed']:
+            return self.format_response(False, data=summary,
+                                        message=f"有 {summary['failed']} 名学生的成绩单生成失败，可选择续传重新生成")
+        return self.format_response(True, data=summary, message=f"成绩单导出完成，共写入 {summary['written']} 份")
+    
     def get_course_statistics(self, course_id, semester):
         """
         获取课程统计信息
@@ -349,10 +449,13 @@ class GradeController(BaseController):
         
         return self.format_response(True, data=stats)
     
+    @unit_of_work
     def import_grades(self, grades_data):
         """
         批量导入成绩
         
+        行数较多时先在进程池中并行校验，再在一个事务中写入所有通过校验的成绩。
+        
         参数:
             grades_data (list): 成绩数据列表
         
@@ -366,71 +469,11 @@ class GradeController(BaseController):
         if not grades_data:
             return self.format_response(False, message="没有提供成绩数据")
         
-        success_count = 0
-        failed_count = 0
-        failed_records = []
+        with self.db.transaction():
+            success_count, failed_rows = self._import_grade_rows(grades_data)
         
-        for grade_data in grades_data:
-            # 验证必填字段
-            required_fields = ['student_id', 'course_id', 'semester', 'score']
-            valid, error_message = self.validate_required_fields(grade_data, required_fields)
-            
-            if not valid:
-                failed_count += 1
-                failed_records.append({
-                    'data': grade_data,
-                    'reason': error_message
-                })
-                continue
-            
-            # 验证学生是否存在
-            student = self.student_model.get_student(grade_data['student_id'])
-            if not student:
-                failed_count += 1
-                failed_records.append({
-                    'data': grade_data,
-                    'reason': f"未找到学号为 {grade_data['student_id']} 的学生"
-                })
-                continue
-            
-            # 验证课程是否存在
-            course = self.course_model.get_course(grade_data['course_id'])
-            if not course:
-                failed_count += 1
-                failed_records.append({
-                    'data': grade_data,
-                    'reason': f"未找到课程编号为 {grade_data['course_id']} 的课程"
-                })
-                continue
-            
-            # 验证分数
-            try:
-                score = float(grade_data['score'])
-                if score < 0 or score > 100:
-                    failed_count += 1
-                    failed_records.append({
-                        'data': grade_data,
-                        'reason': "分数必须在0-100之间"
-                    })
-                    continue
-                grade_data['score'] = score
-            except ValueError:
-                failed_count += 1
-                failed_records.append({
-                    'data': grade_data,
-                    'reason': "分数必须为数字"
-                })
-                continue
-            
-            # 添加成绩
-            if self.grade_model.add_grade(grade_data):
-                success_count += 1
-            else:
-                failed_count += 1
-                failed_records.append({
-                    'data': grade_data,
-                    'reason': "添加失败，可能是该学生在该学期已有该课程的成绩记录"
-                })
+        failed_count = len(failed_rows)
+        failed_records = [{'data': grades_data[index], 'reason': reason} for index, reason in failed_rows]
         
         # 记录操作日志
         self.log_operation(
@@ -448,7 +491,210 @@ class GradeController(BaseController):
             },
             message=f"成功导入 {success_count} 条成绩记录，失败 {failed_count} 条"
         )
+    
+    def import_grade_chunk(self, grades_data):
+        """
+        导入流式导入中的一批成绩
+        
+        在调用方的事务中执行，不提交事务，也不记录操作日志。
+        
+        参数:
+            grades_data (list): 一批成绩数据
+        
+        返回:
+            dict: 响应结果，data 包含 success_count 和 failed_rows(失败行在本批中的序号和原因)
+        """
+        # 检查权限
+        if not self.check_permission('teacher'):
+            return self.format_response(False, message="权限不足，需要教师或管理员权限")
+        
+        success_count, failed_rows = self._import_grade_rows(grades_data)
+        return self.format_response(True, data={'success_count': success_count, 'failed_rows': failed_rows})
+    
+    def _import_grade_rows(self, grades_data):
+        """
+        校验并写入成绩数据，不提交事务
+        
+        行数据本身的校验可以并行执行；学生和课程是否存在按批查询，成绩批量插入。
+        
+        参数:
+            grades_data (list): 成绩数据列表
+        
+        返回:
+            tuple: (成功数量, 按行序排列的 [(行序号, 失败原因)])
+        """
+        failed_rows = []
+        checked_rows = []
+        for index, (reason, score) in enumerate(import_validation.validate_rows('grades', grades_data)):
+            if reason:
+                failed_rows.append((index, reason))
+            else:
+                checked_rows.append((index, dict(grades_data[index], score=score)))
+        
+        existing_students = self.student_model.get_existing_ids([row['student_id'] for _, row in checked_rows])
+        existing_courses = self.course_model.get_existing_ids([row['course_id'] for _, row in checked_rows])
+        
+        valid_rows = []
+        for index, grade_data in checked_rows:
+            if grade_data['student_id'] not in existing_students:
+                failed_rows.append((index, f"未找到学号为 {grade_data['student_id']} 的学生"))
+            elif grade_data['course_id'] not in existing_courses:
+                failed_rows.append((index, f"未找到课程编号为 {grade_data['course_id']} 的课程"))
+            else:
+                valid_rows.append((index, grade_data))
+        
+        results = self.grade_model.insert_import_rows([grade_data for _, grade_data in valid_rows])
+        for (index, _), inserted in zip(valid_rows, results):
+            if not inserted:
+                failed_rows.append((index, "该学生在该学期已有该课程的成绩记录"))
+        failed_rows.sort()
+        return len(grades_data) - len(failed_rows), failed_rows
+        
+    @unit_of_work
+    def plan_grade_import(self, grades_data, sample_limit=IMPORT_PLAN_SAMPLE_LIMIT):
+        """
+        预览成绩导入：不写入数据库，统计将新增、更新、保持不变和校验失败的行数
+        
+        参数:
+            grades_data (list): 成绩数据列表
+            sample_limit (int): 返回的更新明细条数
+        
+        返回:
+            dict: 响应结果，data 包含各类行数、更新明细(原分数和新分数)和失败记录
+        """
+        # 检查权限
+        if not self.check_permission('teacher'):
+            return self.format_response(False, message="权限不足，需要教师或管理员权限")
+        
+        if not grades_data:
+            return self.format_response(False, message="没有提供成绩数据")
+        
+        plan = self._plan_grade_rows(grades_data)
+        summary = self._plan_summary(plan, grades_data, sample_limit)
+        return self.format_response(True, data=summary, message=self._plan_message(summary))
+    
+    @unit_of_work
+    def apply_grade_import(self, grades_data):
+        """
+        导入成绩并更新已有的成绩记录
+        
+        在一个事务中重新计算导入计划并写入：新的成绩批量插入，分数、考试日期或备注不同的已有成绩批量更新，
+        计划与写入之间不会有其他写入者修改这些成绩。
+        
+        参数:
+            grades_data (list): 成绩数据列表
+        
+        返回:
+            dict: 响应结果，data 与 import_grades 相同，另含 insert_count、update_count 和 unchanged_count
+        """
+        # 检查权限
+        if not self.check_permission('teacher'):
+            return self.format_response(False, message="权限不足，需要教师或管理员权限")
+        
+        if not grades_data:
+            return self.format_response(False, message="没有提供成绩数据")
+        
+        with self.db.transaction():
+            plan = self._plan_grade_rows(grades_data)
+            results = self.grade_model.insert_import_rows([grade_data for _, grade_data in plan['insert']])
+            self.grade_model.update_import_rows([grade_data for _, grade_data, _ in plan['update']])
+        
+        # 计划在持有写锁的事务中计算，新增行不会被其他写入者抢先插入，这里只做防御性检查
+        for (index, _), inserted in zip(plan['insert'], results):
+            if not inserted:
+                plan['errors'].append((index, "该学生在该学期已有该课程的成绩记录"))
+        plan['insert'] = [row for row, inserted in zip(plan['insert'], results) if inserted]
+        plan['errors'].sort()
+        
+        summary = self._plan_summary(plan, grades_data, 0)
+        success_count = summary['insert_count'] + summary['update_count']
+        message = f"新增 {summary['insert_count']} 条成绩记录，更新 {summary['update_count']} 条，" \
+                  f"未变化 {summary['unchanged_count']} 条，失败 {summary['failed_count']} 条"
+        
+        # 记录操作日志
+        self.log_operation(operation="批量导入成绩", target="成绩批量导入", details=message)
+        
+        summary['success_count'] = success_count
+        return self.format_response(True, data=summary, message=message)
+    
+    def _plan_grade_rows(self, grades_data):
+        """
+        计算成绩导入计划
+        
+        校验行数据并按批查询学生、课程和已有成绩后在内存中比较，每行归入新增、更新、不变或失败。
+        同一文件中重复的 (学号, 课程编号, 学期) 只采用第一次出现的行。
+        
+        参数:
+            grades_data (list): 成绩数据列表
+        
+        返回:
+            dict: insert 为 [(行序号, 成绩数据)]，update 为 [(行序号, 成绩数据, 原成绩记录)]，
+                  unchanged 为行序号列表，errors 为 [(行序号, 失败原因)]
+        """
+        plan = {'insert': [], 'update': [], 'unchanged': [], 'errors': []}
+        checked_rows = []
+        for index, (reason, score) in enumerate(import_validation.validate_rows('grades', grades_data)):
+            if reason:
+                plan['errors'].append((index, reason))
+            else:
+                checked_rows.append((index, dict(grades_data[index], score=score)))
+        
+        existing_students = self.student_model.get_existing_ids([row['student_id'] for _, row in checked_rows])
+        existing_courses = self.course_model.get_existing_ids([row['course_id'] for _, row in checked_rows])
+        existing_grades = self.grade_model.get_grades_by_keys(
+            [(row['student_id'], row['course_id'], row['semester']) for _, row in checked_rows]
+        )
         
+        seen = {}
+        for index, grade_data in checked_rows:
+            key = (grade_data['student_id'], grade_data['course_id'], grade_data['semester'])
+            old = existing_grades.get(key)
+            if grade_data['student_id'] not in existing_students:
+                plan['errors'].append((index, f"未找到学号为 {grade_data['student_id']} 的学生"))
+            elif grade_data['course_id'] not in existing_courses:
+                plan['errors'].append((index, f"未找到课程编号为 {grade_data['course_id']} 的课程"))
+            elif key in seen:
+                plan['errors'].append((index, f"与第 {seen[key] + 1} 条记录重复"))
+            elif old is None:
+                plan['insert'].append((index, grade_data))
+            elif self._grade_changed(old, grade_data):
+                plan['update'].append((index, grade_data, old))
+            else:
+                plan['unchanged'].append(index)
+            seen.setdefault(key, index)
+        plan['errors'].sort()
+        return plan
+    
+    def _grade_changed(self, old, grade_data):
+        """导入的成绩与已有记录相比是否有变化，考试日期和备注为空时不覆盖原值"""
+        if float(old['score']) != grade_data['score']:
+            return True
+        for field in ('exam_date', 'remarks'):
+            value = grade_data.get(field) or None
+            if value is not None and value != old[field]:
+                return True
+        return False
+    
+    def _plan_summary(self, plan, grades_data, sample_limit):
+        """将导入计划整理为响应数据"""
+        return {
+            'total': len(grades_data),
+            'insert_count': len(plan['insert']),
+            'update_count': len(plan['update']),
+            'unchanged_count': len(plan['unchanged']),
+            'failed_count': len(plan['errors']),
+            'updates': [
+                {'data': grades_data[index], 'old_score': old['score'], 'new_score': grade_data['score']}
+                for index, grade_data, old in plan['update'][:sample_limit]
+            ],
+            'failed_records': [{'data': grades_data[index], 'reason': reason} for index, reason in plan['errors']]
+        }
+    
+    def _plan_message(self, summary):
+        """导入计划的摘要信息"""
+        return f"共 {summary['total']} 条记录：将新增 {summary['insert_count']} 条，更新 {summary['update_count']} 条，" \
+               f"未变化 {summary['unchanged_count']} 条，校验失败 {summary['failed_count']} 条"
+    
     def get_all_grades(self, filters=None, page=1, page_size=20, order_by='id'):
         """
         获取成绩列表
@@ -551,4 +797,205 @@ class GradeController(BaseController):
             return self.format_response(True, data=stats)
         except Exception as e:
             logger.error(f"获取成绩统计数据失败: {e}")
-            return self.format_response(False, message=f"获取成绩统计数据失败: {str(e)}")
\ No newline at end of file
+            return self.format_response(False, message=f"获取成绩统计数据失败: {str(e)}")
+    
+    def get_grade_analytics(self, filters=None, edges=None, include_records=False):
+        """
+        获取成绩分布分析：中位数、标准差、四分位数、自定义分数段，以及每条成绩的标准分和百分位排名
+        
+        参数:
+            filters (dict): 过滤条件
+            edges (tuple, optional): 分数段边界，默认为 0,60,70,80,90,100
+            include_records (bool): 是否返回每条成绩的标准分和百分位排名
+        
+        返回:
+            dict: 响应结果
+        """
+        # 检查权限
+        if not self.check_permission('teacher'):
+            return self.format_response(False, message="权限不足，需要教师或管理员权限")
+        
+        try:
+            rows = self.grade_model.get_analytics_rows(filters)
+            scores = [row['score'] for row in rows]
+            result = analytics.describe(
+                scores,
+                credits=[row['credit'] or 0 for row in rows],
+                grade_points=[row['grade_point'] or 0 for row in rows],
+                edges=edges or analytics.DEFAULT_EDGES
+            )
+            result['student_count'] = len({row['student_id'] for row in rows})
+            
+            if include_records:
+                for row, z_score, percentile in zip(rows, analytics.z_scores(scores), analytics.percentile_ranks(scores)):
+                    row['z_score'] = z_score
+                    row['percentile_rank'] = percentile
+                result['records'] = sorted(rows, key=lambda row: row['score'], reverse=True)
+            
+            return self.format_response(True, data=result)
+        except Exception as e:
+            logger.error(f"获取成绩分布分析失败: {e}")
+            return self.format_response(False, message=f"获取成绩分布分析失败: {str(e)}")
+    
+    def get_grade_cube(self, filters=None, group_by=None):
+        """
+        获取成绩多维分析：按 学期、班级、课程、授课教师、性别 任意组合切片，并按其中一个维度分组汇总
+        
+        参数:
+            filters (dict): 维度过滤条件 {维度: 取值}
+            group_by (str, optional): 分组维度，不提供时只返回整体汇总
+        
+        返回:
+            dict: 响应结果，包含分组统计、整体汇总和各维度的可选取值
+        """
+        # 检查权限
+        if not self.check_permission('teacher'):
+            return self.format_response(False, message="权限不足，需要教师或管理员权限")
+        
+        if group_by and group_by not in DIMENSIONS:
+            return self.format_response(False, message=f"不支持的分组维度: {group_by}")
+        
+        try:
+            cube = get_grade_cube(self.db)
+            filters = {key: value for key, value in (filters or {}).items() if key in DIMENSIONS and value}
+            total = cube.query(filters)
+            return self.format_response(True, data={
+                'filters': filters,
+                'group_by': group_by,
+                'total': total[0] if total else None,
+                'groups': cube.query(filters, group_by) if group_by else [],
+                'members': {dimension: cube.members(dimension) for dimension in DIMENSIONS},
+                'course_names': dict(cube.course_names)
+            })
+        except Exception as e:
+            logger.error(f"获取成绩多维分析失败: {e}")
+            return self.format_response(False, message=f"获取成绩多维分析失败: {str(e)}")
+    
+    def rebuild_statistics(self):
+        """
+        重建成绩统计数据：完整重建成绩立方体并清空排名缓存
+        
+        返回:
+            dict: 响应结果
+        """
+        # 检查权限
+        if not self.check_permission('teacher'):
+            return self.format_response(False, message="权限不足，需要教师或管理员权限")
+        
+        try:
+            cube = rebuild_grade_cube(self.db)
+        except Exception as e:
+            logger.error(f"重建统计数据失败: {e}")
+            return self.format_response(False, message=f"重建统计数据失败: {str(e)}")
+        ranking_cache.invalidate()
+        
+        self.log_operation(operation="重建统计数据", details=f"成绩立方体 {len(cube.facts)} 条成绩, {len(cube.cells)} 个单元格")
+        return self.format_response(True, data={'grades': len(cube.facts), 'cells': len(cube.cells)},
+                                    message=f"统计数据已重建，共 {len(cube.facts)} 条成绩")
+    
+    def recompute_grade_points(self, progress=None):
+        """
+        按配置的绩点表重新计算所有成绩的绩点，修改绩点表后执行
+        
+        成绩按批更新，各批更新的行由触发器记入数据版本和成绩变更日志，依赖成绩的缓存查询随之失效；
+        有成绩被更新时再完整重建成绩立方体并清空排名缓存，避免逐条应用大量变更。
+        
+        参数:
+            progress (callable, optional): 每批提交后调用，参数为 (已检查的成绩ID, 最大成绩ID, 已更新行数)
+        
+        返回:
+            dict: 响应结果，data 包含 updated(更新的成绩数)
+        """
+        # 检查权限
+        if not self.check_permission('admin'):
+            return self.format_response(False, message="权限不足，需要管理员权限")
+        
+        try:
+            updated = self.grade_model.recompute_grade_points(progress=progress)
+        except sqlite3.Error as e:
+            logger.error(f"重新计算绩点失败: {e}")
+            return self.format_response(False, message=f"重新计算绩点失败: {str(e)}")
+        
+        if updated:
+            rebuild_grade_cube(self.db)
+            ranking_cache.invalidate()
+        
+        self.log_operation(operation="重新计算绩点", details=f"按绩点表更新了 {updated} 条成绩的绩点")
+        return self.format_response(True, data={'updated': updated},
+                                    message=f"绩点已重新计算，更新了 {updated} 条成绩")
+    
+    def get_course_ranking(self, course_id, semester):
+        """
+        获取课程成绩排名，学生只能看到自己的名次
+        
+        参数:
+            course_id (str): 课程编号
+            semester (str): 学期
+        
+        返回:
+            dict: 响应结果
+        """
+        # 检查权限
+        if not self.check_permission('student'):
+            return self.format_response(False, message="权限不足，需要登录")
+        
+        if not course_id or not semester:
+            return self.format_response(False, message="课程编号和学期不能为空")
+        
+        course = self.course_model.get_course(course_id)
+        if not course:
+            return self.format_response(False, message=f"未找到课程编号为 {course_id} 的课程")
+        
+        try:
+            # 排名结果按成绩和学生数据版本缓存，成绩变化后自动重新计算
+            ranking = cached_query(
+                self.db, 'course_ranking', (TABLES['grades'], TABLES['students']),
+                self.ranking_model.get_course_ranking, course_id, semester, cache=ranking_cache
+            )
+            return self.format_response(True, data={
+                'course_id': course_id,
+                'course_name': course['course_name'],
+                'semester': semester,
+                'items': self._visible_ranking(ranking)
+            })
+        except Exception as e:
+            logger.error(f"获取课程排名失败: {e}")
+            return self.format_response(False, message=f"获取课程排名失败: {str(e)}")
+    
+    def get_class_ranking(self, class_name, semester=None):
+        """
+        获取班级GPA排名，学生只能看到自己的名次
+        
+        参数:
+            class_name (str): 班级
+            semester (str, optional): 学期，不提供时按所有学期计算
+        
+        返回:
+            dict: 响应结果
+        """
+        # 检查权限
+        if not self.check_permission('student'):
+            return self.format_response(False, message="权限不足，需要登录")
+        
+        if not class_name:
+            return self.format_response(False, message="班级不能为空")
+        
+        try:
+            ranking = cached_query(
+                self.db, 'class_ranking', (TABLES['grades'], TABLES['students'], TABLES['courses']),
+                self.ranking_model.get_class_ranking, class_name, semester or None, cache=ranking_cache
+            )
+            return self.format_response(True, data={
+                'class_name': class_name,
+                'semester': semester,
+                'items': self._visible_ranking(ranking)
+            })
+        except Exception as e:
+            logger.error(f"获取班级排名失败: {e}")
+            return self.format_response(False, message=f"获取班级排名失败: {str(e)}")
+    
+    def _visible_ranking(self, ranking):
+        """学生只保留自己的排名记录"""
+        if self.user_role == 'student':
+            return [item for item in ranking if item['student_id'] == self.username]
+        return ranking
\ No newline at end of file
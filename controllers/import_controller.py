@@ -0,0 +1,223 @@
+"""
+导入任务控制器模块
+"""
+import os
+import logging
+
+from controllers.base_controller import BaseController
+from controllers.lazy_controllers import load_controller_class
+from models.import_job import ImportJob
+from models.job import Job
+from config.settings import IMPORT_CHUNK_SIZE, JOB_STALE_SECONDS
+from utils import streaming_import
+from utils.job_runner import JobCancelled
+
+logger = logging.getLogger(__name__)
+
+# 导入类型与 (控制器名称, 每批的导入方法, 所需角色, 说明) 的对应关系
+IMPORT_KINDS = {
+    'grades': ('grade', 'import_grade_chunk', 'teacher', '成绩'),
+    'students': ('student', 'import_student_chunk', 'admin', '学生')
+}
+
+class ImportController(BaseController):
+    """导入任务控制器类，分批执行大文件的流式导入并记录进度"""
+    
+    def __init__(self, db, current_user=None):
+        """
+        初始化导入任务控制器
+        
+        参数:
+            db (Database): 数据库实例
+            current_user (dict): 当前用户信息
+        """
+        super().__init__(db, current_user)
+        self.import_job_model = ImportJob(self.db)
+        self.job_model = Job(self.db)
+    
+    def create_import_job(self, kind, file_path, filename):
+        """
+        为已保存的上传文件创建导入任务，并提交后台任务执行导入
+        
+        参数:
+            kind (str): 导入类型，grades 或 students
+            file_path (str): 保存的文件路径
+            filename (str): 上传的文件名
+        
+        返回:
+            dict: 响应结果，data 为导入任务ID
+        """
+        if kind not in IMPORT_KINDS:
+            return self.format_response(False, message=f"不支持的导入类型: {kind}")
+        
+        # 检查权限
+        if not self.check_permission(IMPORT_KINDS[kind][2]):
+            return self.format_response(False, message="权限不足")
+        
+        job_id = self.import_job_model.create_job({
+            'kind': kind,
+            'filename': filename,
+            'file_path': file_path,
+            'file_size': os.path.getsize(file_path),
+            'username': self.username,
+            'chunk_size': IMPORT_CHUNK_SIZE
+        })
+        if not job_id:
+            return self.format_response(False, message="创建导入任务失败")
+        
+        result = self._submit(job_id)
+        if not result['success']:
+            return result
+        return self.format_response(True, data=job_id, message="导入任务已提交")
+    
+    def run_import_job(self, job_id, context=None):
+        """
+        执行导入任务，从任务记录的位置开始逐批导入
+        
+        每批数据与任务进度在同一事务中提交。执行出错或被取消时任务标记为失败，已提交的批次保留，
+        再次执行时从最后提交的位置继续。
+        
+        参数:
+            job_id (int): 任务ID
+            context (JobContext, optional): 后台任务上下文，每批提交后报告进度并检查取消请求
+        
+        返回:
+            dict: 响应结果
+        """
+        job = self.import_job_model.get_job(job_id)
+        if not job:
+            return self.format_response(False, message=f"未找到导入任务 {job_id}")
+        if job['status'] == 'completed':
+            return self.format_response(False, message="导入任务已完成")
+        
+        controller_name, method_name, required_role, label = IMPORT_KINDS[job['kind']]
+        if not self.check_permission(required_role):
+            return self.format_response(False, message="权限不足")
+        
+        import_chunk = getattr(load_controller_class(controller_name)(self.db, self.current_user), method_name)
+        self.import_job_model.set_status(job_id, 'running')
+        rows_processed = job['rows_processed']
+        try:
+            for fieldnames, rows, position in streaming_import.read_csv_chunks(
+                    job['file_path'], job['byte_offset'], job['fieldnames'], job['chunk_size']):
+                with self.db.transaction():
+                    result = import_chunk(rows)
+                    if not result['success']:
+                        raise RuntimeError(result['message'])
+                    failed_rows = [(rows_processed + index + 1, rows[index], reason)
+                                   for index, reason in result['data']['failed_rows']]
+                    self.import_job_model.record_chunk(job_id, fieldnames, position, len(rows),
+                                                       result['data']['success_count'], failed_rows)
+                rows_processed += len(rows)
+                if context:
+                    context.progress(position, job['file_size'], f"已处理 {rows_processed} 行")
+        except JobCancelled:
+            self.import_job_model.set_status(job_id, 'failed', "导入已取消")
+            raise
+        except Exception as e:
+            logger.error(f"导入任务 {job_id} 在第 {rows_processed} 行之后出错: {e}")
+            self.import_job_model.set_status(job_id, 'failed', str(e))
+            return self.format_response(False, message=f"导入出错，可从第 {rows_processed + 1} 行继续: {e}")
+        
+        self.import_job_model.set_status(job_id, 'completed')
+        try:
+            os.remove(job['file_path'])
+        except OSError as e:
+            logger.warning(f"删除导入文件失败: {e}")
+        
+        job = self.import_job_model.get_job(job_id)
+        # 结果保存在后台任务中并返回给提交者，不包含服务器上的文件路径
+        job.pop('file_path', None)
+        message = f"成功导入 {job['success_count']} 条{label}记录，失败 {job['failed_count']} 条"
+        self.log_operation(
+            operation=f"批量导入{label}",
+            target=f"{label}导入任务 {job_id}",
+            details=f"{job['filename']}: {message}"
+        )
+        return self.format_response(True, data=job, message=message)
+    
+    def get_import_job(self, job_id, error_limit=100):
+        """
+        获取导入任务的进度和失败的行
+        
+        参数:
+            job_id (int): 任务ID
+            error_limit (int): 返回的失败行数
+        
+        返回:
+            dict: 响应结果
+        """
+        job = self._get_visible_job(job_id)
+        if not job:
+            return self.format_response(False, message=f"未找到导入任务 {job_id}")
+        
+        job.pop('file_path', None)
+        job['progress'] = round(job['byte_offset'] * 100 / job['file_size'], 1) if job['file_size'] else 100.0
+        if job['status'] == 'completed':
+            job['progress'] = 100.0
+        job['resumable'] = self._is_resumable(job)
+        job['errors'] = self.import_job_model.get_errors(job_id, error_limit)
+        return self.format_response(True, data=job)
+    
+    def get_import_jobs(self, limit=20):
+        """
+        获取最近的导入任务，管理员可以看到所有用户的任务
+        
+        参数:
+            limit (int): 返回的任务数
+        
+        返回:
+            dict: 响应结果
+        """
+        if not self.current_user:
+            return self.format_response(False, message="请先登录")
+        
+        username = None if self.check_permission('admin') else self.username
+        jobs = self.import_job_model.get_jobs(username, limit)
+        for job in jobs:
+            job['resumable'] = self._is_resumable(job)
+        return self.format_response(True, data=jobs)
+    
+    def resume_import_job(self, job_id):
+        """
+        在后台继续执行失败或中断的导入任务
+        
+        参数:
+            job_id (int): 任务ID
+        
+        返回:
+            dict: 响应结果
+        """
+        job = self._get_visible_job(job_id)
+        if not job:
+            return self.format_response(False, message=f"未找到导入任务 {job_id}")
+        if not self._is_resumable(job):
+            return self.format_response(False, message="导入任务正在执行或已完成")
+        if not os.path.exists(job['file_path']):
+            return self.format_response(False, message="导入文件已不存在，请重新上传")
+        
+        result = self._submit(job_id)
+        if not result['success']:
+            return result
+        return self.format_response(True, data=job_id, message=f"导入任务将从第 {job['rows_processed'] + 1} 行继续")
+    
+    def _submit(self, job_id):
+        """提交执行导入任务的后台任务"""
+        return load_controller_class('job')(self.db, self.current_user).submit_job('import', {'import_job_id': job_id})
+    
+    def _get_visible_job(self, job_id):
+        """获取当前用户可以查看的任务，只有发起人和管理员可以查看"""
+        if not self.current_user:
+            return None
+        job = self.import_job_model.get_job(job_id)
+        if job and (job['username'] == self.username or self.check_permission('admin')):
+            return job
+        return None
+    
+    def _is_resumable(self, job):
+        """任务失败，或者尚未完成但没有排队或执行中的后台任务(如服务重启后)时可以继续"""
+        if job['status'] == 'failed':
+            return True
+        if job['status'] == 'completed':
+            return False
+        return not self.job_model.has_active_job('import', 'import_job_id', job['id'], JOB_STALE_SECONDS)
\ No newline at end of file
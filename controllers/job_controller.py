@@ -0,0 +1,194 @@
+"""
+后台任务控制器模块
+"""
+import logging
+from datetime import datetime, timezone
+
+from controllers.base_controller import BaseController
+from controllers.lazy_controllers import LazyControllers
+from models.job import Job
+from config.settings import JOB_STALE_SECONDS
+from utils.job_runner import JobCancelled, get_job_runner
+
+logger = logging.getLogger(__name__)
+
+# 任务类型与 (说明, 提交所需角色) 的对应关系，执行方法为 JobController._run_<任务类型>
+JOB_KINDS = {
+    'import': ('导入数据', 'teacher'),
+    'export_transcripts': ('批量导出成绩单', 'admin'),
+    'rebuild_statistics': ('重建统计数据', 'teacher'),
+    'recompute_grade_points': ('重新计算绩点', 'admin'),
+    'clear_logs': ('清除旧日志', 'admin')
+}
+
+class JobController(BaseController):
+    """后台任务控制器类，提交、查询、取消和执行后台任务"""
+    
+    def __init__(self, db, current_user=None):
+        """
+        初始化后台任务控制器
+        
+        参数:
+            db (Database): 数据库实例
+            current_user (dict): 当前用户信息
+        """
+        super().__init__(db, current_user)
+        self.job_model = Job(self.db)
+    
+    def submit_job(self, kind, params=None):
+        """
+        提交后台任务，任务在后台线程中以当前用户的身份执行
+        
+        参数:
+            kind (str): 任务类型
+            params (dict, optional): 任务参数
+        
+        返回:
+            dict: 响应结果，data 为任务ID
+        """
+        if kind not in JOB_KINDS:
+            return self.format_response(False, message=f"不支持的任务类型: {kind}")
+        
+        label, required_role = JOB_KINDS[kind]
+        if not self.check_permission(required_role):
+            return self.format_response(False, message="权限不足")
+        
+        job_id = self.job_model.create_job(kind, params, self.username)
+        if not job_id:
+            return self.format_response(False, message="提交后台任务失败")
+        
+        get_job_runner(self.db.config).submit(job_id)
+        return self.format_response(True, data=job_id, message=f"{label}任务已提交")
+    
+    def get_job(self, job_id):
+        """
+        获取任务的状态、进度和结果，只有提交者和管理员可以查看
+        
+        参数:
+            job_id (int): 任务ID
+        
+        返回:
+            dict: 响应结果
+        """
+        job = self._get_visible_job(job_id)
+        if not job:
+            return self.format_response(False, message=f"未找到任务 {job_id}")
+        return self.format_response(True, data=self._describe(job))
+    
+    def get_jobs(self, limit=50):
+        """
+        获取最近的任务，管理员可以看到所有用户的任务
+        
+        参数:
+            limit (int): 返回的任务数
+        
+        返回:
+            dict: 响应结果
+        """
+        if not self.current_user:
+            return self.format_response(False, message="请先登录")
+        
+        username = None if self.check_permission('admin') else self.username
+        jobs = [self._describe(job) for job in self.job_model.get_jobs(username, limit)]
+        return self.format_response(True, data=jobs)
+    
+    def cancel_job(self, job_id):
+        """
+        取消任务，排队中的任务直接取消，执行中的任务在下次报告进度时停止
+        
+        参数:
+            job_id (int): 任务ID
+        
+        返回:
+            dict: 响应结果
+        """
+        job = self._get_visible_job(job_id)
+        if not job:
+            return self.format_response(False, message=f"未找到任务 {job_id}")
+        if not self.job_model.request_cancel(job_id):
+            return self.format_response(False, message="任务已结束")
+        
+        self.log_operation(operation="取消后台任务", target=f"任务 {job_id}", details=JOB_KINDS[job['kind']][0])
+        return self.format_response(True, message="已请求取消任务")
+    
+    def run_job(self, job_id, context):
+        """
+        执行已认领的任务并记录结果，由任务执行器在后台线程中调用
+        
+        参数:
+            job_id (int): 任务ID
+            context (JobContext): 任务上下文
+        
+        返回:
+            dict: 任务方法的响应结果
+        """
+        job = self.job_model.get_job(job_id)
+        try:
+            result = getattr(self, f"_run_{job['kind']}")(job['params'], context)
+        except JobCancelled:
+            self.job_model.finish_job(job_id, 'cancelled', "任务已取消")
+            return self.format_response(False, message="任务已取消")
+        except Exception as e:
+            logger.error(f"后台任务 {job_id} ({job['kind']}) 执行出错: {e}", exc_info=True)
+            self.job_model.finish_job(job_id, 'failed', f"任务执行出错: {e}")
+            return self.format_response(False, message=f"任务执行出错: {e}")
+        
+        status = 'succeeded' if result['success'] else 'failed'
+        self.job_model.finish_job(job_id, status, result['message'], result['data'])
+        return result
+    
+    def _run_import(self, params, context):
+        """执行流式导入任务"""
+        return self._controllers()['import'].run_import_job(params['import_job_id'], context)
+    
+    def _run_export_transcripts(self, params, context):
+        """批量导出成绩单"""
+        return self._controllers()['grade'].export_transcripts(
+            class_name=params.get('class_name') or None,
+            formats=tuple(params['formats']) if params.get('formats') else None,
+            resume=bool(params.get('resume')),
+            progress=lambda processed, total: context.progress(processed, total, f"已处理 {processed}/{total} 名学生")
+        )
+    
+    def _run_rebuild_statistics(self, params, context):
+        """重建成绩统计数据"""
+        return self._controllers()['grade'].rebuild_statistics()
+    
+    def _run_recompute_grade_points(self, params, context):
+        """按绩点表重新计算成绩绩点"""
+        return self._controllers()['grade'].recompute_grade_points(
+            progress=lambda position, total, updated: context.progress(position, total, f"已更新 {updated} 条成绩")
+        )
+    
+    def _run_clear_logs(self, params, context):
+        """清除旧日志"""
+        return self._controllers()['log'].clear_old_logs(int(params.get('days', 365)))
+    
+    def _controllers(self):
+        """以当前用户身份创建执行任务所需的控制器"""
+        return LazyControllers(self.db, self.current_user)
+    
+    def _get_visible_job(self, job_id):
+        """获取当前用户可以查看的任务"""
+        if not self.current_user:
+            return None
+        job = self.job_model.get_job(job_id)
+        if job and (job['username'] == self.username or self.check_permission('admin')):
+            return job
+        return None
+    
+    def _describe(self, job):
+        """为任务添加说明、进度百分比和是否已中断"""
+        job['label'] = JOB_KINDS.get(job['kind'], (job['kind'],))[0]
+        if job['status'] == 'succeeded':
+            job['percent'] = 100.0
+        elif job['progress_total']:
+            job['percent'] = round(job['progress_current'] * 100 / job['progress_total'], 1)
+        else:
+            job['percent'] = None
+        job['stale'] = False
+        if job['status'] == 'running':
+            # CURRENT_TIMESTAMP 写入的是UTC时间
+            updated_at = datetime.strptime(job['updated_at'], '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+            job['stale'] = (datetime.now(timezone.utc) - updated_at).total_seconds() > JOB_STALE_SECONDS
+        return job
\ No newline at end of file
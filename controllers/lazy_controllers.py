@@ -0,0 +1,94 @@
+"""
+控制器集合模块，控制器及其依赖的模型模块在第一次使用时才导入和创建
+"""
+import logging
+import importlib
+
+logger = logging.getLogger(__name__)
+
+# 控制器名称与 (模块, 类名) 的对应关系
+CONTROLLER_MODULES = {
+    'student': ('controllers.student_controller', 'StudentController'),
+    'course': ('controllers.course_controller', 'CourseController'),
+    'grade': ('controllers.grade_controller', 'GradeController'),
+    'user': ('controllers.user_controller', 'UserController'),
+    'log': ('controllers.log_controller', 'LogController'),
+    'schedule': ('controllers.schedule_controller', 'ScheduleController'),
+    'import': ('controllers.import_controller', 'ImportController'),
+    'job': ('controllers.job_controller', 'JobController')
+}
+
+def load_controller_class(name):
+    """
+    导入控制器类
+    
+    参数:
+        name (str): 控制器名称
+    
+    返回:
+        type: 控制器类，名称不存在时返回None
+    """
+    if name not in CONTROLLER_MODULES:
+        return None
+    module_name, class_name = CONTROLLER_MODULES[name]
+    return getattr(importlib.import_module(module_name), class_name)
+
+class LazyControllers:
+    """控制器集合，控制器在第一次使用时才创建"""
+    
+    def __init__(self, db, current_user=None):
+        """
+        初始化控制器集合
+        
+        参数:
+            db (Database): 数据库实例
+            current_user (dict, optional): 当前用户信息
+        """
+        self.db = db
+        self.current_user = current_user
+        self._controllers = {}
+    
+    def get(self, name):
+        """获取控制器，名称不存在时返回None"""
+        controller = self._controllers.get(name)
+        if controller is None:
+            controller_class = load_controller_class(name)
+            if controller_class is None:
+                return None
+            controller = self._controllers[name] = controller_class(self.db, self.current_user)
+            logger.debug(f"创建控制器: {name}")
+        return controller
+    
+    def __getitem__(self, name):
+        controller = self.get(name)
+        if controller is None:
+            raise KeyError(name)
+        return controller
+    
+    def __contains__(self, name):
+        return name in CONTROLLER_MODULES
+    
+    def __len__(self):
+        """已创建的控制器数量"""
+        return len(self._controllers)
+    
+    def __bool__(self):
+        # 尚未创建任何控制器时集合同样可用
+        return True
+    
+    def items(self):
+        """已创建的控制器"""
+        return self._controllers.items()
+    
+    def set_current_user(self, user):
+        """
+        设置当前用户，已创建的控制器同步更新，之后创建的控制器使用新用户
+        
+        参数:
+            user (dict): 用户信息
+        """
+        self.current_user = user
+        for controller in self._controllers.values():
+            controller.current_user = user
+            controller.username = user.get('username') if user else None
+            controller.user_role = user.get('role') if user else None
\ No newline at end of file
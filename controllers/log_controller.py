@@ -2,10 +2,12 @@
 日志控制器模块
 """
 import logging
+import sqlite3
 from datetime import datetime
 
 from controllers.base_controller import BaseController
 from models.log import Log
+from models.grade_cube import prune_change_log
 
 logger = logging.getLogger(__name__)
 
@@ -148,10 +150,17 @@ class LogController(BaseController):
         # 清除旧日志记录
         cleared_count = self.log_model.clear_old_logs(days)
         
+        # 同时清理较早的成绩变更日志，没有人查看多维分析时它不会被增量更新清理
+        try:
+            change_count = prune_change_log(self.db.connection)
+        except sqlite3.Error as e:
+            logger.error(f"清理成绩变更日志失败: {e}")
+            change_count = 0
+        
         # 记录操作日志
         self.log_operation(
             operation="清除旧日志",
-            details=f"清除了 {cleared_count} 条超过 {days} 天的旧日志记录"
+            details=f"清除了 {cleared_count} 条超过 {days} 天的旧日志记录，{change_count} 条较早的成绩变更日志"
         )
         
         return self.format_response(True, message=f"成功清除 {cleared_count} 条旧日志记录")
@@ -4,12 +4,30 @@
 import logging
 from datetime import datetime
 
-from controllers.base_controller import BaseController
+from config.settings import (ICS_CACHE_DIR, ICS_CACHE_TTL, ICS_TIMEZONE, ICS_UTC_OFFSET,
+                             SEMESTER_START_DATES, SEMESTER_EXCLUDED_DATES)
+from controllers.base_controller import BaseController, unit_of_work
 from models.schedule import Schedule
 from models.course import Course
+from utils.ical import build_calendar, semester_start_date, IcsFeedCache
 
 logger = logging.getLogger(__name__)
 
+# 课程节次配置
+SECTION_TIMES = {
+    1: {"start": "08:00", "end": "08:45"},
+    2: {"start": "08:55", "end": "09:40"},
+    3: {"start": "10:00", "end": "10:45"},
+    4: {"start": "10:55", "end": "11:40"},
+    5: {"start": "14:00", "end": "14:45"},
+    6: {"start": "14:55", "end": "15:40"},
+    7: {"start": "16:00", "end": "16:45"},
+    8: {"start": "16:55", "end": "17:40"},
+    9: {"start": "19:00", "end": "19:45"},
+    10: {"start": "19:55", "end": "20:40"},
+    11: {"start": "20:50", "end": "21:35"}
+}
+
 class ScheduleController(BaseController):
     """课程表控制器类，处理课程表相关的业务逻辑"""
     
@@ -25,6 +43,7 @@ class ScheduleController(BaseController):
         self.schedule_model = Schedule(self.db)
         self.course_model = Course(self.db)
     
+    @unit_of_work
     def add_schedule_item(self, schedule_data):
         """
         添加课程表项
@@ -67,6 +86,7 @@ class ScheduleController(BaseController):
             # 使用模型返回的具体错误信息
             return self.format_response(False, message=error_msg or "添加课程表项失败，请稍后重试或联系管理员")
     
+    @unit_of_work
     def update_schedule_item(self, schedule_id, update_data):
         """
         更新课程表项
@@ -261,6 +281,83 @@ class ScheduleController(BaseController):
         
         return self.format_response(True, data=semesters)
     
+    def export_ics(self, semester, teacher=None, student_id=None):
+        """
+        导出课程表为 iCalendar(.ics) 订阅源
+        
+        生成结果按订阅范围缓存在磁盘上，并以课程表版本戳作为校验，
+        缓存新鲜期内的重复请求不会查询课程表数据。
+        
+        参数:
+            semester (str): 学期
+            teacher (str, optional): 只导出该教师的课程
+            student_id (str, optional): 只导出该学生的课程
+        
+        返回:
+            dict: 响应结果，data 包含 content(日历文本)、version(版本戳)和 filename
+        """
+        # 检查权限
+        if not self.check_permission('student'):
+            return self.format_response(False, message="权限不足，需要登录")
+        
+        if not semester:
+            return self.format_response(False, message="学期不能为空")
+        
+        # 学生只能导出自己的课程表
+        if self.user_role == 'student':
+            if student_id and student_id != self.username:
+                return self.format_response(False, message="权限不足，学生只能导出自己的课程表")
+            student_id = self.username
+        
+        start_date = semester_start_date(semester, SEMESTER_START_DATES)
+        if not start_date:
+            return self.format_response(False, message=f"无法确定学期 {semester} 的开始日期，请在配置中设置")
+        
+        cache = IcsFeedCache(ICS_CACHE_DIR, ICS_CACHE_TTL)
+        cache_key = f"{semester}|teacher={teacher or ''}|student={student_id or ''}"
+        filename = f"schedule-{semester}.ics"
+        
+        # 新鲜期内直接返回缓存
+        content, version = cache.get_fresh(cache_key)
+        if content is not None:
+            return self.format_response(True, data={'content': content, 'version': version, 'filename': filename})
+        
+        # 版本戳未变化时复用缓存
+        version = self.schedule_model.get_schedule_version(semester)
+        if version is None:
+            return self.format_response(False, message="获取课程表版本失败")
+        
+        content = cache.get(cache_key, version)
+        if content is None:
+            filters = {}
+            if teacher:
+                filters['teacher'] = teacher
+            if student_id:
+                filters['student_id'] = student_id
+            
+            schedule_items = self.schedule_model.get_schedule(semester, filters)
+            
+            calendar_name = f"{semester} 课程表"
+            if teacher:
+                calendar_name = f"{teacher} {calendar_name}"
+            elif student_id:
+                calendar_name = f"{student_id} {calendar_name}"
+            
+            content = build_calendar(
+                schedule_items,
+                semester,
+                start_date,
+                SECTION_TIMES,
+                tzid=ICS_TIMEZONE,
+                utc_offset=ICS_UTC_OFFSET,
+                excluded_dates=SEMESTER_EXCLUDED_DATES.get(semester, []),
+                calendar_name=calendar_name
+            )
+            cache.put(cache_key, version, content)
+            logger.info(f"生成课程表日历: {cache_key}, 共 {len(schedule_items)} 个课程表项")
+        
+        return self.format_response(True, data={'content': content, 'version': version, 'filename': filename})
+    
     def _format_schedule_data(self, schedule_items):
         """
         将课程表数据格式化为前端所需格式
@@ -272,19 +369,7 @@ class ScheduleController(BaseController):
             dict: 格式化后的数据
         """
         # 课程节次配置
-        section_times = {
-            1: {"start": "08:00", "end": "08:45"},
-            2: {"start": "08:55", "end": "09:40"},
-            3: {"start": "10:00", "end": "10:45"},
-            4: {"start": "10:55", "end": "11:40"},
-            5: {"start": "14:00", "end": "14:45"},
-            6: {"start": "14:55", "end": "15:40"},
-            7: {"start": "16:00", "end": "16:45"},
-            8: {"start": "16:55", "end": "17:40"},
-            9: {"start": "19:00", "end": "19:45"},
-            10: {"start": "19:55", "end": "20:40"},
-            11: {"start": "20:50", "end": "21:35"}
-        }
+        section_times = SECTION_TIMES
         
         # 按天组织数据
         days = {day: [] for day in range(1, 8)}  # 1-7对应周一到周日
@@ -339,6 +424,7 @@ class ScheduleController(BaseController):
             ]
         }
     
+    @unit_of_work
     def batch_import_schedule(self, schedule_data_list):
         """
         批量导入课程表
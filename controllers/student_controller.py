@@ -3,10 +3,12 @@
 """
 import logging
 from datetime import datetime
-import re
 
-from controllers.base_controller import BaseController
+from config.database import TABLES
+from controllers.base_controller import BaseController, unit_of_work
 from models.student import Student
+from utils import import_validation
+from utils.cache import cached_query
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +26,7 @@ class StudentController(BaseController):
         super().__init__(db, current_user)
         self.student_model = Student(self.db)
     
+    @unit_of_work
     def add_student(self, student_data):
         """
         添加新学生
@@ -75,6 +78,7 @@ class StudentController(BaseController):
         else:
             return self.format_response(False, message="添加学生失败，可能是学号已存在")
     
+    @unit_of_work
     def update_student(self, student_id, update_data):
         """
         更新学生信息
@@ -117,6 +121,7 @@ class StudentController(BaseController):
         else:
             return self.format_response(False, message="更新学生信息失败")
     
+    @unit_of_work
     def delete_student(self, student_id):
         """
         删除学生
@@ -238,10 +243,13 @@ class StudentController(BaseController):
         
         return self.format_response(True, data=paginated_results)
     
+    @unit_of_work
     def import_students(self, students_data):
         """
         批量导入学生
         
+        行数较多时先在进程池中并行校验，再在一个事务中写入所有通过校验的学生。
+        
         参数:
             students_data (list): 学生数据列表
         
@@ -255,48 +263,11 @@ class StudentController(BaseController):
         if not students_data:
             return self.format_response(False, message="没有提供学生数据")
         
-        success_count = 0
-        failed_count = 0
-        failed_records = []
+        with self.db.transaction():
+            success_count, failed_rows = self._import_student_rows(students_data)
         
-        # 添加创建时间和更新时间
-        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        for student_data in students_data:
-            # 验证必填字段
-            required_fields = ['student_id', 'name']
-            valid, error_message = self.validate_required_fields(student_data, required_fields)
-            
-            if not valid:
-                failed_count += 1
-                failed_records.append({
-                    'data': student_data,
-                    'reason': error_message
-                })
-                continue
-            
-            # 验证学号格式
-            if not self._validate_student_id(student_data['student_id']):
-                failed_count += 1
-                failed_records.append({
-                    'data': student_data,
-                    'reason': "学号格式不正确，应为数字或字母组合"
-                })
-                continue
-            
-            # 添加时间戳
-            student_data['created_at'] = now
-            student_data['updated_at'] = now
-            
-            # 添加学生
-            if self.student_model.add_student(student_data):
-                success_count += 1
-            else:
-                failed_count += 1
-                failed_records.append({
-                    'data': student_data,
-                    'reason': "添加失败，可能是学号已存在"
-                })
+        failed_count = len(failed_rows)
+        failed_records = [{'data': students_data[index], 'reason': reason} for index, reason in failed_rows]
         
         # 记录操作日志
         self.log_operation(
@@ -315,6 +286,51 @@ class StudentController(BaseController):
             message=f"成功导入 {success_count} 名学生，失败 {failed_count} 名"
         )
     
+    def import_student_chunk(self, students_data):
+        """
+        导入流式导入中的一批学生
+        
+        在调用方的事务中执行，不提交事务，也不记录操作日志。
+        
+        参数:
+            students_data (list): 一批学生数据
+        
+        返回:
+            dict: 响应结果，data 包含 success_count 和 failed_rows(失败行在本批中的序号和原因)
+        """
+        # 检查权限
+        if not self.check_permission('admin'):
+            return self.format_response(False, message="权限不足，需要管理员权限")
+        
+        success_count, failed_rows = self._import_student_rows(students_data)
+        return self.format_response(True, data={'success_count': success_count, 'failed_rows': failed_rows})
+    
+    def _import_student_rows(self, students_data):
+        """
+        校验并写入学生数据，不提交事务
+        
+        参数:
+            students_data (list): 学生数据列表
+        
+        返回:
+            tuple: (成功数量, 按行序排列的 [(行序号, 失败原因)])
+        """
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        failed_rows = []
+        valid_rows = []
+        for index, (reason, _) in enumerate(import_validation.validate_rows('students', students_data)):
+            if reason:
+                failed_rows.append((index, reason))
+            else:
+                valid_rows.append((index, dict(students_data[index], created_at=now, updated_at=now)))
+        
+        results = self.student_model.insert_import_rows([student_data for _, student_data in valid_rows])
+        for (index, _), inserted in zip(valid_rows, results):
+            if not inserted:
+                failed_rows.append((index, "添加失败，可能是学号已存在或字段取值无效"))
+        failed_rows.sort()
+        return len(students_data) - len(failed_rows), failed_rows
+    
     def _validate_student_id(self, student_id):
         """
         验证学号格式
@@ -325,9 +341,7 @@ class StudentController(BaseController):
         返回:
             bool: 格式正确返回True，否则返回False
         """
-        # 学号应为字母和数字的组合，长度在3-20之间
-        pattern = r'^[A-Za-z0-9]{3,20}$'
-        return bool(re.match(pattern, student_id))
+        return import_validation.is_valid_student_id(student_id)
     
     def _validate_email(self, email):
         """
@@ -339,8 +353,7 @@ class StudentController(BaseController):
         返回:
             bool: 格式正确返回True，否则返回False
         """
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, email))
+        return import_validation.is_valid_email(email)
     
     def _validate_phone(self, phone):
         """
@@ -352,9 +365,7 @@ class StudentController(BaseController):
         返回:
             bool: 格式正确返回True，否则返回False
         """
-        # 简单验证中国大陆手机号
-        pattern = r'^1[3-9]\d{9}$'
-        return bool(re.match(pattern, phone))
+        return import_validation.is_valid_phone(phone)
         
     def get_class_list(self):
         """
@@ -368,16 +379,19 @@ class StudentController(BaseController):
             return self.format_response(False, message="权限不足，需要登录")
         
         try:
-            # 查询所有不同的班级名称
-            self.db.execute("""
-            SELECT DISTINCT class_name
-            FROM students
-            WHERE class_name IS NOT NULL AND class_name != ''
-            ORDER BY class_name
-            """)
-            
-            classes = [row['class_name'] for row in self.db.fetchall()]
+            classes = cached_query(self.db, 'class_list', (TABLES['students'],), self._load_classes)
             return self.format_response(True, data=classes)
         except Exception as e:
             logger.error(f"获取班级列表失败: {e}")
-            return self.format_response(False, message=f"获取班级列表失败: {str(e)}")
\ No newline at end of file
+            return self.format_response(False, message=f"获取班级列表失败: {str(e)}")
+    
+    def _load_classes(self):
+        """查询所有不同的班级名称"""
+        self.db.execute("""
+        SELECT DISTINCT class_name
+        FROM students
+        WHERE class_name IS NOT NULL AND class_name != ''
+        ORDER BY class_name
+        """)
+        
+        return [row['class_name'] for row in self.db.fetchall()]
\ No newline at end of file
@@ -5,33 +5,44 @@ import os
 import sys
 import logging
 import logging.config
+import importlib
 from datetime import datetime
 
 # 添加项目根目录到系统路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # 导入配置
-from config.settings import LOGGING_CONFIG, DATABASE_CONFIG
+from config.settings import (LOGGING_CONFIG, DATABASE_CONFIG, SQL_STATS_ENABLED, SQL_SLOW_QUERY_MS,
+                             SQL_EXPLAIN_SLOW_QUERIES, SQL_SLOW_QUERY_LOG, SQL_STATS_DUMP)
 
-# 导入控制器
-from controllers.student_controller import StudentController
-from controllers.course_controller import CourseController
-from controllers.grade_controller import GradeController
-from controllers.user_controller import UserController
-from controllers.log_controller import LogController
-
-# 导入视图
+# 导入控制器集合和主视图，各菜单的子视图及其控制器在第一次进入菜单时才导入
+from controllers.lazy_controllers import LazyControllers
 from views.cli_view import CommandLineView
-from views.cli_student_view import CLIStudentView
-from views.cli_course_view import CLICourseView
-from views.cli_grade_view import CLIGradeView
-from views.cli_user_view import CLIUserView
-from views.cli_log_view import CLILogView
 
-def setup_logging():
-    """配置日志系统"""
+# 菜单方法与 (子视图模块, 子视图类, 子视图使用的控制器) 的对应关系
+MENU_VIEWS = {
+    'show_student_management': ('views.cli_student_view', 'CLIStudentView', ('student', 'grade')),
+    'show_course_management': ('views.cli_course_view', 'CLICourseView', ('course', 'grade')),
+    'show_grade_management': ('views.cli_grade_view', 'CLIGradeView', ('grade', 'student', 'course')),
+    'show_user_management': ('views.cli_user_view', 'CLIUserView', ('user',)),
+    'show_system_logs': ('views.cli_log_view', 'CLILogView', ('log',)),
+    'show_personal_info': ('views.cli_user_view', 'CLIUserView', ('user',)),
+    'show_change_password': ('views.cli_user_view', 'CLIUserView', ('user',))
+}
+
+def setup_logging(console_level=None):
+    """
+    配置日志系统
+    
+    参数:
+        console_level (int, optional): 控制台日志级别，默认使用配置中的级别
+    """
     os.makedirs('logs', exist_ok=True)
     logging.config.dictConfig(LOGGING_CONFIG)
+    if console_level is not None:
+        for handler in logging.getLogger().handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(console_level)
     logger = logging.getLogger(__name__)
     logger.info("日志系统初始化完成")
     return logger
@@ -39,28 +50,30 @@ def setup_logging():
 def init_database():
     """初始化数据库"""
     from models.database import Database
+    from models.query_stats import enable_query_stats
+    
+    # SQL执行统计需要在创建数据库实例之前启用
+    if SQL_STATS_ENABLED:
+        enable_query_stats(SQL_SLOW_QUERY_MS, SQL_EXPLAIN_SLOW_QUERIES, SQL_SLOW_QUERY_LOG)
+    
     db = Database(DATABASE_CONFIG)
-    db.init_database()
+    if not db.init_database():
+        db.close()
+        raise RuntimeError("数据库初始化失败，请查看日志文件获取详细信息")
     return db
 
-def init_controllers(db):
+def init_controllers(db, current_user=None):
     """
     初始化控制器
     
     参数:
         db: 数据库实例
+        current_user (dict, optional): 当前用户，交互式界面在登录后设置
     
     返回:
-        dict: 控制器字典
+        LazyControllers: 控制器集合，控制器在第一次使用时创建
     """
-    controllers = {
-        'student': StudentController(db),
-        'course': CourseController(db),
-        'grade': GradeController(db),
-        'user': UserController(db),
-        'log': LogController(db)
-    }
-    return controllers
+    return LazyControllers(db, current_user)
 
 def init_views(controllers, db):
     """
@@ -76,26 +89,84 @@ def init_views(controllers, db):
     # 创建主视图
     cli_view = CommandLineView(controllers, db)
     
-    # 创建子视图并关联到主视图
-    student_view = CLIStudentView(cli_view, controllers['student'], controllers['grade'])
-    course_view = CLICourseView(cli_view, controllers['course'], controllers['grade'])
-    grade_view = CLIGradeView(cli_view, controllers['grade'], controllers['student'], controllers['course'])
-    user_view = CLIUserView(cli_view, controllers['user'])
-    log_view = CLILogView(cli_view, controllers['log'])
-    
-    # 将子视图方法绑定到主视图
-    cli_view.show_student_management = student_view.show_student_management
-    cli_view.show_course_management = course_view.show_course_management
-    cli_view.show_grade_management = grade_view.show_grade_management
-    cli_view.show_user_management = user_view.show_user_management
-    cli_view.show_system_logs = log_view.show_system_logs
-    cli_view.show_personal_info = user_view.show_personal_info
-    cli_view.show_change_password = user_view.show_change_password
+    # 将子视图方法绑定到主视图，子视图在第一次调用时创建
+    sub_views = {}
+    for method_name, (module_name, class_name, controller_names) in MENU_VIEWS.items():
+        setattr(cli_view, method_name, lazy_view_method(cli_view, sub_views, method_name,
+                                                        module_name, class_name, controller_names))
     
     return cli_view
 
+def lazy_view_method(cli_view, sub_views, method_name, module_name, class_name, controller_names):
+    """
+    创建按需加载子视图的菜单方法
+    
+    参数:
+        cli_view (CommandLineView): 主视图
+        sub_views (dict): 已创建的子视图，同一子视图的多个菜单方法共用一个实例
+        method_name (str): 子视图的方法名
+        module_name (str): 子视图模块
+        class_name (str): 子视图类名
+        controller_names (tuple): 创建子视图时传入的控制器名称
+    
+    返回:
+        callable: 菜单方法
+    """
+    def method(*args, **kwargs):
+        view = sub_views.get(class_name)
+        if view is None:
+            view_class = getattr(importlib.import_module(module_name), class_name)
+            controllers = [cli_view.controllers[name] for name in controller_names]
+            view = sub_views[class_name] = view_class(cli_view, *controllers)
+        return getattr(view, method_name)(*args, **kwargs)
+    return method
+
+def run_batch(argv):
+    """
+    以非交互方式执行批处理子命令
+    
+    参数:
+        argv (list): 命令行参数，不含程序名
+    
+    返回:
+        int: 退出码
+    """
+    from models.user import User
+    from views.cli_batch_view import CLIBatchView, build_parser, EXIT_FAILED, EXIT_USAGE
+    
+    # 先解析参数，--help 和参数错误无需初始化数据库
+    args = build_parser().parse_args(argv)
+    
+    # 控制台只显示警告和错误，避免日志与命令输出混在一起
+    logger = setup_logging(None if args.verbose else logging.WARNING)
+    logger.info(f"执行批处理命令: {' '.join(argv)}")
+    
+    try:
+        db = init_database()
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return EXIT_FAILED
+    
+    try:
+        # 以指定用户身份执行，权限检查和操作日志与交互式界面一致
+        user = User(db).get_user(args.user)
+        if not user:
+            print(f"用户 {args.user} 不存在", file=sys.stderr)
+            return EXIT_USAGE
+        
+        controllers = init_controllers(db, user)
+        return CLIBatchView(controllers, args.json).run(args)
+    finally:
+        if db.query_stats is not None:
+            db.query_stats.dump(SQL_STATS_DUMP)
+        db.close()
+
 def main():
     """主程序入口"""
+    # 提供子命令时以批处理方式运行，不显示菜单
+    if len(sys.argv) > 1:
+        sys.exit(run_batch(sys.argv[1:]))
+    
     print("正在启动学生管理系统...")
     
     # 设置日志
@@ -118,6 +189,11 @@ def main():
         # 运行视图
         view.run()
         
+        # 输出本次运行中开销最大的SQL语句
+        if db.query_stats is not None:
+            db.query_stats.dump(SQL_STATS_DUMP)
+            logger.info(f"SQL执行统计已写入: {SQL_STATS_DUMP}")
+        
         logger.info("学生管理系统正常退出")
     except Exception as e:
         logger.error(f"系统运行出错: {str(e)}", exc_info=True)
@@ -0,0 +1,157 @@
+"""
+初始表结构
+
+包含学生、课程、成绩、用户、操作日志和课程表等表，以及数据版本和成绩变更日志的触发器，默认管理员账户。
+所有语句都使用 IF NOT EXISTS / OR IGNORE，对引入迁移之前创建的数据库执行时不会修改已有的表和数据。
+"""
+from config.database import TABLES, VERSIONED_TABLES
+
+DESCRIPTION = '初始表结构'
+
+def upgrade(migration):
+    """创建初始表结构"""
+    # 创建学生表
+    migration.execute(f'''
+    CREATE TABLE IF NOT EXISTS {TABLES['students']} (
+        student_id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        gender TEXT CHECK(gender IN ('男', '女', '其他')),
+        birth_date TEXT,
+        class_name TEXT,
+        admission_date TEXT,
+        contact_phone TEXT,
+        email TEXT,
+        address TEXT,
+        status TEXT DEFAULT '在读' CHECK(status IN ('在读', '休学', '退学', '毕业')),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
+    # 创建课程表
+    migration.execute(f'''
+    CREATE TABLE IF NOT EXISTS {TABLES['courses']} (
+        course_id TEXT PRIMARY KEY,
+        course_name TEXT NOT NULL,
+        credit REAL NOT NULL,
+        teacher TEXT,
+        description TEXT,
+        semester TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
+    # 创建成绩表
+    migration.execute(f'''
+    CREATE TABLE IF NOT EXISTS {TABLES['grades']} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        student_id TEXT NOT NULL,
+        course_id TEXT NOT NULL,
+        semester TEXT NOT NULL,
+        score REAL CHECK(score >= 0 AND score <= 100),
+        grade_point REAL,
+        exam_date TEXT,
+        remarks TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (student_id) REFERENCES {TABLES['students']}(student_id) ON DELETE CASCADE,
+        FOREIGN KEY (course_id) REFERENCES {TABLES['courses']}(course_id) ON DELETE CASCADE,
+        UNIQUE(student_id, course_id, semester)
+    )
+    ''')
+    
+    # 创建用户表
+    migration.execute(f'''
+    CREATE TABLE IF NOT EXISTS {TABLES['users']} (
+        username TEXT PRIMARY KEY,
+        password TEXT NOT NULL,
+        real_name TEXT,
+        role TEXT NOT NULL CHECK(role IN ('admin', 'teacher', 'student', 'guest')),
+        email TEXT,
+        phone TEXT,
+        last_login TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
+    # 创建操作日志表
+    migration.execute(f'''
+    CREATE TABLE IF NOT EXISTS {TABLES['logs']} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT,
+        operation TEXT NOT NULL,
+        target TEXT,
+        details TEXT,
+        ip_address TEXT,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
+    # 创建课程表
+    migration.execute(f'''
+    CREATE TABLE IF NOT EXISTS {TABLES['schedules']} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        course_id TEXT NOT NULL,
+        semester TEXT NOT NULL,
+        day_of_week INTEGER NOT NULL CHECK(day_of_week >= 1 AND day_of_week <= 7),
+        start_section INTEGER NOT NULL,
+        end_section INTEGER NOT NULL,
+        location TEXT NOT NULL,
+        teacher TEXT,
+        week_type INTEGER DEFAULT 0 CHECK(week_type IN (0, 1, 2)),
+        start_week INTEGER NOT NULL,
+        end_week INTEGER NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (course_id) REFERENCES {TABLES['courses']}(course_id) ON DELETE CASCADE
+    )
+    ''')
+    migration.execute(f'''
+    CREATE INDEX IF NOT EXISTS idx_schedules_semester
+    ON {TABLES['schedules']} (semester, day_of_week, start_section)
+    ''')
+    
+    # 创建数据版本表，由触发器在数据变更时更新，供各进程的缓存判断是否失效
+    migration.execute(f'''
+    CREATE TABLE IF NOT EXISTS {TABLES['data_versions']} (
+        entity TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+    ''')
+    for entity in VERSIONED_TABLES:
+        migration.execute(f'''
+        INSERT OR IGNORE INTO {TABLES['data_versions']} (entity, version) VALUES (?, 0)
+        ''', (TABLES[entity],))
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            migration.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{TABLES[entity]}_{event.lower()}_version
+            AFTER {event} ON {TABLES[entity]}
+            BEGIN
+                UPDATE {TABLES['data_versions']} SET version = version + 1
+                WHERE entity = '{TABLES[entity]}';
+            END
+            ''')
+    
+    # 创建成绩变更日志表，记录被插入、修改或删除的成绩ID，供成绩多维分析增量更新
+    migration.execute(f'''
+    CREATE TABLE IF NOT EXISTS {TABLES['grade_changes']} (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        grade_id INTEGER NOT NULL
+    )
+    ''')
+    for event, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+        migration.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{TABLES['grades']}_{event.lower()}_change
+        AFTER {event} ON {TABLES['grades']}
+        BEGIN
+            INSERT INTO {TABLES['grade_changes']} (grade_id) VALUES ({row}.id);
+        END
+        ''')
+    
+    # 创建默认管理员账户
+    migration.execute(f'''
+    INSERT OR IGNORE INTO {TABLES['users']} (username, password, real_name, role)
+    VALUES (?, ?, ?, ?)
+    ''', ('admin', 'pbkdf2:sha256:150000$xtR9ZGgI$f9b8a88aad54f3a5b7d197ebc3a1a92a0f4b53ad6b276fe6bf0782fcd7e9965a', '系统管理员', 'admin'))
\ No newline at end of file
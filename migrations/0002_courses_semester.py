@@ -0,0 +1,13 @@
+"""
+课程表添加开课学期列
+
+替代原来的 update_database.py 和 update_courses_table.sql：不再复制整张课程表再替换，
+直接 ADD COLUMN，只修改表定义，已有课程的学期为空。
+"""
+from config.database import TABLES
+
+DESCRIPTION = '课程表添加开课学期列'
+
+def upgrade(migration):
+    """为早期版本创建的课程表添加 semester 列，列已存在时跳过"""
+    migration.add_column(TABLES['courses'], 'semester', 'TEXT')
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""
+流式导入任务表
+
+import_jobs 记录每次CSV导入的文件、进度和结果，byte_offset 为最后提交的一批数据在文件中的结束位置，
+导入失败后从该位置继续；import_job_errors 保存未能导入的行及原因。
+"""
+from config.database import TABLES
+
+DESCRIPTION = '流式导入任务表'
+
+def upgrade(migration):
+    """创建导入任务表和失败记录表"""
+    migration.execute(f'''
+    CREATE TABLE IF NOT EXISTS {TABLES['import_jobs']} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL CHECK(kind IN ('grades', 'students')),
+        filename TEXT,
+        file_path TEXT NOT NULL,
+        file_size INTEGER NOT NULL DEFAULT 0,
+        username TEXT,
+        status TEXT NOT NULL DEFAULT 'pending' CHECK(status IN ('pending', 'running', 'failed', 'completed')),
+        fieldnames TEXT,
+        byte_offset INTEGER NOT NULL DEFAULT 0,
+        rows_processed INTEGER NOT NULL DEFAULT 0,
+        success_count INTEGER NOT NULL DEFAULT 0,
+        failed_count INTEGER NOT NULL DEFAULT 0,
+        chunk_size INTEGER NOT NULL,
+        error TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        finished_at TIMESTAMP
+    )
+    ''')
+    migration.execute(f'''
+    CREATE TABLE IF NOT EXISTS {TABLES['import_job_errors']} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id INTEGER NOT NULL,
+        row_number INTEGER NOT NULL,
+        data TEXT,
+        reason TEXT,
+        FOREIGN KEY (job_id) REFERENCES {TABLES['import_jobs']}(id) ON DELETE CASCADE
+    )
+    ''')
+    migration.execute(f'''
+    CREATE INDEX IF NOT EXISTS idx_import_job_errors_job
+    ON {TABLES['import_job_errors']} (job_id, row_number)
+    ''')
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""
+后台任务表
+
+jobs 是进程内后台任务的队列，同时保存任务的进度、取消请求和结果。任务由执行它的进程以
+status 从 queued 改为 running 的条件更新认领，多个进程共用数据库时同一任务只会执行一次。
+"""
+from config.database import TABLES
+
+DESCRIPTION = '后台任务表'
+
+def upgrade(migration):
+    """创建后台任务表"""
+    migration.execute(f'''
+    CREATE TABLE IF NOT EXISTS {TABLES['jobs']} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        params TEXT,
+        username TEXT,
+        status TEXT NOT NULL DEFAULT 'queued' CHECK(status IN ('queued', 'running', 'succeeded', 'failed', 'cancelled')),
+        progress_current INTEGER NOT NULL DEFAULT 0,
+        progress_total INTEGER,
+        message TEXT,
+        result TEXT,
+        cancel_requested INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        started_at TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        finished_at TIMESTAMP
+    )
+    ''')
+    migration.execute(f'''
+    CREATE INDEX IF NOT EXISTS idx_jobs_status
+    ON {TABLES['jobs']} (status, updated_at)
+    ''')
+    migration.execute(f'''
+    CREATE INDEX IF NOT EXISTS idx_jobs_username
+    ON {TABLES['jobs']} (username, id)
+    ''')
\ No newline at end of file
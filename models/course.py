@@ -10,6 +10,9 @@ from models.database import Database
 
 logger = logging.getLogger(__name__)
 
+# 批量导入时写入的课程字段，CSV中的其他列被忽略
+IMPORT_FIELDS = ('course_id', 'course_name', 'credit', 'teacher', 'description', 'semester', 'created_at', 'updated_at')
+
 class Course:
     """课程模型类，处理课程信息的CRUD操作"""
     
@@ -50,6 +53,7 @@ class Course:
             sql = f"INSERT INTO {TABLES['courses']} ({fields}) VALUES ({placeholders})"
             self.db.execute(sql, values)
             self.db.commit()
+            self.db.identity_map.evict(TABLES['courses'], course_data['course_id'])
             
             logger.info(f"成功添加课程: {course_data['course_name']}({course_data['course_id']})")
             return True, None
@@ -92,6 +96,7 @@ class Course:
             sql = f"UPDATE {TABLES['courses']} SET {set_clause} WHERE course_id = ?"
             self.db.execute(sql, values)
             self.db.commit()
+            self.db.identity_map.evict(TABLES['courses'], course_id)
             
             # 检查是否有记录被更新
             if self.db.cursor.rowcount > 0:
@@ -121,6 +126,10 @@ class Course:
             self.db.execute(sql, (course_id,))
             self.db.commit()
             
+            # 成绩记录随课程级联删除
+            self.db.identity_map.evict(TABLES['courses'], course_id)
+            self.db.identity_map.evict(TABLES['grades'])
+            
             # 检查是否有记录被删除
             if self.db.cursor.rowcount > 0:
                 logger.info(f"成功删除课程: {course_id}")
@@ -133,6 +142,55 @@ class Course:
             logger.error(f"删除课程失败: {e}")
             return False
     
+    def insert_import_rows(self, courses_data):
+        """
+        批量插入导入的课程，课程编号已存在的行被跳过
+        
+        在调用方的事务中执行，不提交事务。只写入 IMPORT_FIELDS 中的字段，空字符串按空值写入。
+        
+        参数:
+            courses_data (list): 课程信息字典列表
+        
+        返回:
+            list: 与输入顺序对应的插入结果，成功为True
+        """
+        sql = f"""
+        INSERT OR IGNORE INTO {TABLES['courses']} ({', '.join(IMPORT_FIELDS)})
+        VALUES ({', '.join(['?'] * len(IMPORT_FIELDS))})
+        """
+        results = []
+        for course_data in courses_data:
+            values = [course_data.get(field) if course_data.get(field) != '' else None for field in IMPORT_FIELDS]
+            inserted = self.db.execute(sql, values).rowcount == 1
+            if inserted:
+                self.db.identity_map.evict(TABLES['courses'], course_data['course_id'])
+            results.append(inserted)
+        return results
+    
+    def get_existing_ids(self, course_ids):
+        """
+        查询已存在的课程编号
+        
+        参数:
+            course_ids (list): 课程编号列表
+        
+        返回:
+            set: 其中已存在的课程编号
+        """
+        course_ids = list(set(course_ids))
+        existing = set()
+        try:
+            # 分批查询，避免超出SQLite的参数个数限制
+            for start in range(0, len(course_ids), 500):
+                batch = course_ids[start:start + 500]
+                sql = f"SELECT course_id FROM {TABLES['courses']} WHERE course_id IN ({', '.join('?' * len(batch))})"
+                self.db.execute(sql, batch)
+                existing.update(row['course_id'] for row in self.db.fetchall())
+            return existing
+        except sqlite3.Error as e:
+            logger.error(f"查询课程编号失败: {e}")
+            return set()
+    
     def get_course(self, course_id):
         """
         获取单个课程信息
@@ -144,13 +202,20 @@ class Course:
             dict: 课程信息字典，未找到返回None
         """
         try:
+            # 优先从身份映射中获取
+            cached = self.db.identity_map.get(TABLES['courses'], course_id)
+            if cached:
+                return cached
+            
             sql = f"SELECT * FROM {TABLES['courses']} WHERE course_id = ?"
             self.db.execute(sql, (course_id,))
             course = self.db.fetchone()
             
             if course:
                 # 将Row对象转换为字典
-                return dict(course)
+                course = dict(course)
+                self.db.identity_map.put(TABLES['courses'], course_id, course)
+                return course
             else:
                 logger.warning(f"未找到课程编号为 {course_id} 的课程")
                 return None
@@ -2,11 +2,16 @@
 数据库连接和初始化模块
 """
 import os
+import time
 import sqlite3
 import logging
+from contextlib import contextmanager
 from pathlib import Path
 
 from config.database import TABLES
+from models.identity_map import IdentityMap
+from models.migration import MigrationRunner, MigrationError
+from models.query_stats import QueryScope, get_query_stats
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +32,20 @@ class Database:
         self.connection = None
         self.cursor = None
         
+        # 请求级身份映射，由Web请求或控制器操作激活
+        self.identity_map = IdentityMap()
+        
+        # 数据版本缓存及其对应的连接状态
+        self._data_versions = None
+        self._data_version_stamp = None
+        
+        # SQL执行统计，未启用时为None；当前统计范围及尚未读取完结果的语句
+        self.query_stats = get_query_stats()
+        self.query_scope = None
+        self._pending_query = None
+        # 是否需要为语句计时，启用SQL统计或存在计时的统计范围时为True
+        self._timed = self.query_stats is not None
+        
     def connect(self):
         """建立数据库连接"""
         try:
@@ -48,6 +67,8 @@ class Database:
     
     def close(self):
         """关闭数据库连接"""
+        if self._pending_query:
+            self._finish_query()
         if self.connection:
             self.connection.close()
             logger.info("数据库连接已关闭")
@@ -64,6 +85,8 @@ class Database:
     
     def execute(self, sql, params=None):
         """执行SQL语句"""
+        if self._timed:
+            return self._execute_with_stats(sql, params)
         try:
             if params:
                 return self.cursor.execute(sql, params)
@@ -75,108 +98,193 @@ class Database:
     
     def fetchone(self):
         """获取一条查询结果"""
-        return self.cursor.fetchone()
+        if self._pending_query is None:
+            return self.cursor.fetchone()
+        start = time.perf_counter()
+        row = self.cursor.fetchone()
+        self._pending_query[2] += time.perf_counter() - start
+        if row is not None:
+            self._pending_query[3] += 1
+        # 模型通常只读取一条结果，读取后即计入统计
+        self._finish_query()
+        return row
     
     def fetchall(self):
         """获取所有查询结果"""
-        return self.cursor.fetchall()
+        if self._pending_query is None:
+            return self.cursor.fetchall()
+        start = time.perf_counter()
+        rows = self.cursor.fetchall()
+        self._pending_query[2] += time.perf_counter() - start
+        self._pending_query[3] += len(rows)
+        self._finish_query()
+        return rows
+    
+    def _execute_with_stats(self, sql, params):
+        """执行SQL语句并记录耗时，查询语句的行数和读取耗时在读取结果时累加"""
+        if self._pending_query:
+            self._finish_query()
+        
+        start = time.perf_counter()
+        try:
+            if params:
+                cursor = self.cursor.execute(sql, params)
+            else:
+                cursor = self.cursor.execute(sql)
+        except sqlite3.Error as e:
+            logger.error(f"SQL执行错误: {e}, SQL: {sql}, 参数: {params}")
+            raise
+        elapsed = time.perf_counter() - start
+        
+        if cursor.description is None:
+            # 非查询语句没有结果需要读取，直接记录影响的行数
+            self._record_query(sql, params, elapsed, max(cursor.rowcount, 0))
+        else:
+            self._pending_query = [sql, params, elapsed, 0]
+        return cursor
+    
+    def _finish_query(self):
+        """记录结果已读取完毕(或不再读取)的查询语句"""
+        sql, params, elapsed, rows = self._pending_query
+        self._pending_query = None
+        self._record_query(sql, params, elapsed, rows)
+    
+    def _record_query(self, sql, params, elapsed, rows):
+        """将语句计入当前统计范围和进程级SQL统计"""
+        scope = self.query_scope
+        if scope is not None:
+            scope.count += 1
+            scope.time += elapsed
+            scope.rows += rows
+        if self.query_stats is not None:
+            self.query_stats.record(self, sql, params, elapsed, rows)
+    
+    def begin_query_scope(self, name, timed=False):
+        """
+        开始统计一次Web请求或命令行操作内的SQL执行情况，未启用SQL统计时不做任何事
+        
+        参数:
+            name (str): 统计范围名称
+            timed (bool): 未启用SQL统计时也记录语句数和数据库耗时(供请求指标使用)
+        
+        返回:
+            QueryScope: 统计范围，未启用时返回None
+        """
+        if self.query_stats is None and not timed:
+            return None
+        self.query_scope = QueryScope(name)
+        self._timed = True
+        return self.query_scope
+    
+    def end_query_scope(self):
+        """
+        结束当前统计范围并写入摘要日志
+        
+        返回:
+            dict: 统计摘要，没有进行中的统计范围时返回None
+        """
+        if self.query_scope is None:
+            return None
+        if self._pending_query:
+            self._finish_query()
+        
+        summary = self.query_scope.summary()
+        self.query_scope = None
+        self._timed = self.query_stats is not None
+        if self.query_stats is None:
+            return summary
+        
+        logger.info(
+            f"SQL统计 [{summary['name']}]: {summary['queries']} 条语句, "
+            f"数据库耗时 {summary['db_ms']}ms / 总耗时 {summary['elapsed_ms']}ms, 返回 {summary['rows']} 行"
+        )
+        if summary['repeated']:
+            logger.info(f"SQL统计 [{summary['name']}]: 重复执行的语句 {summary['repeated']}")
+        return summary
+    
+    @contextmanager
+    def query_statistics(self, name):
+        """
+        在with语句块内统计SQL执行情况
+        
+        参数:
+            name (str): 统计范围名称
+        """
+        scope = self.begin_query_scope(name)
+        try:
+            yield scope
+        finally:
+            if scope is not None:
+                self.end_query_scope()
+    
+    @contextmanager
+    def transaction(self):
+        """
+        在with语句块内开启一个写事务，正常退出时提交，出现异常时回滚
+        
+        块内的模型方法不能自行提交事务。
+        """
+        if self._pending_query:
+            self._finish_query()
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            if self.connection.in_transaction:
+                self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+    
+    def get_data_versions(self):
+        """
+        获取各数据实体的版本号
+        
+        版本号只在其他连接提交过写入(PRAGMA data_version变化)或本连接有写入时重新读取，
+        其余情况直接返回上次读取的结果。
+        
+        返回:
+            dict: {表名: 版本号}，数据版本表不存在时返回None
+        """
+        try:
+            # 使用独立游标，避免影响模型依赖的self.cursor状态(如rowcount)
+            data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+            stamp = (data_version, self.connection.total_changes)
+            if stamp != self._data_version_stamp:
+                rows = self.connection.execute(
+                    f"SELECT entity, version FROM {TABLES['data_versions']}"
+                ).fetchall()
+                self._data_versions = {row['entity']: row['version'] for row in rows}
+                self._data_version_stamp = stamp
+            return self._data_versions
+        except sqlite3.Error as e:
+            logger.warning(f"读取数据版本失败: {e}")
+            return None
+    
+    def get_schema_version(self):
+        """
+        获取数据库的表结构版本
+        
+        返回:
+            int: 已完成的最新迁移编号，新建或引入迁移之前创建的数据库为0
+        """
+        return self.connection.execute("PRAGMA user_version").fetchone()[0]
     
     def init_database(self):
-        """初始化数据库表结构"""
+        """初始化数据库表结构，执行尚未应用的迁移"""
         if not self.connect():
             logger.error("无法连接到数据库，初始化失败")
             return False
-            
+        
         try:
-            # 创建学生表
-            self.execute(f'''
-            CREATE TABLE IF NOT EXISTS {TABLES['students']} (
-                student_id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                gender TEXT CHECK(gender IN ('男', '女', '其他')),
-                birth_date TEXT,
-                class_name TEXT,
-                admission_date TEXT,
-                contact_phone TEXT,
-                email TEXT,
-                address TEXT,
-                status TEXT DEFAULT '在读' CHECK(status IN ('在读', '休学', '退学', '毕业')),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            ''')
-            
-            # 创建课程表
-            self.execute(f'''
-            CREATE TABLE IF NOT EXISTS {TABLES['courses']} (
-                course_id TEXT PRIMARY KEY,
-                course_name TEXT NOT NULL,
-                credit REAL NOT NULL,
-                teacher TEXT,
-                description TEXT,
-                semester TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            ''')
+            runner = MigrationRunner(self)
+            # 表结构是最新版本时不再检查各个迁移，只需读取一个整数
+            if self.get_schema_version() == runner.latest_version:
+                logger.info(f"数据库表结构已是最新版本({runner.latest_version})")
+                return True
             
-            # 创建成绩表
-            self.execute(f'''
-            CREATE TABLE IF NOT EXISTS {TABLES['grades']} (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_id TEXT NOT NULL,
-                course_id TEXT NOT NULL,
-                semester TEXT NOT NULL,
-                score REAL CHECK(score >= 0 AND score <= 100),
-                grade_point REAL,
-                exam_date TEXT,
-                remarks TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (student_id) REFERENCES {TABLES['students']}(student_id) ON DELETE CASCADE,
-                FOREIGN KEY (course_id) REFERENCES {TABLES['courses']}(course_id) ON DELETE CASCADE,
-                UNIQUE(student_id, course_id, semester)
-            )
-            ''')
-            
-            # 创建用户表
-            self.execute(f'''
-            CREATE TABLE IF NOT EXISTS {TABLES['users']} (
-                username TEXT PRIMARY KEY,
-                password TEXT NOT NULL,
-                real_name TEXT,
-                role TEXT NOT NULL CHECK(role IN ('admin', 'teacher', 'student', 'guest')),
-                email TEXT,
-                phone TEXT,
-                last_login TIMESTAMP,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            ''')
-            
-            # 创建操作日志表
-            self.execute(f'''
-            CREATE TABLE IF NOT EXISTS {TABLES['logs']} (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT,
-                operation TEXT NOT NULL,
-                target TEXT,
-                details TEXT,
-                ip_address TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            ''')
-            
-            # 创建默认管理员账户
-            self.execute(f'''
-            INSERT OR IGNORE INTO {TABLES['users']} (username, password, real_name, role)
-            VALUES (?, ?, ?, ?)
-            ''', ('admin', 'pbkdf2:sha256:150000$xtR9ZGgI$f9b8a88aad54f3a5b7d197ebc3a1a92a0f4b53ad6b276fe6bf0782fcd7e9965a', '系统管理员', 'admin'))
-            
-            self.commit()
-            logger.info("数据库表结构初始化完成")
+            executed = runner.upgrade()
+            logger.info(f"数据库表结构初始化完成，执行了 {len(executed)} 个迁移，版本: {runner.latest_version}")
             return True
-        except sqlite3.Error as e:
-            self.rollback()
+        except (sqlite3.Error, MigrationError) as e:
             logger.error(f"数据库初始化失败: {e}")
             return False
\ No newline at end of file
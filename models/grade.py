@@ -6,7 +6,9 @@ import sqlite3
 from datetime import datetime
 
 from config.database import TABLES
+from config.settings import GRADE_POINT_BATCH_SIZE
 from models.database import Database
+from utils import grade_scale
 
 logger = logging.getLogger(__name__)
 
@@ -71,6 +73,59 @@ class Grade:
             logger.error(f"添加成绩失败: {e}")
             return False
     
+    def insert_import_rows(self, grades_data):
+        """
+        批量插入导入的成绩，该学生在该学期已有该课程成绩的行被跳过
+        
+        在调用方的事务中执行，不提交事务。调用前需确认学生和课程存在、分数已转换为数字。
+        
+        参数:
+            grades_data (list): 成绩信息字典列表
+        
+        返回:
+            list: 与输入顺序对应的插入结果，成功为True
+        """
+        sql = f"""
+        INSERT OR IGNORE INTO {TABLES['grades']}
+            (student_id, course_id, semester, score, grade_point, exam_date, remarks)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """
+        results = []
+        for grade_data in grades_data:
+            score = grade_data['score']
+            params = (grade_data['student_id'], grade_data['course_id'], grade_data['semester'], score,
+                      self._calculate_grade_point(score), grade_data.get('exam_date') or None,
+                      grade_data.get('remarks') or None)
+            results.append(self.db.execute(sql, params).rowcount == 1)
+        return results
+    
+    def update_import_rows(self, grades_data):
+        """
+        按学号、课程编号和学期批量更新导入的成绩
+        
+        在调用方的事务中执行，不提交事务。考试日期和备注为空时保留原值。
+        
+        参数:
+            grades_data (list): 成绩信息字典列表，分数已转换为数字
+        
+        返回:
+            int: 更新的记录数
+        """
+        sql = f"""
+        UPDATE {TABLES['grades']}
+        SET score = ?, grade_point = ?, exam_date = COALESCE(?, exam_date), remarks = COALESCE(?, remarks),
+            updated_at = ?
+        WHERE student_id = ? AND course_id = ? AND semester = ?
+        """
+        updated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        params = [(grade_data['score'], self._calculate_grade_point(grade_data['score']),
+                   grade_data.get('exam_date') or None, grade_data.get('remarks') or None, updated_at,
+                   grade_data['student_id'], grade_data['course_id'], grade_data['semester'])
+                  for grade_data in grades_data]
+        cursor = self.db.connection.executemany(sql, params)
+        self.db.identity_map.evict(TABLES['grades'])
+        return cursor.rowcount
+    
     def update_grade(self, grade_id, update_data):
         """
         更新成绩记录
@@ -103,6 +158,7 @@ class Grade:
             sql = f"UPDATE {TABLES['grades']} SET {set_clause} WHERE id = ?"
             self.db.execute(sql, values)
             self.db.commit()
+            self.db.identity_map.evict(TABLES['grades'], grade_id)
             
             # 检查是否有记录被更新
             if self.db.cursor.rowcount > 0:
@@ -154,6 +210,7 @@ class Grade:
             """
             self.db.execute(sql, values)
             self.db.commit()
+            self.db.identity_map.evict(TABLES['grades'])
             
             # 检查是否有记录被更新
             if self.db.cursor.rowcount > 0:
@@ -182,6 +239,7 @@ class Grade:
             sql = f"DELETE FROM {TABLES['grades']} WHERE id = ?"
             self.db.execute(sql, (grade_id,))
             self.db.commit()
+            self.db.identity_map.evict(TABLES['grades'], grade_id)
             
             # 检查是否有记录被删除
             if self.db.cursor.rowcount > 0:
@@ -215,6 +273,7 @@ class Grade:
             """
             self.db.execute(sql, (student_id, course_id, semester))
             self.db.commit()
+            self.db.identity_map.evict(TABLES['grades'])
             
             # 检查是否有记录被删除
             if self.db.cursor.rowcount > 0:
@@ -239,13 +298,20 @@ class Grade:
             dict: 成绩记录字典，未找到返回None
         """
         try:
+            # 优先从身份映射中获取
+            cached = self.db.identity_map.get(TABLES['grades'], grade_id)
+            if cached:
+                return cached
+            
             sql = f"SELECT * FROM {TABLES['grades']} WHERE id = ?"
             self.db.execute(sql, (grade_id,))
             grade = self.db.fetchone()
             
             if grade:
                 # 将Row对象转换为字典
-                return dict(grade)
+                grade = dict(grade)
+                self.db.identity_map.put(TABLES['grades'], grade_id, grade)
+                return grade
             else:
                 logger.warning(f"未找到ID为 {grade_id} 的成绩记录")
                 return None
@@ -283,6 +349,39 @@ class Grade:
             logger.error(f"获取成绩记录失败: {e}")
             return None
     
+    def get_grades_by_keys(self, keys):
+        """
+        按 (学号, 课程编号, 学期) 批量获取成绩记录
+        
+        参数:
+            keys (list): (学号, 课程编号, 学期) 元组列表
+        
+        返回:
+            dict: {(学号, 课程编号, 学期): 成绩记录字典}，只包含已存在的记录
+        """
+        keys = list(set(keys))
+        grades = {}
+        try:
+            # 分批查询，每个键占3个参数，避免超出SQLite的参数个数限制
+            for start in range(0, len(keys), 300):
+                batch = keys[start:start + 300]
+                # 与键列表连接查询，每个键通过 (student_id, course_id, semester) 唯一索引查找
+                sql = f"""
+                WITH import_keys (student_id, course_id, semester) AS (
+                    VALUES {', '.join(['(?, ?, ?)'] * len(batch))}
+                )
+                SELECT g.* FROM import_keys k
+                JOIN {TABLES['grades']} g
+                  ON g.student_id = k.student_id AND g.course_id = k.course_id AND g.semester = k.semester
+                """
+                self.db.execute(sql, [value for key in batch for value in key])
+                for row in self.db.fetchall():
+                    grades[(row['student_id'], row['course_id'], row['semester'])] = dict(row)
+            return grades
+        except sqlite3.Error as e:
+            logger.error(f"批量获取成绩记录失败: {e}")
+            return {}
+    
     def get_student_grades(self, student_id, semester=None):
         """
         获取学生所有成绩
@@ -378,6 +477,7 @@ class Grade:
             SELECT 
                 SUM(c.credit) as total_credit,
                 SUM(g.grade_point * c.credit) as weighted_gpa,
+                SUM(g.score * c.credit) as weighted_score,
                 AVG(g.score) as average_score
             FROM {TABLES['grades']} g
             JOIN {TABLES['courses']} c ON g.course_id = c.course_id
@@ -407,6 +507,7 @@ class Grade:
                     'semester': semester,
                     'total_credit': total_credit,
                     'average_score': round(average_score, 2),
+                    'weighted_avg': round(result['weighted_score'] / total_credit, 2),
                     'gpa': round(gpa, 2)
                 }
             else:
@@ -415,6 +516,7 @@ class Grade:
                     'semester': semester,
                     'total_credit': 0,
                     'average_score': 0,
+                    'weighted_avg': 0,
                     'gpa': 0
                 }
         except Exception as e:
@@ -424,6 +526,7 @@ class Grade:
                 'semester': semester,
                 'total_credit': 0,
                 'average_score': 0,
+                'weighted_avg': 0,
                 'gpa': 0,
                 'error': str(e)
             }
@@ -511,7 +614,7 @@ class Grade:
     
     def _calculate_grade_point(self, score):
         """
-        根据分数计算绩点
+        根据分数计算绩点，换算规则见配置的绩点表
         
         参数:
             score (float): 分数
@@ -519,22 +622,44 @@ class Grade:
         返回:
             float: 绩点
         """
-        if score >= 90:
-            return 4.0
-        elif score >= 85:
-            return 3.7
-        elif score >= 80:
-            return 3.3
-        elif score >= 75:
-            return 3.0
-        elif score >= 70:
-            return 2.7
-        elif score >= 65:
-            return 2.3
-        elif score >= 60:
-            return 2.0
-        else:
-            return 0.0
+        return grade_scale.calculate_grade_point(score)
+    
+    def recompute_grade_points(self, batch_size=GRADE_POINT_BATCH_SIZE, progress=None):
+        """
+        按当前绩点表重新计算所有成绩的绩点
+        
+        绩点由绩点表生成的CASE表达式在数据库中计算，按成绩ID区间分批更新，每批在单独的事务中提交，
+        写锁只在一批内持有。只更新绩点与新绩点表不一致的行，绩点表未变化时不写入任何行。
+        
+        参数:
+            batch_size (int): 每批检查的成绩ID数量
+            progress (callable, optional): 每批提交后调用，参数为 (已检查的成绩ID, 最大成绩ID, 已更新行数)
+        
+        返回:
+            int: 更新的成绩数
+        """
+        grade_point = grade_scale.grade_point_case_sql('score')
+        max_id = self.db.connection.execute(f"SELECT MAX(id) FROM {TABLES['grades']}").fetchone()[0] or 0
+        sql = f"""
+        UPDATE {TABLES['grades']} SET grade_point = {grade_point}
+        WHERE id > ? AND id <= ? AND grade_point IS NOT {grade_point}
+        """
+        
+        updated = 0
+        start = 0
+        try:
+            while start < max_id:
+                end = min(start + batch_size, max_id)
+                with self.db.transaction():
+                    updated += self.db.execute(sql, (start, end)).rowcount
+                start = end
+                if progress:
+                    progress(end, max_id, updated)
+        finally:
+            self.db.identity_map.evict(TABLES['grades'])
+        
+        logger.info(f"重新计算绩点: 更新 {updated} 条成绩")
+        return updated
     
     def count_grades(self, filters=None):
         """
@@ -921,4 +1046,191 @@ class Grade:
                 'semester_stats': {},
                 'course_stats': [],
                 'class_stats': []
-            }
\ No newline at end of file
+            }
+    
+    def get_analytics_rows(self, filters=None):
+        """
+        一次查询获取成绩分析需要的列
+        
+        参数:
+            filters (dict, optional): 过滤条件，支持 student_id, course_id, semester, class_name
+        
+        返回:
+            list: 成绩记录列表，包含学号、姓名、班级、课程、学期、成绩、学分和绩点
+        """
+        try:
+            sql = f"""
+            SELECT g.student_id, s.name as student_name, s.class_name, g.course_id, c.course_name,
+                   g.semester, g.score, c.credit, g.grade_point
+            FROM {TABLES['grades']} g
+            LEFT JOIN {TABLES['students']} s ON g.student_id = s.student_id
+            LEFT JOIN {TABLES['courses']} c ON g.course_id = c.course_id
+            """
+            params = []
+            where_clauses = []
+            for key, column in (('student_id', 'g.student_id'), ('course_id', 'g.course_id'),
+                                ('semester', 'g.semester'), ('class_name', 's.class_name')):
+                if filters and filters.get(key):
+                    where_clauses.append(f"{column} = ?")
+                    params.append(filters[key])
+            
+            if where_clauses:
+                sql += " WHERE " + " AND ".join(where_clauses)
+            
+            self.db.execute(sql, params)
+            return [dict(row) for row in self.db.fetchall()]
+        except Exception as e:
+            logger.error(f"获取成绩分析数据失败: {e}")
+            return []
+    
+    def get_transcripts(self, student_ids=None, class_name=None):
+        """
+        一次查询获取学生成绩单：所有课程成绩、每学期的学分、GPA和加权平均分，以及截至每学期的累计GPA
+        
+        参数:
+            student_ids (list, optional): 学号列表
+            class_name (str, optional): 班级，提供时获取全班学生的成绩单
+        
+        返回:
+            list: 按学号排序的成绩单列表，没有成绩的学生也会包含在内(semesters为空)
+        """
+        try:
+            if not student_ids and not class_name:
+                return []
+            
+            sql, params = self._transcript_query(student_ids, class_name)
+            self.db.execute(sql, params)
+            return list(self._group_transcripts(self.db.fetchall()))
+        except Exception as e:
+            logger.error(f"获取学生成绩单失败: {e}")
+            return []
+    
+    def iter_transcripts(self, class_name=None, batch_size=500):
+        """
+        按学号顺序流式获取所有学生(或某个班级)的成绩单，同一时间只在内存中保留一名学生的成绩
+        
+        参数:
+            class_name (str, optional): 班级，不提供时获取所有学生
+            batch_size (int): 每次从游标读取的行数
+        
+        返回:
+            generator: 成绩单生成器，格式与 get_transcripts 的元素相同
+        """
+        try:
+            sql, params = self._transcript_query(None, class_name)
+            # 使用独立游标，遍历期间执行的其他查询不会影响结果
+            cursor = self.db.connection.execute(sql, params)
+            batches = iter(lambda: cursor.fetchmany(batch_size), [])
+            yield from self._group_transcripts(row for batch in batches for row in batch)
+        except Exception as e:
+            logger.error(f"读取学生成绩单失败: {e}")
+            raise
+    
+    def _transcript_query(self, student_ids=None, class_name=None):
+        """
+        生成成绩单查询，学期合计、累计(截至当前学期)和总计均由窗口函数在同一次查询中计算
+        
+        参数:
+            student_ids (list, optional): 学号列表
+            class_name (str, optional): 班级
+        
+        返回:
+            tuple: (SQL语句, 参数列表)
+        """
+        where_clauses = []
+        params = []
+        if student_ids:
+            where_clauses.append(f"s.student_id IN ({', '.join('?' * len(student_ids))})")
+            params.extend(student_ids)
+        if class_name:
+            where_clauses.append("s.class_name = ?")
+            params.append(class_name)
+        where_sql = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+        
+        # 没有成绩的学生也返回一行(课程列为空)
+        sql = f"""
+        SELECT
+            s.student_id, s.name, s.class_name,
+            g.semester, g.course_id, c.course_name, c.credit, g.score, g.grade_point,
+            SUM(c.credit) OVER semester_window as semester_credit,
+            SUM(g.grade_point * c.credit) OVER semester_window as semester_points,
+            SUM(g.score * c.credit) OVER semester_window as semester_weighted_score,
+            AVG(g.score) OVER semester_window as semester_average_score,
+            SUM(c.credit) OVER cumulative_window as cumulative_credit,
+            SUM(g.grade_point * c.credit) OVER cumulative_window as cumulative_points,
+            SUM(g.score * c.credit) OVER cumulative_window as cumulative_weighted_score,
+            SUM(c.credit) OVER student_window as total_credit,
+            SUM(g.grade_point * c.credit) OVER student_window as total_points,
+            SUM(g.score * c.credit) OVER student_window as total_weighted_score,
+            AVG(g.score) OVER student_window as average_score
+        FROM {TABLES['students']} s
+        LEFT JOIN {TABLES['grades']} g ON g.student_id = s.student_id
+        LEFT JOIN {TABLES['courses']} c ON g.course_id = c.course_id
+        {where_sql}
+        WINDOW
+            semester_window AS (PARTITION BY s.student_id, g.semester),
+            cumulative_window AS (PARTITION BY s.student_id ORDER BY g.semester),
+            student_window AS (PARTITION BY s.student_id)
+        ORDER BY s.student_id, g.semester, g.course_id
+        """
+        return sql, params
+    
+    def _group_transcripts(self, rows):
+        """
+        将按学号、学期排序的成绩单查询结果逐个组装为成绩单
+        
+        参数:
+            rows (iterable): _transcript_query 的查询结果
+        
+        返回:
+            generator: 成绩单生成器，每读完一名学生的所有行就产出该学生的成绩单
+        """
+        transcript = None
+        semester = None
+        for row in rows:
+            if transcript is None or transcript['student_id'] != row['student_id']:
+                if transcript is not None:
+                    yield transcript
+                transcript = {
+                    'student_id': row['student_id'],
+                    'name': row['name'],
+                    'class_name': row['class_name'],
+                    'total_credit': row['total_credit'] or 0,
+                    'gpa': self._ratio(row['total_points'], row['total_credit']),
+                    'weighted_avg': self._ratio(row['total_weighted_score'], row['total_credit']),
+                    'average_score': round(row['average_score'] or 0, 2),
+                    'course_count': 0,
+                    'semesters': []
+                }
+                semester = None
+            if row['course_id'] is None:
+                continue
+            
+            if semester is None or semester['semester'] != row['semester']:
+                semester = {
+                    'semester': row['semester'],
+                    'total_credit': row['semester_credit'],
+                    'gpa': self._ratio(row['semester_points'], row['semester_credit']),
+                    'weighted_avg': self._ratio(row['semester_weighted_score'], row['semester_credit']),
+                    'average_score': round(row['semester_average_score'], 2),
+                    'cumulative_credit': row['cumulative_credit'],
+                    'cumulative_gpa': self._ratio(row['cumulative_points'], row['cumulative_credit']),
+                    'cumulative_weighted_avg': self._ratio(row['cumulative_weighted_score'], row['cumulative_credit']),
+                    'courses': []
+                }
+                transcript['semesters'].append(semester)
+            semester['courses'].append({
+                'course_id': row['course_id'],
+                'course_name': row['course_name'],
+                'credit': row['credit'],
+                'score': row['score'],
+                'grade_point': row['grade_point']
+            })
+            transcript['course_count'] += 1
+        
+        if transcript is not None:
+            yield transcript
+    
+    def _ratio(self, total, credit):
+        """按学分计算加权值，学分为0时返回0"""
+        return round(total / credit, 2) if credit else 0
\ No newline at end of file
@@ -0,0 +1,311 @@
+"""
+成绩多维分析模块
+
+在内存中维护以 学期 × 班级 × 课程 × 授课教师 × 性别 为维度的成绩立方体，
+每个单元格保存可相加的度量：成绩数、成绩和、成绩平方和、及格数、各分数段人数和绩点和。
+任意维度组合的切片和上卷只需合并对应单元格，不需要查询数据库。
+
+立方体按数据库文件在进程内共享，查询前检查数据版本：
+    - 成绩变化时读取成绩变更日志(由触发器写入)，只重新加载变更的成绩并更新对应单元格
+    - 学生或课程变化(可能改变班级、性别、授课教师)或变更日志已被清理时完整重建
+"""
+import math
+import logging
+import threading
+
+from config.database import TABLES
+
+logger = logging.getLogger(__name__)
+
+# 维度，与单元格键的顺序一致
+DIMENSIONS = ('semester', 'class_name', 'course_id', 'teacher', 'gender')
+
+# 分数段，与成绩统计页面一致
+SCORE_RANGES = ('fail', 'pass', 'medium', 'good', 'excellent')
+RANGE_EDGES = (60, 70, 80, 90)
+
+# 清理变更日志时保留的条数，其他进程的立方体落后超过该数量时完整重建
+CHANGE_LOG_KEEP = 50000
+
+# 度量在列表中的位置
+COUNT, SUM, SUM_SQ, PASSED, GRADE_POINT_SUM, RANGES = range(6)
+
+def _score_range(score):
+    """成绩所在分数段的序号"""
+    index = 0
+    for edge in RANGE_EDGES:
+        if score >= edge:
+            index += 1
+    return index
+
+class GradeCube:
+    """成绩立方体"""
+    
+    def __init__(self):
+        """初始化空的立方体"""
+        self.cells = {}
+        # 成绩ID -> (单元格键, 成绩, 绩点)，用于增量更新时撤销旧成绩的贡献
+        self.facts = {}
+        self.course_names = {}
+        self.last_seq = 0
+        self.dimension_version = None
+        self.grade_version = None
+        self.built = False
+        self._lock = threading.RLock()
+    
+    def _add(self, grade_id, key, score, grade_point):
+        """将一条成绩计入单元格"""
+        cell = self.cells.get(key)
+        if cell is None:
+            cell = self.cells[key] = [0, 0.0, 0.0, 0, 0.0, [0] * len(SCORE_RANGES)]
+        cell[COUNT] += 1
+        cell[SUM] += score
+        cell[SUM_SQ] += score * score
+        cell[PASSED] += score >= 60
+        cell[GRADE_POINT_SUM] += grade_point
+        cell[RANGES][_score_range(score)] += 1
+        self.facts[grade_id] = (key, score, grade_point)
+    
+    def _remove(self, grade_id):
+        """从单元格中撤销一条成绩"""
+        fact = self.facts.pop(grade_id, None)
+        if fact is None:
+            return
+        key, score, grade_point = fact
+        cell = self.cells[key]
+        cell[COUNT] -= 1
+        if not cell[COUNT]:
+            del self.cells[key]
+            return
+        cell[SUM] -= score
+        cell[SUM_SQ] -= score * score
+        cell[PASSED] -= score >= 60
+        cell[GRADE_POINT_SUM] -= grade_point
+        cell[RANGES][_score_range(score)] -= 1
+    
+    def _fact_sql(self):
+        """查询成绩事实及其维度的SQL"""
+        return f"""
+        SELECT g.id, g.semester, s.class_name, g.course_id, c.course_name, c.teacher, s.gender,
+               g.score, g.grade_point
+        FROM {TABLES['grades']} g
+        LEFT JOIN {TABLES['students']} s ON g.student_id = s.student_id
+        LEFT JOIN {TABLES['courses']} c ON g.course_id = c.course_id
+        """
+    
+    def _load_rows(self, rows):
+        """将查询到的成绩计入立方体"""
+        for row in rows:
+            if row['score'] is None:
+                continue
+            key = (row['semester'], row['class_name'], row['course_id'], row['teacher'], row['gender'])
+            self._add(row['id'], key, float(row['score']), float(row['grade_point'] or 0))
+            self.course_names[row['course_id']] = row['course_name']
+    
+    def rebuild(self, db):
+        """
+        完整重建立方体
+        
+        参数:
+            db (Database): 数据库实例
+        """
+        connection = db.connection
+        # 先记录变更日志位置，重建期间发生的变更会在下次增量更新时重新应用
+        self.last_seq = connection.execute(f"SELECT COALESCE(MAX(seq), 0) FROM {TABLES['grade_changes']}").fetchone()[0]
+        self.cells = {}
+        self.facts = {}
+        self.course_names = {}
+        self._load_rows(connection.execute(self._fact_sql()))
+        self.built = True
+        logger.info(f"成绩立方体已重建: {len(self.facts)} 条成绩, {len(self.cells)} 个单元格")
+    
+    def apply_changes(self, db):
+        """
+        根据成绩变更日志增量更新
+        
+        参数:
+            db (Database): 数据库实例
+        
+        返回:
+            bool: 是否成功增量更新，变更日志已被清理时返回False
+        """
+        connection = db.connection
+        oldest, last_seq = connection.execute(
+            f"SELECT MIN(seq), MAX(seq) FROM {TABLES['grade_changes']}"
+        ).fetchone()
+        if last_seq is None or last_seq <= self.last_seq:
+            return True
+        # 上次更新之后的变更日志已被清理
+        if oldest > self.last_seq + 1:
+            return False
+        
+        grade_ids = [row[0] for row in connection.execute(
+            f"SELECT DISTINCT grade_id FROM {TABLES['grade_changes']} WHERE seq > ? AND seq <= ?",
+            (self.last_seq, last_seq)
+        )]
+        for grade_id in grade_ids:
+            self._remove(grade_id)
+        # 分批重新加载仍然存在的成绩
+        for start in range(0, len(grade_ids), 500):
+            batch = grade_ids[start:start + 500]
+            placeholders = ', '.join('?' * len(batch))
+            self._load_rows(connection.execute(f"{self._fact_sql()} WHERE g.id IN ({placeholders})", batch))
+        
+        self.last_seq = last_seq
+        logger.debug(f"成绩立方体增量更新: {len(grade_ids)} 条成绩")
+        
+        prune_change_log(connection, last_seq)
+        return True
+    
+    def refresh(self, db, force=False):
+        """
+        按数据版本更新立方体
+        
+        参数:
+            db (Database): 数据库实例
+            force (bool): 是否不论数据版本完整重建
+        """
+        versions = db.get_data_versions() or {}
+        dimension_version = (versions.get(TABLES['students']), versions.get(TABLES['courses']))
+        grade_version = versions.get(TABLES['grades'])
+        
+        with self._lock:
+            if force or not self.built or dimension_version != self.dimension_version or not versions:
+                self.rebuild(db)
+            elif grade_version != self.grade_version:
+                if not self.apply_changes(db):
+                    self.rebuild(db)
+            self.dimension_version = dimension_version
+            self.grade_version = grade_version
+    
+    def members(self, dimension):
+        """
+        获取维度的所有取值
+        
+        参数:
+            dimension (str): 维度名称
+        
+        返回:
+            list: 排序后的取值列表
+        """
+        index = DIMENSIONS.index(dimension)
+        with self._lock:
+            values = {key[index] for key in self.cells}
+        return sorted(values, key=lambda value: (value is None, str(value)))
+    
+    def query(self, filters=None, group_by=None):
+        """
+        切片并按维度上卷
+        
+        参数:
+            filters (dict): 维度过滤条件 {维度: 取值}
+            group_by (str, optional): 分组维度，不提供时返回整体汇总
+        
+        返回:
+            list: 分组统计列表，每项包含分组取值、成绩数、平均分、标准差、及格率、平均绩点和分数段分布
+        """
+        conditions = [
+            (DIMENSIONS.index(dimension), value)
+            for dimension, value in (filters or {}).items()
+            if dimension in DIMENSIONS and value not in (None, '')
+        ]
+        group_index = DIMENSIONS.index(group_by) if group_by else None
+        
+        groups = {}
+        with self._lock:
+            for key, cell in self.cells.items():
+                if any(key[index] != value for index, value in conditions):
+                    continue
+                group = key[group_index] if group_index is not None else None
+                total = groups.get(group)
+                if total is None:
+                    total = groups[group] = [0, 0.0, 0.0, 0, 0.0, [0] * len(SCORE_RANGES)]
+                total[COUNT] += cell[COUNT]
+                total[SUM] += cell[SUM]
+                total[SUM_SQ] += cell[SUM_SQ]
+                total[PASSED] += cell[PASSED]
+                total[GRADE_POINT_SUM] += cell[GRADE_POINT_SUM]
+                for index, count in enumerate(cell[RANGES]):
+                    total[RANGES][index] += count
+            course_names = dict(self.course_names)
+        
+        result = []
+        for group, total in groups.items():
+            count = total[COUNT]
+            mean = total[SUM] / count
+            item = {
+                'group': group,
+                'count': count,
+                'avg_score': round(mean, 2),
+                'std': round(math.sqrt(max(total[SUM_SQ] / count - mean * mean, 0)), 2),
+                'pass_rate': round(total[PASSED] / count * 100, 2),
+                'avg_grade_point': round(total[GRADE_POINT_SUM] / count, 2),
+                'score_ranges': dict(zip(SCORE_RANGES, total[RANGES])),
+            }
+            if group_by == 'course_id':
+                item['course_name'] = course_names.get(group)
+            result.append(item)
+        result.sort(key=lambda item: (item['group'] is None, str(item['group'])))
+        return result
+
+# 按数据库文件共享的立方体
+_cubes = {}
+_cubes_lock = threading.Lock()
+
+def prune_change_log(connection, last_seq=None, keep=CHANGE_LOG_KEEP):
+    """
+    清理较早的成绩变更日志，只保留最近 keep 条
+    
+    变更日志由触发器在每次写入成绩时追加，除了增量更新立方体之外，重建立方体、启动后台任务执行器和
+    清除旧日志时也会清理，没有人查看多维分析时变更日志也不会无限增长。
+    
+    参数:
+        connection (sqlite3.Connection): 数据库连接
+        last_seq (int, optional): 最新的变更序号，不提供时从数据库读取
+        keep (int): 保留的条数
+    
+    返回:
+        int: 删除的条数
+    """
+    if last_seq is None:
+        last_seq = connection.execute(f"SELECT COALESCE(MAX(seq), 0) FROM {TABLES['grade_changes']}").fetchone()[0]
+    if last_seq <= keep:
+        return 0
+    return connection.execute(f"DELETE FROM {TABLES['grade_changes']} WHERE seq <= ?", (last_seq - keep,)).rowcount
+
+def _cube_for(db):
+    """获取数据库对应的成绩立方体实例，不存在时创建"""
+    with _cubes_lock:
+        cube = _cubes.get(db.config['name'])
+        if cube is None:
+            cube = _cubes[db.config['name']] = GradeCube()
+    return cube
+
+def get_grade_cube(db):
+    """
+    获取数据库对应的成绩立方体，并按数据版本更新
+    
+    参数:
+        db (Database): 数据库实例
+    
+    返回:
+        GradeCube: 成绩立方体
+    """
+    cube = _cube_for(db)
+    cube.refresh(db)
+    return cube
+
+def rebuild_grade_cube(db):
+    """
+    完整重建数据库对应的成绩立方体，不依赖变更日志
+    
+    参数:
+        db (Database): 数据库实例
+    
+    返回:
+        GradeCube: 重建后的成绩立方体
+    """
+    cube = _cube_for(db)
+    cube.refresh(db, force=True)
+    prune_change_log(db.connection)
+    return cube
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""
+身份映射模块
+
+在一次请求（或一次命令行操作）内按主键缓存模型查询结果，
+同一请求内重复的主键查询直接从内存返回，通过同一模型写入时自动失效。
+"""
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+class IdentityMap:
+    """请求级身份映射，只在激活期间缓存主键查询结果"""
+    
+    def __init__(self):
+        """初始化身份映射"""
+        self._depth = 0
+        self._rows = {}
+        self.hits = 0
+        self.misses = 0
+    
+    @property
+    def active(self):
+        """是否处于激活状态"""
+        return self._depth > 0
+    
+    def begin(self):
+        """激活身份映射，可嵌套调用"""
+        self._depth += 1
+    
+    def end(self):
+        """结束一层激活，最外层结束时清空缓存"""
+        if self._depth > 0:
+            self._depth -= 1
+        if self._depth == 0:
+            self.clear()
+    
+    @contextmanager
+    def scope(self):
+        """在上下文范围内激活身份映射"""
+        self.begin()
+        try:
+            yield self
+        finally:
+            self.end()
+    
+    def get(self, table, key):
+        """
+        获取缓存的记录
+        
+        参数:
+            table (str): 表名
+            key: 主键值
+        
+        返回:
+            dict: 记录字典的副本，未命中或未激活时返回None
+        """
+        if not self._depth:
+            return None
+        
+        row = self._rows.get(table, {}).get(key)
+        if row is None:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        # 返回副本，避免调用方修改缓存中的记录
+        return dict(row)
+    
+    def put(self, table, key, row):
+        """
+        缓存记录
+        
+        参数:
+            table (str): 表名
+            key: 主键值
+            row (dict): 记录字典
+        """
+        if self._depth and row is not None:
+            self._rows.setdefault(table, {})[key] = dict(row)
+    
+    def evict(self, table, key=None):
+        """
+        使缓存失效
+        
+        参数:
+            table (str): 表名
+            key: 主键值，不提供则使整张表的缓存失效
+        """
+        if key is None:
+            self._rows.pop(table, None)
+        else:
+            self._rows.get(table, {}).pop(key, None)
+    
+    def clear(self):
+        """清空所有缓存"""
+        self._rows.clear()
\ No newline at end of file
@@ -0,0 +1,177 @@
+"""
+导入任务模型模块
+"""
+import json
+import logging
+import sqlite3
+
+from config.database import TABLES
+from models.database import Database
+
+logger = logging.getLogger(__name__)
+
+class ImportJob:
+    """导入任务模型类，记录流式导入的进度、结果和失败的行"""
+    
+    def __init__(self, db=None):
+        """初始化导入任务模型"""
+        self.db = db if db else Database()
+        if not hasattr(self.db, 'connection') or self.db.connection is None:
+            self.db.connect()
+    
+    def create_job(self, job_data):
+        """
+        创建导入任务
+        
+        参数:
+            job_data (dict): 任务信息字典，包含以下字段:
+                - kind: 导入类型(grades 或 students)
+                - filename: 上传的文件名
+                - file_path: 保存的文件路径
+                - file_size: 文件大小
+                - username: 发起导入的用户
+                - chunk_size: 每批处理的行数
+        
+        返回:
+            int: 任务ID，创建失败返回None
+        """
+        try:
+            fields = ', '.join(job_data.keys())
+            placeholders = ', '.join(['?'] * len(job_data))
+            sql = f"INSERT INTO {TABLES['import_jobs']} ({fields}) VALUES ({placeholders})"
+            cursor = self.db.execute(sql, list(job_data.values()))
+            self.db.commit()
+            return cursor.lastrowid
+        except sqlite3.Error as e:
+            self.db.rollback()
+            logger.error(f"创建导入任务失败: {e}")
+            return None
+    
+    def get_job(self, job_id):
+        """
+        获取导入任务
+        
+        参数:
+            job_id (int): 任务ID
+        
+        返回:
+            dict: 任务信息，fieldnames 为字段名列表，未找到返回None
+        """
+        try:
+            self.db.execute(f"SELECT * FROM {TABLES['import_jobs']} WHERE id = ?", (job_id,))
+            job = self.db.fetchone()
+            if not job:
+                return None
+            job = dict(job)
+            job['fieldnames'] = json.loads(job['fieldnames']) if job['fieldnames'] else None
+            return job
+        except sqlite3.Error as e:
+            logger.error(f"获取导入任务失败: {e}")
+            return None
+    
+    def get_jobs(self, username=None, limit=20):
+        """
+        获取最近的导入任务
+        
+        参数:
+            username (str, optional): 只返回该用户发起的任务
+            limit (int): 返回的任务数
+        
+        返回:
+            list: 任务信息列表，按创建时间倒序
+        """
+        try:
+            sql = f"""
+            SELECT id, kind, filename, file_size, username, status, byte_offset, rows_processed,
+                   success_count, failed_count, error, created_at, updated_at, finished_at
+            FROM {TABLES['import_jobs']}
+            """
+            params = []
+            if username:
+                sql += " WHERE username = ?"
+                params.append(username)
+            sql += " ORDER BY id DESC LIMIT ?"
+            params.append(limit)
+            self.db.execute(sql, params)
+            return [dict(row) for row in self.db.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"获取导入任务列表失败: {e}")
+            return []
+    
+    def set_status(self, job_id, status, error=None):
+        """
+        更新任务状态，完成或失败时记录结束时间
+        
+        参数:
+            job_id (int): 任务ID
+            status (str): pending、running、failed 或 completed
+            error (str, optional): 失败原因
+        
+        返回:
+            bool: 更新成功返回True，否则返回False
+        """
+        try:
+            finished = "CURRENT_TIMESTAMP" if status in ('failed', 'completed') else "NULL"
+            sql = f"""
+            UPDATE {TABLES['import_jobs']}
+            SET status = ?, error = ?, updated_at = CURRENT_TIMESTAMP, finished_at = {finished}
+            WHERE id = ?
+            """
+            self.db.execute(sql, (status, error, job_id))
+            self.db.commit()
+            return True
+        except sqlite3.Error as e:
+            self.db.rollback()
+            logger.error(f"更新导入任务状态失败: {e}")
+            return False
+    
+    def record_chunk(self, job_id, fieldnames, byte_offset, row_count, success_count, failed_rows):
+        """
+        记录一批数据的导入进度和失败的行
+        
+        在调用方的事务中执行，不提交事务，使进度与这一批数据的写入同时提交或回滚。
+        
+        参数:
+            job_id (int): 任务ID
+            fieldnames (list): CSV字段名
+            byte_offset (int): 这一批数据在文件中的结束位置
+            row_count (int): 这一批的行数
+            success_count (int): 导入成功的行数
+            failed_rows (list): 失败的行，每项为 (行号, 行数据, 原因)
+        """
+        self.db.execute(f"""
+        UPDATE {TABLES['import_jobs']}
+        SET fieldnames = ?, byte_offset = ?, rows_processed = rows_processed + ?,
+            success_count = success_count + ?, failed_count = failed_count + ?, updated_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+        """, (json.dumps(fieldnames, ensure_ascii=False), byte_offset, row_count,
+              success_count, len(failed_rows), job_id))
+        if failed_rows:
+            self.db.connection.executemany(
+                f"INSERT INTO {TABLES['import_job_errors']} (job_id, row_number, data, reason) VALUES (?, ?, ?, ?)",
+                [(job_id, row_number, json.dumps(data, ensure_ascii=False), reason)
+                 for row_number, data, reason in failed_rows]
+            )
+    
+    def get_errors(self, job_id, limit=100, offset=0):
+        """
+        获取导入失败的行
+        
+        参数:
+            job_id (int): 任务ID
+            limit (int): 返回的行数
+            offset (int): 偏移量
+        
+        返回:
+            list: 失败记录列表，每项包含 row_number、data 和 reason
+        """
+        try:
+            self.db.execute(f"""
+            SELECT row_number, data, reason FROM {TABLES['import_job_errors']}
+            WHERE job_id = ? ORDER BY row_number LIMIT ? OFFSET ?
+            """, (job_id, limit, offset))
+            return [{'row_number': row['row_number'], 'data': json.loads(row['data']), 'reason': row['reason']}
+                    for row in self.db.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"获取导入失败记录失败: {e}")
+            return []
\ No newline at end of file
@@ -0,0 +1,301 @@
+"""
+后台任务模型模块
+"""
+import json
+import logging
+import sqlite3
+
+from config.database import TABLES
+from models.database import Database
+
+logger = logging.getLogger(__name__)
+
+# 已结束的任务状态
+FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+class Job:
+    """后台任务模型类，jobs 表同时作为任务队列和任务结果的存储"""
+    
+    def __init__(self, db=None):
+        """初始化后台任务模型"""
+        self.db = db if db else Database()
+        if not hasattr(self.db, 'connection') or self.db.connection is None:
+            self.db.connect()
+    
+    def create_job(self, kind, params, username):
+        """
+        创建排队中的任务
+        
+        参数:
+            kind (str): 任务类型
+            params (dict): 任务参数
+            username (str): 提交任务的用户
+        
+        返回:
+            int: 任务ID，创建失败返回None
+        """
+        try:
+            cursor = self.db.execute(
+                f"INSERT INTO {TABLES['jobs']} (kind, params, username) VALUES (?, ?, ?)",
+                (kind, json.dumps(params or {}, ensure_ascii=False), username)
+            )
+            self.db.commit()
+            return cursor.lastrowid
+        except sqlite3.Error as e:
+            self.db.rollback()
+            logger.error(f"创建后台任务失败: {e}")
+            return None
+    
+    def get_job(self, job_id):
+        """
+        获取任务
+        
+        参数:
+            job_id (int): 任务ID
+        
+        返回:
+            dict: 任务信息，params 和 result 已解码，未找到返回None
+        """
+        try:
+            self.db.execute(f"SELECT * FROM {TABLES['jobs']} WHERE id = ?", (job_id,))
+            row = self.db.fetchone()
+            return self._decode(row) if row else None
+        except sqlite3.Error as e:
+            logger.error(f"获取后台任务失败: {e}")
+            return None
+    
+    def get_jobs(self, username=None, limit=50):
+        """
+        获取最近的任务
+        
+        参数:
+            username (str, optional): 只返回该用户提交的任务
+            limit (int): 返回的任务数
+        
+        返回:
+            list: 任务信息列表，按提交时间倒序
+        """
+        try:
+            sql = f"SELECT * FROM {TABLES['jobs']}"
+            params = []
+            if username:
+                sql += " WHERE username = ?"
+                params.append(username)
+            sql += " ORDER BY id DESC LIMIT ?"
+            params.append(limit)
+            self.db.execute(sql, params)
+            return [self._decode(row) for row in self.db.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"获取后台任务列表失败: {e}")
+            return []
+    
+    def get_queued_ids(self):
+        """获取排队中的任务ID，按提交顺序"""
+        try:
+            self.db.execute(f"SELECT id FROM {TABLES['jobs']} WHERE status = 'queued' ORDER BY id")
+            return [row['id'] for row in self.db.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"获取排队中的任务失败: {e}")
+            return []
+    
+    def has_active_job(self, kind, param, value, stale_seconds):
+        """
+        是否有排队中或正在执行的同类任务的某个参数等于给定值
+        
+        参数:
+            kind (str): 任务类型
+            param (str): 参数名
+            value: 参数值
+            stale_seconds (int): 执行中的任务超过该秒数没有更新时视为已中断
+        
+        返回:
+            bool: 存在返回True
+        """
+        try:
+            self.db.execute(f"""
+            SELECT 1 FROM {TABLES['jobs']}
+            WHERE kind = ? AND json_extract(params, ?) = ?
+              AND (status = 'queued' OR (status = 'running' AND updated_at >= datetime('now', ?)))
+            LIMIT 1
+            """, (kind, f'$.{param}', value, f'-{int(stale_seconds)} seconds'))
+            return self.db.fetchone() is not None
+        except sqlite3.Error as e:
+            logger.error(f"查询后台任务失败: {e}")
+            return False
+    
+    def claim_job(self, job_id):
+        """
+        认领排队中的任务并标记为执行中，任务已被其他线程或进程认领、已取消时返回False
+        
+        参数:
+            job_id (int): 任务ID
+        
+        返回:
+            bool: 认领成功返回True
+        """
+        try:
+            cursor = self.db.execute(f"""
+            UPDATE {TABLES['jobs']}
+            SET status = 'running', started_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = 'queued'
+            """, (job_id,))
+            self.db.commit()
+            return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            self.db.rollback()
+            logger.error(f"认领后台任务失败: {e}")
+            return False
+    
+    def update_progress(self, job_id, current, total=None, message=None):
+        """
+        更新任务进度
+        
+        参数:
+            job_id (int): 任务ID
+            current (int): 已完成的数量
+            total (int, optional): 总数量
+            message (str, optional): 进度说明
+        
+        返回:
+            bool: 任务是否已被请求取消
+        """
+        try:
+            self.db.execute(f"""
+            UPDATE {TABLES['jobs']}
+            SET progress_current = ?, progress_total = COALESCE(?, progress_total),
+                message = COALESCE(?, message), updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """, (current, total, message, job_id))
+            self.db.commit()
+            self.db.execute(f"SELECT cancel_requested FROM {TABLES['jobs']} WHERE id = ?", (job_id,))
+            row = self.db.fetchone()
+            return bool(row and row['cancel_requested'])
+        except sqlite3.Error as e:
+            self.db.rollback()
+            logger.error(f"更新后台任务进度失败: {e}")
+            return False
+    
+    def touch_jobs(self, job_ids):
+        """
+        更新执行中任务的心跳时间，长时间没有进度的任务不会被误判为已中断
+        
+        参数:
+            job_ids (list): 任务ID列表
+        """
+        if not job_ids:
+            return
+        try:
+            placeholders = ', '.join('?' * len(job_ids))
+            self.db.execute(f"""
+            UPDATE {TABLES['jobs']} SET updated_at = CURRENT_TIMESTAMP
+            WHERE status = 'running' AND id IN ({placeholders})
+            """, list(job_ids))
+            self.db.commit()
+        except sqlite3.Error as e:
+            self.db.rollback()
+            logger.error(f"更新后台任务心跳失败: {e}")
+    
+    def finish_job(self, job_id, status, message=None, result=None):
+        """
+        记录任务结束的状态和结果
+        
+        参数:
+            job_id (int): 任务ID
+            status (str): succeeded、failed 或 cancelled
+            message (str, optional): 结果说明
+            result (optional): 可JSON序列化的任务结果
+        
+        返回:
+            bool: 更新成功返回True，否则返回False
+        """
+        try:
+            self.db.execute(f"""
+            UPDATE {TABLES['jobs']}
+            SET status = ?, message = ?, result = ?, updated_at = CURRENT_TIMESTAMP, finished_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """, (status, message, json.dumps(result, ensure_ascii=False, default=str), job_id))
+            self.db.commit()
+            return True
+        except sqlite3.Error as e:
+            self.db.rollback()
+            logger.error(f"更新后台任务结果失败: {e}")
+            return False
+    
+    def request_cancel(self, job_id):
+        """
+        请求取消任务，排队中的任务直接取消，执行中的任务在下次报告进度时停止
+        
+        参数:
+            job_id (int): 任务ID
+        
+        返回:
+            bool: 任务尚未结束、请求已记录时返回True
+        """
+        try:
+            cursor = self.db.execute(f"""
+            UPDATE {TABLES['jobs']}
+            SET cancel_requested = 1,
+                status = CASE status WHEN 'queued' THEN 'cancelled' ELSE status END,
+                message = CASE status WHEN 'queued' THEN '任务已取消' ELSE message END,
+                finished_at = CASE status WHEN 'queued' THEN CURRENT_TIMESTAMP ELSE finished_at END,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status IN ('queued', 'running')
+            """, (job_id,))
+            self.db.commit()
+            return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            self.db.rollback()
+            logger.error(f"取消后台任务失败: {e}")
+            return False
+    
+    def fail_stale_jobs(self, stale_seconds):
+        """
+        将长时间没有更新的执行中任务标记为失败，这些任务所在的进程已经退出
+        
+        参数:
+            stale_seconds (int): 超过该秒数没有更新的任务视为已中断
+        
+        返回:
+            int: 标记的任务数
+        """
+        try:
+            cursor = self.db.execute(f"""
+            UPDATE {TABLES['jobs']}
+            SET status = 'failed', message = '任务执行中断，可能是服务已重启', finished_at = CURRENT_TIMESTAMP
+            WHERE status = 'running' AND updated_at < datetime('now', ?)
+            """, (f'-{int(stale_seconds)} seconds',))
+            self.db.commit()
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            self.db.rollback()
+            logger.error(f"清理中断的后台任务失败: {e}")
+            return 0
+    
+    def purge_finished(self, days):
+        """
+        删除结束超过指定天数的任务及其结果
+        
+        参数:
+            days (int): 保留的天数
+        
+        返回:
+            int: 删除的任务数
+        """
+        try:
+            cursor = self.db.execute(f"""
+            DELETE FROM {TABLES['jobs']}
+            WHERE status IN ({', '.join('?' * len(FINISHED_STATUSES))}) AND finished_at < datetime('now', ?)
+            """, (*FINISHED_STATUSES, f'-{int(days)} days'))
+            self.db.commit()
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            self.db.rollback()
+            logger.error(f"清理过期后台任务失败: {e}")
+            return 0
+    
+    def _decode(self, row):
+        """将查询结果转换为字典并解码JSON字段"""
+        job = dict(row)
+        job['params'] = json.loads(job['params']) if job['params'] else {}
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
\ No newline at end of file
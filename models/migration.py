@@ -0,0 +1,331 @@
+"""
+数据库迁移模块
+
+迁移文件保存在 migrations/ 目录，文件名为 "编号_说明.py"(如 0002_courses_semester.py)，按编号顺序执行，
+已执行的迁移记录在 schema_version 表中。每个迁移文件定义:
+    DESCRIPTION (str): 迁移说明
+    upgrade(migration): 修改表结构，与版本记录在同一事务中执行，失败时整体回滚
+    backfill(migration): 可选，分批回填数据，在 upgrade 提交后执行，每批单独提交，
+                         中断后再次运行会从头检查并跳过已回填的行，因此回填条件需要排除已处理的行
+
+用法:
+    python -m models.migration [--status] [--batch-size 2000] [--db 数据库文件]
+"""
+import os
+import re
+import sys
+import time
+import sqlite3
+import logging
+import argparse
+import importlib.util
+
+from config.settings import BASE_DIR, DATABASE_CONFIG
+from config.database import TABLES
+
+logger = logging.getLogger(__name__)
+
+# 迁移文件目录和文件名格式
+MIGRATIONS_DIR = os.path.join(BASE_DIR, 'migrations')
+MIGRATION_FILE_PATTERN = re.compile(r'^(\d{4})_(\w+)\.py$')
+
+# 回填数据时每批更新的行数，每批在单独的事务中提交，写锁只在一批内持有
+BACKFILL_BATCH_SIZE = 2000
+
+class MigrationError(Exception):
+    """迁移执行失败"""
+
+def discover_migrations(migrations_dir=MIGRATIONS_DIR):
+    """
+    查找迁移文件
+    
+    参数:
+        migrations_dir (str): 迁移文件目录
+    
+    返回:
+        list: 按编号排序的 (版本号, 名称, 文件路径)
+    """
+    migrations = []
+    for filename in os.listdir(migrations_dir):
+        match = MIGRATION_FILE_PATTERN.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(migrations_dir, filename)))
+    migrations.sort()
+    
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise MigrationError(f"迁移编号重复: {versions}")
+    return migrations
+
+def load_migration(version, name, path):
+    """导入迁移文件，返回模块"""
+    spec = importlib.util.spec_from_file_location(f"migrations.m{version:04d}_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if not hasattr(module, 'upgrade'):
+        raise MigrationError(f"迁移 {version:04d}_{name} 未定义 upgrade 函数")
+    return module
+
+class Migration:
+    """传给迁移函数的操作对象，封装常用的表结构检查和分批回填"""
+    
+    def __init__(self, connection, version, name, batch_size=BACKFILL_BATCH_SIZE, progress=None):
+        """
+        初始化迁移操作对象
+        
+        参数:
+            connection (sqlite3.Connection): 数据库连接
+            version (int): 迁移版本号
+            name (str): 迁移名称
+            batch_size (int): 回填时每批更新的行数
+            progress (callable, optional): 回填进度回调，参数为 (迁移名称, 已检查的行号, 最大行号, 已更新行数)
+        """
+        self.connection = connection
+        self.version = version
+        self.name = name
+        self.batch_size = batch_size
+        self.progress = progress
+    
+    def execute(self, sql, params=()):
+        """执行SQL语句"""
+        return self.connection.execute(sql, params)
+    
+    def table_exists(self, table):
+        """表是否存在"""
+        row = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()
+        return row is not None
+    
+    def column_exists(self, table, column):
+        """表中是否存在该列"""
+        return any(row[1] == column for row in self.connection.execute(f"PRAGMA table_info({table})"))
+    
+    def add_column(self, table, column, definition):
+        """
+        添加列，列已存在时跳过
+        
+        SQLite的 ADD COLUMN 只修改表定义，不复制表数据，大表上也能立即完成。
+        新列的默认值只能是常量，需要根据其他列计算的值在 backfill 中分批写入。
+        
+        参数:
+            table (str): 表名
+            column (str): 列名
+            definition (str): 列类型和约束，如 "TEXT" 或 "INTEGER NOT NULL DEFAULT 0"
+        
+        返回:
+            bool: 是否添加了列
+        """
+        if self.column_exists(table, column):
+            return False
+        self.connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        logger.info(f"迁移 {self.version:04d}: 表 {table} 添加列 {column}")
+        return True
+    
+    def backfill(self, table, assignments, where, params=(), batch_size=None):
+        """
+        按rowid范围分批更新数据，每批在单独的事务中提交
+        
+        只能在迁移的 backfill 函数中使用。更新按rowid区间推进，即使更新后的行仍满足条件也不会重复处理；
+        where 条件需要排除已回填的行(如 "new_column IS NULL")，中断后重新执行时才不会重复写入。
+        
+        参数:
+            table (str): 表名
+            assignments (str): SET子句，如 "grade_point = score / 25"
+            where (str): 需要回填的行的条件
+            params (tuple): assignments 和 where 中的参数
+            batch_size (int, optional): 每批检查的rowid数量，默认使用迁移的批大小
+        
+        返回:
+            int: 更新的行数
+        """
+        batch_size = batch_size or self.batch_size
+        max_rowid = self.connection.execute(f"SELECT MAX(rowid) FROM {table}").fetchone()[0] or 0
+        sql = f"UPDATE {table} SET {assignments} WHERE rowid > ? AND rowid <= ? AND ({where})"
+        
+        updated = 0
+        start = 0
+        while start < max_rowid:
+            end = min(start + batch_size, max_rowid)
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                updated += self.connection.execute(sql, (*params, start, end)).rowcount
+                self.connection.execute("COMMIT")
+            except sqlite3.Error:
+                self.connection.execute("ROLLBACK")
+                raise
+            start = end
+            if self.progress:
+                self.progress(self.name, end, max_rowid, updated)
+        
+        logger.info(f"迁移 {self.version:04d}: 表 {table} 回填 {updated} 行")
+        return updated
+
+class MigrationRunner:
+    """迁移执行器，按编号执行尚未应用的迁移"""
+    
+    def __init__(self, db, migrations_dir=MIGRATIONS_DIR):
+        """
+        初始化迁移执行器
+        
+        参数:
+            db (Database): 已连接的数据库实例
+            migrations_dir (str): 迁移文件目录
+        """
+        self.db = db
+        self.connection = db.connection
+        self.migrations = discover_migrations(migrations_dir)
+        self.latest_version = self.migrations[-1][0] if self.migrations else 0
+    
+    def ensure_version_table(self):
+        """创建迁移版本表"""
+        self.connection.execute(f'''
+        CREATE TABLE IF NOT EXISTS {TABLES['schema_version']} (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            backfilled_at TIMESTAMP,
+            duration_ms REAL
+        )
+        ''')
+    
+    def applied_migrations(self):
+        """
+        获取已执行的迁移
+        
+        返回:
+            dict: {版本号: 版本记录}
+        """
+        self.ensure_version_table()
+        rows = self.connection.execute(f"SELECT * FROM {TABLES['schema_version']}").fetchall()
+        return {row['version']: dict(row) for row in rows}
+    
+    def status(self):
+        """
+        获取各迁移的执行状态
+        
+        返回:
+            list: 迁移状态列表，state 为 applied、backfilling(回填未完成) 或 pending
+        """
+        applied = self.applied_migrations()
+        result = []
+        for version, name, path in self.migrations:
+            record = applied.get(version)
+            if record is None:
+                state = 'pending'
+            elif record['backfilled_at'] is None and hasattr(load_migration(version, name, path), 'backfill'):
+                state = 'backfilling'
+            else:
+                state = 'applied'
+            result.append({
+                'version': version,
+                'name': name,
+                'state': state,
+                'applied_at': record['applied_at'] if record else None,
+                'duration_ms': record['duration_ms'] if record else None
+            })
+        return result
+    
+    def upgrade(self, batch_size=BACKFILL_BATCH_SIZE, progress=None):
+        """
+        执行尚未应用的迁移和未完成的回填
+        
+        参数:
+            batch_size (int): 回填时每批更新的行数
+            progress (callable, optional): 回填进度回调
+        
+        返回:
+            list: 本次执行的迁移版本号
+        """
+        applied = self.applied_migrations()
+        executed = []
+        for version, name, path in self.migrations:
+            record = applied.get(version)
+            if record is not None and record['backfilled_at'] is not None:
+                continue
+            
+            module = load_migration(version, name, path)
+            migration = Migration(self.connection, version, name, batch_size, progress)
+            if record is None and self._apply(migration, module):
+                executed.append(version)
+            if hasattr(module, 'backfill'):
+                logger.info(f"迁移 {version:04d}_{name}: 开始回填数据")
+                module.backfill(migration)
+            self.connection.execute(
+                f"UPDATE {TABLES['schema_version']} SET backfilled_at = CURRENT_TIMESTAMP WHERE version = ?",
+                (version,)
+            )
+        
+        # 全部迁移完成后记录版本号，之后启动时只需比较该版本号
+        self.connection.execute(f"PRAGMA user_version = {int(self.latest_version)}")
+        return executed
+    
+    def _apply(self, migration, module):
+        """
+        在一个事务中执行迁移的表结构修改并记录版本
+        
+        多个进程同时启动时都可能认为该迁移尚未执行，取得写锁后重新检查版本记录，
+        已被其他进程执行的迁移直接跳过。
+        
+        返回:
+            bool: 是否执行了迁移
+        """
+        start = time.perf_counter()
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            applied = self.connection.execute(
+                f"SELECT 1 FROM {TABLES['schema_version']} WHERE version = ?", (migration.version,)
+            ).fetchone()
+            if applied is not None:
+                self.connection.execute("ROLLBACK")
+                logger.info(f"迁移 {migration.version:04d}_{migration.name} 已由其他进程执行，跳过")
+                return False
+            module.upgrade(migration)
+            duration_ms = round((time.perf_counter() - start) * 1000, 2)
+            self.connection.execute(
+                f"INSERT INTO {TABLES['schema_version']} (version, name, duration_ms) VALUES (?, ?, ?)",
+                (migration.version, migration.name, duration_ms)
+            )
+            self.connection.execute("COMMIT")
+        except Exception as e:
+            self.connection.execute("ROLLBACK")
+            logger.error(f"迁移 {migration.version:04d}_{migration.name} 失败，已回滚: {e}")
+            raise MigrationError(f"迁移 {migration.version:04d}_{migration.name} 失败: {e}") from e
+        logger.info(f"迁移 {migration.version:04d}_{migration.name} 完成，耗时 {duration_ms}ms")
+        return True
+
+def main():
+    from models.database import Database
+    
+    parser = argparse.ArgumentParser(description='执行数据库迁移')
+    parser.add_argument('--status', action='store_true', help='只显示各迁移的执行状态')
+    parser.add_argument('--batch-size', type=int, default=BACKFILL_BATCH_SIZE, help='回填时每批更新的行数')
+    parser.add_argument('--db', default=DATABASE_CONFIG['name'], help='数据库文件路径')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    
+    db = Database(dict(DATABASE_CONFIG, name=args.db))
+    if not db.connect():
+        return 1
+    
+    def show_progress(name, position, total, updated):
+        print(f"\r{name}: 已检查 {position}/{total} 行，更新 {updated} 行", end='', flush=True)
+        if position == total:
+            print()
+    
+    try:
+        runner = MigrationRunner(db)
+        if not args.status:
+            executed = runner.upgrade(args.batch_size, show_progress)
+            print(f"已执行 {len(executed)} 个迁移，当前版本: {runner.latest_version}")
+        for item in runner.status():
+            print(f"{item['version']:04d}_{item['name']:30s} {item['state']:12s} {item['applied_at'] or ''}")
+    except MigrationError as e:
+        print(e)
+        return 1
+    finally:
+        db.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
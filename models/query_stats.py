@@ -0,0 +1,232 @@
+"""
+SQL执行统计模块
+
+按需启用(配置 SQL_STATS_ENABLED 或环境变量 SQL_STATS=1)，启用后 Database.execute 记录每条语句的耗时和返回行数：
+    - 按规范化后的SQL指纹(去掉字面量、合并IN列表)汇总调用次数、总耗时、最大耗时和行数
+    - 按Web请求或命令行菜单操作统计语句数、耗时和各指纹的调用次数，便于发现N+1查询
+    - 超过阈值的慢查询连同 EXPLAIN QUERY PLAN 结果写入慢查询日志
+
+未启用时 Database.execute 只多一次属性判断。
+"""
+import os
+import re
+import json
+import time
+import logging
+import threading
+import functools
+
+logger = logging.getLogger(__name__)
+
+# 慢查询单独写入日志文件，不混入系统日志
+slow_logger = logging.getLogger('sql.slow')
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_LIST = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+
+# 不需要(也不能)生成执行计划的语句
+_NO_EXPLAIN = ('PRAGMA', 'BEGIN', 'COMMIT', 'ROLLBACK', 'CREATE', 'DROP', 'ALTER', 'ANALYZE', 'VACUUM', 'EXPLAIN')
+
+@functools.lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """
+    计算SQL语句的指纹：去掉注释和字面量，合并空白和占位符列表
+    
+    参数:
+        sql (str): SQL语句
+    
+    返回:
+        str: 规范化后的SQL
+    """
+    text = _COMMENT.sub(' ', sql)
+    text = _STRING.sub('?', text)
+    text = _NUMBER.sub('?', text)
+    text = _WHITESPACE.sub(' ', text).strip()
+    text = _PLACEHOLDER_LIST.sub('(...)', text)
+    return _VALUES_LIST.sub('(...)', text)
+
+class QueryScope:
+    """一次Web请求或命令行操作内的SQL统计"""
+    
+    def __init__(self, name):
+        """
+        初始化统计范围
+        
+        参数:
+            name (str): 范围名称，如 "GET /students/list" 或 "成绩管理"
+        """
+        self.name = name
+        self.started = time.perf_counter()
+        self.count = 0
+        self.time = 0.0
+        self.rows = 0
+        self.fingerprints = {}
+    
+    def summary(self, repeated=3):
+        """
+        生成统计摘要
+        
+        参数:
+            repeated (int): 同一指纹调用次数达到该值时列出，用于发现循环查询
+        
+        返回:
+            dict: 统计摘要
+        """
+        return {
+            'name': self.name,
+            'queries': self.count,
+            'db_ms': round(self.time * 1000, 3),
+            'rows': self.rows,
+            'elapsed_ms': round((time.perf_counter() - self.started) * 1000, 3),
+            'repeated': {
+                sql: count for sql, count in sorted(self.fingerprints.items(), key=lambda item: -item[1])
+                if count >= repeated
+            },
+        }
+
+class QueryStats:
+    """进程级SQL指纹统计"""
+    
+    def __init__(self, slow_ms=100, explain=True, slow_log_file=None):
+        """
+        初始化统计器
+        
+        参数:
+            slow_ms (float): 慢查询阈值(毫秒)，0表示不记录慢查询
+            explain (bool): 是否为慢查询附加 EXPLAIN QUERY PLAN 结果
+            slow_log_file (str): 慢查询日志文件，未提供时只写入 sql.slow 日志记录器
+        """
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self._lock = threading.Lock()
+        # 指纹 -> [调用次数, 总耗时, 最大耗时, 返回行数]
+        self._totals = {}
+        
+        if slow_log_file and not slow_logger.handlers:
+            os.makedirs(os.path.dirname(slow_log_file), exist_ok=True)
+            handler = logging.FileHandler(slow_log_file, encoding='utf-8', delay=True)
+            handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
+            slow_logger.addHandler(handler)
+            slow_logger.setLevel(logging.INFO)
+            slow_logger.propagate = False
+    
+    def record(self, db, sql, params, elapsed, rows):
+        """
+        记录一条已执行完毕(结果已读取)的语句
+        
+        参数:
+            db (Database): 执行语句的数据库实例
+            sql (str): SQL语句
+            params: 语句参数
+            elapsed (float): 执行和读取结果的总耗时(秒)
+            rows (int): 返回或影响的行数
+        """
+        key = fingerprint(sql)
+        with self._lock:
+            entry = self._totals.get(key)
+            if entry is None:
+                self._totals[key] = [1, elapsed, elapsed, rows]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[3] += rows
+                if elapsed > entry[2]:
+                    entry[2] = elapsed
+        
+        scope = db.query_scope
+        if scope is not None:
+            scope.fingerprints[key] = scope.fingerprints.get(key, 0) + 1
+        
+        if self.slow_ms and elapsed * 1000 >= self.slow_ms:
+            self._log_slow_query(db, sql, params, elapsed, rows, scope)
+    
+    def _log_slow_query(self, db, sql, params, elapsed, rows, scope):
+        """写入慢查询日志"""
+        plan = ''
+        if self.explain and not sql.lstrip().upper().startswith(_NO_EXPLAIN):
+            try:
+                # 使用独立游标，不影响模型依赖的 self.cursor 状态
+                plan_rows = db.connection.execute(f"EXPLAIN QUERY PLAN {sql}", params or ()).fetchall()
+                plan = '\n'.join(f"    {row[0]}|{row[1]}| {row[3]}" for row in plan_rows)
+            except Exception as e:
+                plan = f"    无法获取执行计划: {e}"
+        
+        slow_logger.warning(
+            f"慢查询 {elapsed * 1000:.1f}ms 行数 {rows} 范围 {scope.name if scope else '-'}\n"
+            f"  SQL: {_WHITESPACE.sub(' ', sql).strip()}\n"
+            f"  参数: {params}" + (f"\n  执行计划:\n{plan}" if plan else '')
+        )
+    
+    def top(self, n=10, order_by='total_ms'):
+        """
+        获取开销最大的SQL指纹
+        
+        参数:
+            n (int): 返回的条数
+            order_by (str): 排序字段，total_ms, calls, max_ms, avg_ms 或 rows
+        
+        返回:
+            list: 指纹统计列表
+        """
+        with self._lock:
+            items = [(key, list(entry)) for key, entry in self._totals.items()]
+        
+        result = [
+            {
+                'fingerprint': key,
+                'calls': calls,
+                'total_ms': round(total * 1000, 3),
+                'avg_ms': round(total * 1000 / calls, 3),
+                'max_ms': round(longest * 1000, 3),
+                'rows': rows,
+            }
+            for key, (calls, total, longest, rows) in items
+        ]
+        result.sort(key=lambda item: item.get(order_by, 0), reverse=True)
+        return result[:n]
+    
+    def dump(self, path, n=50, order_by='total_ms'):
+        """
+        将开销最大的SQL指纹写入JSON文件
+        
+        参数:
+            path (str): 输出文件路径
+            n (int): 写入的条数
+            order_by (str): 排序字段
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.top(n, order_by), f, ensure_ascii=False, indent=2)
+    
+    def reset(self):
+        """清空统计数据"""
+        with self._lock:
+            self._totals.clear()
+
+# 进程级统计器，未启用时为None
+_query_stats = None
+
+def enable_query_stats(slow_ms=100, explain=True, slow_log_file=None):
+    """
+    启用SQL执行统计，之后创建的数据库实例开始记录
+    
+    参数:
+        slow_ms (float): 慢查询阈值(毫秒)
+        explain (bool): 是否为慢查询附加执行计划
+        slow_log_file (str): 慢查询日志文件
+    
+    返回:
+        QueryStats: 统计器
+    """
+    global _query_stats
+    if _query_stats is None:
+        _query_stats = QueryStats(slow_ms, explain, slow_log_file)
+        logger.info(f"已启用SQL执行统计，慢查询阈值 {slow_ms}ms")
+    return _query_stats
+
+def get_query_stats():
+    """获取进程级统计器，未启用时返回None"""
+    return _query_stats
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""
+排名模型模块
+
+使用SQLite窗口函数一次查询计算排名：
+    - 课程排名: 同一课程同一学期内按成绩排名
+    - 班级排名: 同一班级内按学分加权GPA排名，可限定学期
+
+排名为密集排名(并列后不跳号)；百分位为不高于该生的学生所占比例(0-100]，第一名为100。
+"""
+import logging
+
+from config.database import TABLES
+from models.database import Database
+
+logger = logging.getLogger(__name__)
+
+class Ranking:
+    """排名模型类，计算课程成绩排名和班级GPA排名"""
+    
+    def __init__(self, db=None):
+        """初始化排名模型"""
+        self.db = db if db else Database()
+        if not hasattr(self.db, 'connection') or self.db.connection is None:
+            self.db.connect()
+    
+    def get_course_ranking(self, course_id, semester):
+        """
+        获取课程成绩排名
+        
+        参数:
+            course_id (str): 课程编号
+            semester (str): 学期
+        
+        返回:
+            list: 按名次排序的排名列表，包含学号、姓名、班级、成绩、名次、百分位和总人数
+        """
+        try:
+            sql = f"""
+            SELECT
+                g.student_id,
+                s.name,
+                s.class_name,
+                g.score,
+                g.grade_point,
+                DENSE_RANK() OVER (ORDER BY g.score DESC) as rank,
+                ROUND(CUME_DIST() OVER (ORDER BY g.score) * 100, 2) as percentile,
+                COUNT(*) OVER () as total
+            FROM {TABLES['grades']} g
+            LEFT JOIN {TABLES['students']} s ON g.student_id = s.student_id
+            WHERE g.course_id = ? AND g.semester = ?
+            ORDER BY rank, g.student_id
+            """
+            self.db.execute(sql, (course_id, semester))
+            return [dict(row) for row in self.db.fetchall()]
+        except Exception as e:
+            logger.error(f"获取课程排名失败: {e}")
+            return []
+    
+    def get_class_ranking(self, class_name, semester=None):
+        """
+        获取班级GPA排名
+        
+        参数:
+            class_name (str): 班级
+            semester (str, optional): 学期，不提供时按所有学期的成绩计算
+        
+        返回:
+            list: 按名次排序的排名列表，包含学号、姓名、总学分、GPA、平均分、名次、百分位和总人数
+        """
+        try:
+            params = [class_name]
+            semester_clause = ""
+            if semester:
+                semester_clause = "AND g.semester = ?"
+                params.append(semester)
+            
+            sql = f"""
+            WITH student_gpa AS (
+                SELECT
+                    g.student_id,
+                    s.name,
+                    SUM(c.credit) as total_credit,
+                    ROUND(SUM(g.grade_point * c.credit) / SUM(c.credit), 2) as gpa,
+                    ROUND(AVG(g.score), 2) as average_score,
+                    COUNT(*) as course_count
+                FROM {TABLES['grades']} g
+                JOIN {TABLES['students']} s ON g.student_id = s.student_id
+                JOIN {TABLES['courses']} c ON g.course_id = c.course_id
+                WHERE s.class_name = ? {semester_clause}
+                GROUP BY g.student_id
+                HAVING SUM(c.credit) > 0
+            )
+            SELECT
+                *,
+                DENSE_RANK() OVER (ORDER BY gpa DESC) as rank,
+                ROUND(CUME_DIST() OVER (ORDER BY gpa) * 100, 2) as percentile,
+                COUNT(*) OVER () as total
+            FROM student_gpa
+            ORDER BY rank, student_id
+            """
+            self.db.execute(sql, params)
+            return [dict(row) for row in self.db.fetchall()]
+        except Exception as e:
+            logger.error(f"获取班级排名失败: {e}")
+            return []
\ No newline at end of file
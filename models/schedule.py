@@ -359,6 +359,10 @@ class Schedule:
                     if key in ['course_id', 'location', 'teacher', 'day_of_week', 'week_type']:
                         sql += f" AND s.{key} = ?"
                         params.append(value)
+                    elif key == 'student_id':
+                        # 学生的课程以其在该学期的成绩（选课）记录为准
+                        sql += f" AND s.course_id IN (SELECT course_id FROM {TABLES['grades']} WHERE student_id = ? AND semester = s.semester)"
+                        params.append(value)
             
             # 按星期几和开始节数排序
             sql += " ORDER BY s.day_of_week, s.start_section"
@@ -373,6 +377,39 @@ class Schedule:
             logger.error(f"获取课程表失败: {str(e)}")
             return []
     
+    def get_schedule_version(self, semester):
+        """
+        获取指定学期课程表的版本戳
+        
+        优先使用课程表、课程和成绩(学生选课)的数据版本号，任何相关写入都会使版本戳改变；
+        数据版本不可用时由课程表项数量和最后更新时间以及课程信息的最后更新时间组成。
+        
+        参数:
+            semester (str): 学期
+        
+        返回:
+            str: 版本戳，查询失败返回None
+        """
+        versions = self.db.get_data_versions()
+        if versions:
+            return '-'.join(str(versions.get(TABLES[entity])) for entity in ('schedules', 'courses', 'grades'))
+        
+        try:
+            sql = f"""
+            SELECT
+                (SELECT COUNT(*) FROM {TABLES['schedules']} WHERE semester = ?) as item_count,
+                (SELECT MAX(updated_at) FROM {TABLES['schedules']} WHERE semester = ?) as schedule_updated,
+                (SELECT MAX(id) FROM {TABLES['schedules']} WHERE semester = ?) as max_id,
+                (SELECT MAX(updated_at) FROM {TABLES['courses']}) as course_updated
+            """
+            self.db.execute(sql, (semester, semester, semester))
+            row = self.db.fetchone()
+            
+            return f"{row['item_count']}-{row['max_id']}-{row['schedule_updated']}-{row['course_updated']}"
+        except Exception as e:
+            logger.error(f"获取课程表版本失败: {str(e)}")
+            return None
+    
     def get_schedule_by_week(self, semester, week_number):
         """
         获取指定学期指定周次的课程表
@@ -10,6 +10,10 @@ from models.database import Database
 
 logger = logging.getLogger(__name__)
 
+# 批量导入时写入的学生字段，CSV中的其他列被忽略
+IMPORT_FIELDS = ('student_id', 'name', 'gender', 'birth_date', 'class_name', 'admission_date',
+                 'contact_phone', 'email', 'address', 'status', 'created_at', 'updated_at')
+
 class Student:
     """学生模型类，处理学生信息的CRUD操作"""
     
@@ -60,6 +64,7 @@ class Student:
             sql = f"INSERT INTO {TABLES['students']} ({fields}) VALUES ({placeholders})"
             self.db.execute(sql, values)
             self.db.commit()
+            self.db.identity_map.evict(TABLES['students'], student_data['student_id'])
             
             logger.info(f"成功添加学生: {student_data['name']}({student_data['student_id']})")
             return True
@@ -100,6 +105,7 @@ class Student:
             sql = f"UPDATE {TABLES['students']} SET {set_clause} WHERE student_id = ?"
             self.db.execute(sql, values)
             self.db.commit()
+            self.db.identity_map.evict(TABLES['students'], student_id)
             
             # 检查是否有记录被更新
             if self.db.cursor.rowcount > 0:
@@ -129,6 +135,10 @@ class Student:
             self.db.execute(sql, (student_id,))
             self.db.commit()
             
+            # 成绩记录随学生级联删除
+            self.db.identity_map.evict(TABLES['students'], student_id)
+            self.db.identity_map.evict(TABLES['grades'])
+            
             # 检查是否有记录被删除
             if self.db.cursor.rowcount > 0:
                 logger.info(f"成功删除学生: {student_id}")
@@ -141,6 +151,58 @@ class Student:
             logger.error(f"删除学生失败: {e}")
             return False
     
+    def insert_import_rows(self, students_data):
+        """
+        批量插入导入的学生，学号已存在或字段取值不符合约束的行被跳过
+        
+        在调用方的事务中执行，不提交事务。只写入 IMPORT_FIELDS 中的字段，空字符串按空值写入。
+        
+        参数:
+            students_data (list): 学生信息字典列表
+        
+        返回:
+            list: 与输入顺序对应的插入结果，成功为True
+        """
+        sql = f"""
+        INSERT OR IGNORE INTO {TABLES['students']} ({', '.join(IMPORT_FIELDS)})
+        VALUES ({', '.join(['?'] * len(IMPORT_FIELDS))})
+        """
+        results = []
+        for student_data in students_data:
+            values = [student_data.get(field) or None for field in IMPORT_FIELDS]
+            # 未提供状态时使用表的默认值
+            if values[IMPORT_FIELDS.index('status')] is None:
+                values[IMPORT_FIELDS.index('status')] = '在读'
+            inserted = self.db.execute(sql, values).rowcount == 1
+            if inserted:
+                self.db.identity_map.evict(TABLES['students'], student_data['student_id'])
+            results.append(inserted)
+        return results
+    
+    def get_existing_ids(self, student_ids):
+        """
+        查询已存在的学号
+        
+        参数:
+            student_ids (list): 学号列表
+        
+        返回:
+            set: 其中已存在的学号
+        """
+        student_ids = list(set(student_ids))
+        existing = set()
+        try:
+            # 分批查询，避免超出SQLite的参数个数限制
+            for start in range(0, len(student_ids), 500):
+                batch = student_ids[start:start + 500]
+                sql = f"SELECT student_id FROM {TABLES['students']} WHERE student_id IN ({', '.join('?' * len(batch))})"
+                self.db.execute(sql, batch)
+                existing.update(row['student_id'] for row in self.db.fetchall())
+            return existing
+        except sqlite3.Error as e:
+            logger.error(f"查询学号失败: {e}")
+            return set()
+    
     def get_student(self, student_id):
         """
         获取单个学生信息
@@ -152,13 +214,20 @@ class Student:
             dict: 学生信息字典，未找到返回None
         """
         try:
+            # 优先从身份映射中获取
+            cached = self.db.identity_map.get(TABLES['students'], student_id)
+            if cached:
+                return cached
+            
             sql = f"SELECT * FROM {TABLES['students']} WHERE student_id = ?"
             self.db.execute(sql, (student_id,))
             student = self.db.fetchone()
             
             if student:
                 # 将Row对象转换为字典
-                return dict(student)
+                student = dict(student)
+                self.db.identity_map.put(TABLES['students'], student_id, student)
+                return student
             else:
                 logger.warning(f"未找到学号为 {student_id} 的学生")
                 return None
@@ -1,15 +1,16 @@
 """
 用户模型模块
 """
+import hmac
+import hashlib
 import logging
 import sqlite3
-import hashlib
-import os
 from datetime import datetime
 
 from config.database import TABLES
 from config.settings import PERMISSION_LEVELS
 from models.database import Database
+from utils.passwords import hash_password, verify_password, needs_rehash
 
 logger = logging.getLogger(__name__)
 
@@ -233,11 +234,14 @@ class User:
                 return None
             
             # 验证密码
-            hashed_password = self._hash_password(password)
-            if user['password'] != hashed_password:
+            if not verify_password(password, user['password']):
                 logger.warning(f"认证失败: 用户 {username} 密码错误")
                 return None
             
+            # 旧的固定盐值或迭代次数已调整的密码，登录成功后按当前配置重新哈希
+            if needs_rehash(user['password']):
+                self._rehash_password(username, password)
+            
             # 更新最后登录时间
             self.update_last_login(username)
             
@@ -332,8 +336,7 @@ class User:
                 logger.warning(f"修改密码失败: 用户 {username} 不存在")
                 return False
             
-            hashed_old_password = self._hash_password(old_password)
-            if user['password'] != hashed_old_password:
+            if not verify_password(old_password, user['password']):
                 logger.warning(f"修改密码失败: 用户 {username} 旧密码错误")
                 return False
             
@@ -355,9 +358,47 @@ class User:
             logger.error(f"修改密码失败: {e}")
             return False
     
+    def password_fingerprint(self, username, key):
+        """
+        计算用户当前密码哈希的指纹，密码修改或重置后指纹随之改变，用于使签发给该用户的长期令牌失效
+        
+        参数:
+            username (str): 用户名
+            key (str|bytes): HMAC密钥，指纹不泄露可用于离线猜测密码的信息
+        
+        返回:
+            str: 16位十六进制指纹，用户不存在返回None
+        """
+        sql = f"SELECT password FROM {TABLES['users']} WHERE username = ?"
+        self.db.execute(sql, (username,))
+        user = self.db.fetchone()
+        if not user:
+            return None
+        
+        if isinstance(key, str):
+            key = key.encode('utf-8')
+        return hmac.new(key, user['password'].encode('utf-8'), hashlib.sha256).hexdigest()[:16]
+    
+    def _rehash_password(self, username, password):
+        """
+        按当前配置重新哈希用户密码
+        
+        参数:
+            username (str): 用户名
+            password (str): 已验证的原始密码
+        """
+        try:
+            sql = f"UPDATE {TABLES['users']} SET password = ? WHERE username = ?"
+            self.db.execute(sql, (self._hash_password(password), username))
+            self.db.commit()
+            logger.info(f"用户 {username} 的密码已按当前配置重新哈希")
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"重新哈希密码失败: {e}")
+    
     def _hash_password(self, password):
         """
-        对密码进行哈希处理
+        对密码进行哈希处理，每个密码使用随机盐值
         
         参数:
             password (str): 原始密码
@@ -365,11 +406,4 @@ class User:
         返回:
             str: 哈希后的密码
         """
-        # 使用PBKDF2算法进行密码哈希
-        salt = "xtR9ZGgI"  # 在实际应用中应该为每个密码生成唯一的盐值
-        iterations = 150000
-        
-        dk = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('utf-8'), iterations)
-        hashed = f"pbkdf2:sha256:{iterations}${salt}${dk.hex()}"
-        
-        return hashed
\ No newline at end of file
+        return hash_password(password)
\ No newline at end of file
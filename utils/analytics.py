@@ -0,0 +1,230 @@
+"""
+成绩分析计算模块
+
+对一组成绩计算描述统计量：平均分、学分加权平均分、中位数、标准差、四分位数、
+自定义分数段分布、百分位排名和标准分(z分数)。
+
+安装了NumPy时使用向量化计算，否则使用纯Python实现，两者结果一致：
+    - 标准差为总体标准差
+    - 分位数使用线性插值
+    - 分数段为左闭右开区间，最后一段为闭区间，超出范围的成绩不计入任何分数段
+    - 百分位排名 = (低于该成绩的人数 + 0.5 × 与该成绩相同的人数) / 总人数 × 100
+"""
+import math
+import bisect
+import logging
+
+try:
+    import numpy as np
+except ImportError:  # NumPy为可选依赖
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# 默认分数段边界，与成绩统计页面的五个等级一致
+DEFAULT_EDGES = (0, 60, 70, 80, 90, 100)
+
+# 计算使用的实现
+BACKEND = 'numpy' if np is not None else 'python'
+
+def parse_edges(text):
+    """
+    解析以逗号分隔的分数段边界，如 "0,60,75,90,100"
+    
+    参数:
+        text (str): 分数段边界字符串
+    
+    返回:
+        tuple: 0-100之间严格递增的分数段边界，格式无效时返回None
+    """
+    try:
+        edges = tuple(float(item) for item in text.split(',') if item.strip())
+    except (AttributeError, ValueError):
+        return None
+    # float() 接受 nan 和 inf，nan 与任何数比较都为假，会绕过下面的递增检查
+    if len(edges) < 2 or not all(math.isfinite(edge) and 0 <= edge <= 100 for edge in edges):
+        return None
+    if any(lower >= upper for lower, upper in zip(edges, edges[1:])):
+        return None
+    return tuple(int(edge) if edge.is_integer() else edge for edge in edges)
+
+def bucket_labels(edges):
+    """生成分数段名称，如 [60, 70)，最后一段为闭区间"""
+    labels = [f"[{lower}, {upper})" for lower, upper in zip(edges, edges[1:])]
+    labels[-1] = labels[-1][:-1] + ']'
+    return labels
+
+def _quantile(sorted_values, q):
+    """在已排序的列表上按线性插值计算分位数"""
+    position = (len(sorted_values) - 1) * q
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def _describe_numpy(scores, credits, grade_points, edges, pass_score):
+    """使用NumPy计算描述统计量"""
+    values = np.asarray(scores, dtype=float)
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    result = {
+        'mean': float(values.mean()),
+        'median': float(median),
+        'std': float(values.std()),
+        'min': float(values.min()),
+        'max': float(values.max()),
+        'q1': float(q1),
+        'q3': float(q3),
+        'passed': int(np.count_nonzero(values >= pass_score)),
+        'bucket_counts': [int(count) for count in np.histogram(values, bins=np.asarray(edges, dtype=float))[0]],
+    }
+    
+    if credits is not None:
+        weights = np.asarray(credits, dtype=float)
+        total_credit = float(weights.sum())
+        result['total_credit'] = total_credit
+        result['weighted_mean'] = float(values @ weights / total_credit) if total_credit else None
+        if grade_points is not None:
+            points = np.asarray(grade_points, dtype=float)
+            result['mean_grade_point'] = float(points.mean())
+            result['weighted_gpa'] = float(points @ weights / total_credit) if total_credit else None
+    elif grade_points is not None:
+        result['mean_grade_point'] = float(np.asarray(grade_points, dtype=float).mean())
+    return result
+
+def _describe_python(scores, credits, grade_points, edges, pass_score):
+    """使用纯Python计算描述统计量"""
+    values = [float(score) for score in scores]
+    count = len(values)
+    ordered = sorted(values)
+    mean = math.fsum(values) / count
+    
+    bucket_counts = [0] * (len(edges) - 1)
+    for value in values:
+        if edges[0] <= value < edges[-1]:
+            bucket_counts[bisect.bisect_right(edges, value) - 1] += 1
+        elif value == edges[-1]:
+            bucket_counts[-1] += 1
+    
+    result = {
+        'mean': mean,
+        'median': _quantile(ordered, 0.5),
+        'std': math.sqrt(math.fsum((value - mean) ** 2 for value in values) / count),
+        'min': ordered[0],
+        'max': ordered[-1],
+        'q1': _quantile(ordered, 0.25),
+        'q3': _quantile(ordered, 0.75),
+        'passed': sum(1 for value in values if value >= pass_score),
+        'bucket_counts': bucket_counts,
+    }
+    
+    if credits is not None:
+        weights = [float(credit) for credit in credits]
+        total_credit = math.fsum(weights)
+        result['total_credit'] = total_credit
+        result['weighted_mean'] = math.fsum(v * w for v, w in zip(values, weights)) / total_credit if total_credit else None
+        if grade_points is not None:
+            points = [float(point) for point in grade_points]
+            result['mean_grade_point'] = math.fsum(points) / count
+            result['weighted_gpa'] = math.fsum(p * w for p, w in zip(points, weights)) / total_credit if total_credit else None
+    elif grade_points is not None:
+        result['mean_grade_point'] = math.fsum(float(point) for point in grade_points) / count
+    return result
+
+def describe(scores, credits=None, grade_points=None, edges=DEFAULT_EDGES, pass_score=60, digits=2):
+    """
+    计算一组成绩的描述统计量
+    
+    参数:
+        scores (list): 成绩列表
+        credits (list, optional): 对应课程的学分，提供时计算学分加权平均分
+        grade_points (list, optional): 对应的绩点，提供时计算平均绩点(及学分加权GPA)
+        edges (tuple): 分数段边界
+        pass_score (float): 及格分数线
+        digits (int): 结果保留的小数位数
+    
+    返回:
+        dict: 统计结果，没有成绩时count为0
+    """
+    count = len(scores)
+    labels = bucket_labels(edges)
+    if not count:
+        return {
+            'count': 0,
+            'backend': BACKEND,
+            'buckets': [{'range': label, 'count': 0, 'percent': 0} for label in labels],
+        }
+    
+    if np is not None:
+        raw = _describe_numpy(scores, credits, grade_points, edges, pass_score)
+    else:
+        raw = _describe_python(scores, credits, grade_points, edges, pass_score)
+    
+    result = {'count': count, 'backend': BACKEND}
+    for key, value in raw.items():
+        if key in ('passed', 'bucket_counts'):
+            continue
+        result[key] = round(value, digits) if value is not None else None
+    result['iqr'] = round(raw['q3'] - raw['q1'], digits)
+    result['pass_rate'] = round(raw['passed'] / count * 100, digits)
+    result['buckets'] = [
+        {'range': label, 'count': bucket_count, 'percent': round(bucket_count / count * 100, digits)}
+        for label, bucket_count in zip(labels, raw['bucket_counts'])
+    ]
+    return result
+
+def percentile_ranks(scores, digits=2):
+    """
+    计算每个成绩在这组成绩中的百分位排名
+    
+    参数:
+        scores (list): 成绩列表
+        digits (int): 结果保留的小数位数
+    
+    返回:
+        list: 与输入顺序一致的百分位排名(0-100)
+    """
+    count = len(scores)
+    if not count:
+        return []
+    
+    if np is not None:
+        values = np.asarray(scores, dtype=float)
+        ordered = np.sort(values)
+        below = np.searchsorted(ordered, values, side='left')
+        equal = np.searchsorted(ordered, values, side='right') - below
+        return [round(float(rank), digits) for rank in (below + 0.5 * equal) / count * 100]
+    
+    ordered = sorted(float(score) for score in scores)
+    ranks = []
+    for score in scores:
+        below = bisect.bisect_left(ordered, float(score))
+        equal = bisect.bisect_right(ordered, float(score)) - below
+        ranks.append(round((below + 0.5 * equal) / count * 100, digits))
+    return ranks
+
+def z_scores(scores, digits=2):
+    """
+    计算每个成绩的标准分 (成绩 - 平均分) / 总体标准差
+    
+    参数:
+        scores (list): 成绩列表
+        digits (int): 结果保留的小数位数
+    
+    返回:
+        list: 与输入顺序一致的标准分，所有成绩相同时均为0
+    """
+    if not scores:
+        return []
+    
+    if np is not None:
+        values = np.asarray(scores, dtype=float)
+        std = values.std()
+        if not std:
+            return [0.0] * len(scores)
+        return [round(float(z), digits) for z in (values - values.mean()) / std]
+    
+    values = [float(score) for score in scores]
+    mean = math.fsum(values) / len(values)
+    std = math.sqrt(math.fsum((value - mean) ** 2 for value in values) / len(values))
+    if not std:
+        return [0.0] * len(values)
+    return [round((value - mean) / std, digits) for value in values]
\ No newline at end of file
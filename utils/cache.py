@@ -0,0 +1,129 @@
+"""
+进程级缓存模块
+
+缓存班级、学期、课程等参考数据的查询结果。每个缓存条目记录生成时的数据版本，
+数据版本保存在数据库的 data_versions 表中并由触发器维护，任一进程写入数据都会使版本号改变，
+其他进程读取缓存时发现版本变化即重新查询，从而在多个 worker 共享同一数据库时保持正确。
+"""
+import time
+import logging
+import copy
+import threading
+from collections import OrderedDict
+
+from config.settings import REFERENCE_CACHE_SIZE, REFERENCE_CACHE_TTL, RANKING_CACHE_SIZE, RANKING_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+class TTLCache:
+    """带容量上限和过期时间的线程安全LRU缓存"""
+    
+    def __init__(self, maxsize=256, ttl=600):
+        """
+        初始化缓存
+        
+        参数:
+            maxsize (int): 最多缓存的条目数
+            ttl (int): 条目最长存活秒数
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key, version=None):
+        """
+        获取缓存值
+        
+        参数:
+            key: 缓存键
+            version: 期望的数据版本，与缓存条目的版本不一致时视为未命中
+        
+        返回:
+            缓存值，未命中返回None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            value, entry_version, expires_at = entry
+            if entry_version != version or expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key, value, version=None):
+        """
+        写入缓存值，超出容量时淘汰最久未使用的条目
+        
+        参数:
+            key: 缓存键
+            value: 缓存值
+            version: 数据版本
+        """
+        with self._lock:
+            self._entries[key] = (value, version, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, predicate=None):
+        """
+        使缓存条目失效
+        
+        参数:
+            predicate (callable): 接收缓存键，返回True的条目失效；不提供则清空全部
+        """
+        with self._lock:
+            if predicate is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+# 进程级参考数据缓存
+reference_cache = TTLCache(REFERENCE_CACHE_SIZE, REFERENCE_CACHE_TTL)
+
+# 排名结果较大，单独缓存，避免挤出参考数据
+ranking_cache = TTLCache(RANKING_CACHE_SIZE, RANKING_CACHE_TTL)
+
+def cached_query(db, name, entities, loader, *args, cache=None):
+    """
+    带版本校验的读穿缓存
+    
+    参数:
+        db (Database): 数据库实例
+        name (str): 查询名称
+        entities (tuple): 查询结果依赖的数据实体(表名)
+        loader (callable): 未命中时调用的查询函数，参数为args
+        args: 查询参数，同时作为缓存键的一部分
+        cache (TTLCache): 使用的缓存，默认为参考数据缓存
+    
+    返回:
+        查询结果
+    """
+    versions = db.get_data_versions()
+    if versions is None:
+        # 数据版本不可用(旧数据库尚未初始化版本表)时不使用缓存
+        return loader(*args)
+    
+    key = (db.config['name'], name, tuple(entities), args)
+    version = tuple(versions.get(entity) for entity in entities)
+    
+    if cache is None:
+        cache = reference_cache
+    value = cache.get(key, version)
+    if value is None:
+        value = loader(*args)
+        cache.set(key, value, version)
+    
+    # 返回副本，避免调用方修改缓存中的结果
+    return copy.deepcopy(value)
\ No newline at end of file
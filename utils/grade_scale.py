@@ -0,0 +1,76 @@
+"""
+绩点换算模块
+
+分数到绩点的换算由 config.settings.GRADE_POINT_SCALE 中的绩点表决定。
+逐条写入成绩时在Python中按分数下限二分查找绩点；批量重新计算时由同一张表生成SQL的CASE表达式，
+在数据库中一次更新一批成绩，两种方式的结果一致。
+"""
+import bisect
+
+from config.settings import GRADE_POINT_SCALE
+
+# 分数低于绩点表中所有下限时的绩点
+BELOW_SCALE_GRADE_POINT = 0.0
+
+def check_scale(scale):
+    """
+    校验绩点表并按分数下限升序排列
+    
+    参数:
+        scale (iterable): (分数下限, 绩点) 列表
+    
+    返回:
+        tuple: (分数下限元组, 绩点元组)，均按分数下限升序排列
+    
+    异常:
+        ValueError: 绩点表为空、包含非数字、分数下限超出0-100或重复
+    """
+    try:
+        items = sorted((float(min_score), float(grade_point)) for min_score, grade_point in scale)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"绩点表格式无效: {e}") from e
+    if not items:
+        raise ValueError("绩点表不能为空")
+    
+    min_scores = tuple(min_score for min_score, _ in items)
+    if min_scores[0] < 0 or min_scores[-1] > 100:
+        raise ValueError("绩点表的分数下限必须在0-100之间")
+    if len(set(min_scores)) != len(min_scores):
+        raise ValueError("绩点表的分数下限不能重复")
+    return min_scores, tuple(grade_point for _, grade_point in items)
+
+# 配置的绩点表，导入时校验，配置有误时启动即报错
+_MIN_SCORES, _GRADE_POINTS = check_scale(GRADE_POINT_SCALE)
+
+def calculate_grade_point(score, scale=None):
+    """
+    根据分数计算绩点
+    
+    参数:
+        score (float): 分数
+        scale (iterable, optional): 绩点表，默认使用配置的绩点表
+    
+    返回:
+        float: 绩点
+    """
+    min_scores, grade_points = (_MIN_SCORES, _GRADE_POINTS) if scale is None else check_scale(scale)
+    index = bisect.bisect_right(min_scores, score)
+    return grade_points[index - 1] if index else BELOW_SCALE_GRADE_POINT
+
+def grade_point_case_sql(column='score', scale=None):
+    """
+    生成按绩点表换算绩点的SQL表达式
+    
+    绩点表已校验为数字，直接写入SQL文本，同一张表生成的语句文本相同，可以复用SQLite的语句缓存。
+    
+    参数:
+        column (str): 分数列
+        scale (iterable, optional): 绩点表，默认使用配置的绩点表
+    
+    返回:
+        str: CASE表达式，如 "CASE WHEN score >= 90.0 THEN 4.0 ... ELSE 0.0 END"
+    """
+    min_scores, grade_points = (_MIN_SCORES, _GRADE_POINTS) if scale is None else check_scale(scale)
+    branches = ' '.join(f"WHEN {column} >= {min_score!r} THEN {grade_point!r}"
+                        for min_score, grade_point in zip(reversed(min_scores), reversed(grade_points)))
+    return f"CASE {branches} ELSE {BELOW_SCALE_GRADE_POINT!r} END"
\ No newline at end of file
@@ -0,0 +1,318 @@
+"""
+iCalendar(.ics) 课程表导出模块
+
+将课程表项转换为按周重复的日历事件：每个课程表项只生成一个 VEVENT，
+周次范围和单双周通过 RRULE 表达，停课日期通过 EXDATE 表达，
+从而保证订阅源体积不随周数增长。
+"""
+import os
+import re
+import logging
+import hashlib
+from datetime import datetime, date, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+# iCalendar 规定每行最多75个字节
+MAX_LINE_OCTETS = 75
+
+WEEK_TYPE_NAMES = {0: '全部周', 1: '单周', 2: '双周'}
+
+def semester_start_date(semester, configured=None):
+    """
+    获取学期第一周周一的日期
+    
+    参数:
+        semester (str): 学期(如: 2024-2025-1)
+        configured (dict): 已配置的学期开始日期 {学期: 'YYYY-MM-DD'}
+    
+    返回:
+        date: 第一周周一的日期，无法确定时返回None
+    """
+    if configured and configured.get(semester):
+        try:
+            return datetime.strptime(configured[semester], '%Y-%m-%d').date()
+        except ValueError:
+            logger.error(f"学期 {semester} 的开始日期配置格式错误: {configured[semester]}")
+            return None
+    
+    # 按学期编号推算：第1学期从9月第一个周一开始，第2学期从次年3月第一个周一开始
+    match = re.match(r'^(\d{4})-(\d{4})-([12])$', semester or '')
+    if not match:
+        return None
+    
+    if match.group(3) == '1':
+        first_day = date(int(match.group(1)), 9, 1)
+    else:
+        first_day = date(int(match.group(2)), 3, 1)
+    
+    return first_day + timedelta(days=(7 - first_day.weekday()) % 7)
+
+def expand_weeks(start_week, end_week, week_type):
+    """
+    计算课程表项实际上课的周次
+    
+    参数:
+        start_week (int): 开始周次
+        end_week (int): 结束周次
+        week_type (int): 周类型(0:全部周, 1:单周, 2:双周)
+    
+    返回:
+        tuple: (首次上课周次, 周间隔, 上课次数)，没有上课周次时首次周次为None
+    """
+    first_week = start_week
+    interval = 1
+    
+    if week_type in (1, 2):
+        interval = 2
+        # 单周取奇数周，双周取偶数周
+        if first_week % 2 != week_type % 2:
+            first_week += 1
+    
+    if first_week > end_week:
+        return None, interval, 0
+    
+    count = (end_week - first_week) // interval + 1
+    return first_week, interval, count
+
+def escape_text(value):
+    """转义 iCalendar 文本属性值"""
+    value = '' if value is None else str(value)
+    return (value.replace('\\', '\\\\')
+                 .replace(';', '\\;')
+                 .replace(',', '\\,')
+                 .replace('\r\n', '\\n')
+                 .replace('\n', '\\n'))
+
+def fold_line(line):
+    """按75字节折行，保证不拆分多字节字符"""
+    if len(line.encode('utf-8')) <= MAX_LINE_OCTETS:
+        return line
+    
+    parts = []
+    current = ''
+    current_size = 0
+    limit = MAX_LINE_OCTETS
+    for char in line:
+        size = len(char.encode('utf-8'))
+        if current_size + size > limit:
+            parts.append(current)
+            current = char
+            current_size = size
+            # 续行以一个空格开头，占用1个字节
+            limit = MAX_LINE_OCTETS - 1
+        else:
+            current += char
+            current_size += size
+    parts.append(current)
+    
+    return '\r\n '.join(parts)
+
+def _format_local(day, hhmm):
+    """格式化本地时间为 YYYYMMDDTHHMMSS"""
+    hour, minute = hhmm.split(':')
+    return f"{day.strftime('%Y%m%d')}T{int(hour):02d}{int(minute):02d}00"
+
+def build_event(item, semester, start_date, section_times, tzid, excluded_dates=None, dtstamp=None):
+    """
+    将单个课程表项转换为 VEVENT 行列表
+    
+    参数:
+        item (dict): 课程表项
+        semester (str): 学期
+        start_date (date): 第一周周一的日期
+        section_times (dict): 节次时间配置 {节次: {'start': 'HH:MM', 'end': 'HH:MM'}}
+        tzid (str): 时区标识
+        excluded_dates (set): 停课日期集合
+        dtstamp (str): 事件时间戳(UTC)
+    
+    返回:
+        list: VEVENT 行列表，无法生成时返回空列表
+    """
+    start_time = section_times.get(item['start_section'], {}).get('start')
+    end_time = section_times.get(item['end_section'], {}).get('end')
+    if not start_time or not end_time:
+        logger.warning(f"课程表项 {item.get('id')} 的节次 {item['start_section']}-{item['end_section']} 没有对应的上课时间，已跳过")
+        return []
+    
+    first_week, interval, count = expand_weeks(item['start_week'], item['end_week'], item.get('week_type') or 0)
+    if not count:
+        return []
+    
+    first_day = start_date + timedelta(weeks=first_week - 1, days=item['day_of_week'] - 1)
+    
+    # 只保留实际落在上课日期上的停课日期
+    exdates = []
+    if excluded_dates:
+        for index in range(count):
+            day = first_day + timedelta(weeks=index * interval)
+            if day in excluded_dates:
+                exdates.append(_format_local(day, start_time))
+    
+    week_desc = f"第{item['start_week']}-{item['end_week']}周({WEEK_TYPE_NAMES.get(item.get('week_type') or 0, '全部周')})"
+    description = f"{item.get('course_id', '')} {week_desc} 第{item['start_section']}-{item['end_section']}节"
+    if item.get('teacher'):
+        description += f" 任课教师: {item['teacher']}"
+    
+    lines = [
+        'BEGIN:VEVENT',
+        f"UID:schedule-{item['id']}-{semester}@jgsm",
+        f"DTSTAMP:{dtstamp or datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}",
+        f"DTSTART;TZID={tzid}:{_format_local(first_day, start_time)}",
+        f"DTEND;TZID={tzid}:{_format_local(first_day, end_time)}",
+        f"RRULE:FREQ=WEEKLY;INTERVAL={interval};COUNT={count}",
+    ]
+    if exdates:
+        lines.append(f"EXDATE;TZID={tzid}:{','.join(exdates)}")
+    lines.extend([
+        f"SUMMARY:{escape_text(item.get('course_name') or item.get('course_id'))}",
+        f"LOCATION:{escape_text(item.get('location'))}",
+        f"DESCRIPTION:{escape_text(description)}",
+        'END:VEVENT',
+    ])
+    return lines
+
+def build_calendar(items, semester, start_date, section_times, tzid='Asia/Shanghai',
+                   utc_offset='+0800', excluded_dates=None, calendar_name=None):
+    """
+    生成完整的 iCalendar 文本
+    
+    参数:
+        items (list): 课程表项列表
+        semester (str): 学期
+        start_date (date): 第一周周一的日期
+        section_times (dict): 节次时间配置
+        tzid (str): 时区标识
+        utc_offset (str): 时区相对UTC的偏移(如: +0800)，该时区不使用夏令时
+        excluded_dates (iterable): 停课日期('YYYY-MM-DD' 或 date)
+        calendar_name (str): 日历名称
+    
+    返回:
+        str: iCalendar 文本
+    """
+    excluded = set()
+    for value in excluded_dates or []:
+        if isinstance(value, date):
+            excluded.add(value)
+        else:
+            try:
+                excluded.add(datetime.strptime(value, '%Y-%m-%d').date())
+            except ValueError:
+                logger.warning(f"忽略格式错误的停课日期: {value}")
+    
+    dtstamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//JGSM//学生管理系统课程表//ZH',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f"X-WR-CALNAME:{escape_text(calendar_name or f'{semester} 课程表')}",
+        f"X-WR-TIMEZONE:{tzid}",
+        # 课程表所在时区不使用夏令时，只需要一个固定偏移的 STANDARD 组件
+        'BEGIN:VTIMEZONE',
+        f"TZID:{tzid}",
+        'BEGIN:STANDARD',
+        'DTSTART:19700101T000000',
+        f"TZOFFSETFROM:{utc_offset}",
+        f"TZOFFSETTO:{utc_offset}",
+        'END:STANDARD',
+        'END:VTIMEZONE',
+    ]
+    
+    for item in items:
+        lines.extend(build_event(item, semester, start_date, section_times, tzid, excluded, dtstamp))
+    
+    lines.append('END:VCALENDAR')
+    
+    return '\r\n'.join(fold_line(line) for line in lines) + '\r\n'
+
+class IcsFeedCache:
+    """日历订阅源磁盘缓存，按订阅范围和课程表版本戳缓存生成结果"""
+    
+    def __init__(self, cache_dir, ttl=300):
+        """
+        初始化日历缓存
+        
+        参数:
+            cache_dir (str): 缓存目录
+            ttl (int): 缓存新鲜期(秒)，新鲜期内不校验版本戳
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def _paths(self, key):
+        """获取缓存键对应的日历文件和版本文件路径"""
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, digest)
+        return f"{base}.ics", f"{base}.version"
+    
+    def get_fresh(self, key):
+        """
+        获取新鲜期内的缓存，不需要查询数据库
+        
+        参数:
+            key (str): 缓存键
+        
+        返回:
+            tuple: (日历文本, 版本戳)，缓存不存在或已过新鲜期时返回(None, None)
+        """
+        ics_path, version_path = self._paths(key)
+        try:
+            if datetime.now().timestamp() - os.path.getmtime(version_path) > self.ttl:
+                return None, None
+            return self._read(ics_path, version_path)
+        except OSError:
+            return None, None
+    
+    def get(self, key, version):
+        """
+        获取与指定版本戳一致的缓存，命中时刷新新鲜期
+        
+        参数:
+            key (str): 缓存键
+            version (str): 当前课程表版本戳
+        
+        返回:
+            str: 日历文本，未命中返回None
+        """
+        ics_path, version_path = self._paths(key)
+        try:
+            content, cached_version = self._read(ics_path, version_path)
+        except OSError:
+            return None
+        
+        if cached_version != version:
+            return None
+        
+        os.utime(version_path)
+        return content
+    
+    def put(self, key, version, content):
+        """
+        写入缓存，先写临时文件再原子替换，避免并发读取到不完整的文件
+        
+        参数:
+            key (str): 缓存键
+            version (str): 课程表版本戳
+            content (str): 日历文本
+        """
+        ics_path, version_path = self._paths(key)
+        try:
+            for path, data in ((ics_path, content), (version_path, version)):
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"写入日历缓存失败: {e}")
+    
+    def _read(self, ics_path, version_path):
+        """读取缓存文件"""
+        with open(version_path, 'r', encoding='utf-8') as f:
+            version = f.read()
+        with open(ics_path, 'r', encoding='utf-8', newline='') as f:
+            content = f.read()
+        return content, version
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""
+导入数据校验模块
+
+只检查行数据本身(必填字段、格式和取值范围)，不访问数据库，行数较多时在进程池中分批并行执行。
+依赖数据库的检查(学生和课程是否存在、记录是否重复)由控制器在单线程的写入阶段按批查询。
+"""
+import re
+import multiprocessing
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+
+from config.settings import IMPORT_VALIDATION_WORKERS, IMPORT_VALIDATION_CHUNK_SIZE, IMPORT_PARALLEL_MIN_ROWS
+
+# 学号为字母和数字的组合，长度在3-20之间
+STUDENT_ID_PATTERN = re.compile(r'^[A-Za-z0-9]{3,20}$')
+# 课程编号为字母和数字的组合，长度在2-20之间
+COURSE_ID_PATTERN = re.compile(r'^[A-Za-z0-9]{2,20}$')
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+# 中国大陆手机号
+PHONE_PATTERN = re.compile(r'^1[3-9]\d{9}$')
+
+# 进程池以spawn方式启动子进程：Web应用中导入在请求线程里执行，
+# fork多线程进程时其他线程持有的锁(如日志和数据库连接的锁)会以加锁状态复制到子进程中
+POOL_CONTEXT = multiprocessing.get_context('spawn')
+
+def is_valid_student_id(student_id):
+    """学号格式是否正确"""
+    return bool(STUDENT_ID_PATTERN.match(student_id))
+
+def is_valid_course_id(course_id):
+    """课程编号格式是否正确"""
+    return bool(COURSE_ID_PATTERN.match(course_id))
+
+def is_valid_email(email):
+    """电子邮箱格式是否正确"""
+    return bool(EMAIL_PATTERN.match(email))
+
+def is_valid_phone(phone):
+    """手机号格式是否正确"""
+    return bool(PHONE_PATTERN.match(phone))
+
+def missing_fields_message(row, required_fields):
+    """
+    检查必填字段，与 BaseController.validate_required_fields 的规则和消息一致
+    
+    返回:
+        str: 缺少字段时的错误消息，否则返回None
+    """
+    missing = [field for field in required_fields if row.get(field) is None or row.get(field) == '']
+    if missing:
+        return f"缺少必填字段: {', '.join(missing)}"
+    return None
+
+def validate_student_row(row):
+    """
+    校验一行学生数据
+    
+    返回:
+        tuple: (失败原因，通过时为None, None)
+    """
+    reason = missing_fields_message(row, ('student_id', 'name'))
+    if reason:
+        return reason, None
+    if not is_valid_student_id(row['student_id']):
+        return "学号格式不正确，应为数字或字母组合", None
+    if row.get('email') and not is_valid_email(row['email']):
+        return "电子邮箱格式不正确", None
+    if row.get('contact_phone') and not is_valid_phone(row['contact_phone']):
+        return "手机号格式不正确", None
+    return None, None
+
+def validate_course_row(row):
+    """
+    校验一行课程数据
+    
+    返回:
+        tuple: (失败原因，通过时为None, 转换为数字的学分)
+    """
+    reason = missing_fields_message(row, ('course_id', 'course_name', 'credit'))
+    if reason:
+        return reason, None
+    if not is_valid_course_id(row['course_id']):
+        return "课程编号格式不正确，应为字母和数字的组合", None
+    try:
+        credit = float(row['credit'])
+    except (TypeError, ValueError):
+        return "学分必须为数字", None
+    if credit <= 0:
+        return "学分必须为正数", None
+    return None, credit
+
+def validate_grade_row(row):
+    """
+    校验一行成绩数据
+    
+    返回:
+        tuple: (失败原因，通过时为None, 转换为数字的分数)
+    """
+    reason = missing_fields_message(row, ('student_id', 'course_id', 'semester', 'score'))
+    if reason:
+        return reason, None
+    try:
+        score = float(row['score'])
+    except (TypeError, ValueError):
+        return "分数必须为数字", None
+    if score < 0 or score > 100:
+        return "分数必须在0-100之间", None
+    return None, score
+
+# 导入类型对应的校验函数
+VALIDATORS = {
+    'students': validate_student_row,
+    'courses': validate_course_row,
+    'grades': validate_grade_row
+}
+
+def _validate_chunk(kind, rows):
+    """校验一批数据，在进程池中执行"""
+    validator = VALIDATORS[kind]
+    return [validator(row) for row in rows]
+
+def validate_rows(kind, rows, workers=IMPORT_VALIDATION_WORKERS, chunk_size=IMPORT_VALIDATION_CHUNK_SIZE,
+                  min_parallel_rows=IMPORT_PARALLEL_MIN_ROWS):
+    """
+    校验导入数据，行数达到 min_parallel_rows 时分批在进程池中并行校验
+    
+    参数:
+        kind (str): 导入类型，students、courses 或 grades
+        rows (list): 行数据字典列表
+        workers (int): 进程数，为1时在当前进程中校验
+        chunk_size (int): 每个进程任务包含的行数
+        min_parallel_rows (int): 并行校验的最少行数
+    
+    返回:
+        list: 与输入顺序对应的 (失败原因, 转换后的值)
+    """
+    if workers <= 1 or len(rows) < max(min_parallel_rows, 2 * chunk_size):
+        return _validate_chunk(kind, rows)
+    
+    chunks = [rows[start:start + chunk_size] for start in range(0, len(rows), chunk_size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=POOL_CONTEXT) as pool:
+        for chunk_results in pool.map(_validate_chunk, repeat(kind), chunks):
+            results.extend(chunk_results)
+    return results
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""
+后台任务执行模块
+
+任务保存在 jobs 表中，由进程内的线程池执行，不需要额外的消息队列服务：
+    - 提交任务时写入一条 queued 记录并交给线程池，执行前以条件更新认领，同一任务只会执行一次
+    - 每个任务线程使用独立的数据库连接，以提交任务的用户身份调用控制器
+    - 任务通过 JobContext 报告进度，报告进度时检查取消请求
+    - 执行器启动时将心跳超时的执行中任务标记为失败，继续执行排队中的任务，并清理过期的任务结果
+
+线程池适合以数据库读写为主的任务；需要大量计算的任务(如批量成绩单渲染)在任务内部自行使用进程池。
+"""
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import (JOB_WORKERS, JOB_STALE_SECONDS, JOB_RETENTION_DAYS, IMPORT_PREVIEW_DIR,
+                             IMPORT_PREVIEW_MAX_AGE)
+from utils.streaming_import import purge_uploads
+
+logger = logging.getLogger(__name__)
+
+# 两次写入进度之间的最短间隔(秒)
+PROGRESS_INTERVAL = 0.5
+
+class JobCancelled(Exception):
+    """任务已被请求取消"""
+
+class JobContext:
+    """传给任务的上下文，用于报告进度和响应取消请求"""
+    
+    def __init__(self, job_model, job_id):
+        """
+        初始化任务上下文
+        
+        参数:
+            job_model (Job): 任务模型，与任务使用同一个数据库连接
+            job_id (int): 任务ID
+        """
+        self.job_model = job_model
+        self.job_id = job_id
+        self._last_report = 0
+    
+    def progress(self, current, total=None, message=None):
+        """
+        报告进度，写入频率受 PROGRESS_INTERVAL 限制，完成时总会写入
+        
+        不能在未提交的写事务中调用。任务已被请求取消时抛出 JobCancelled。
+        
+        参数:
+            current (int): 已完成的数量
+            total (int, optional): 总数量
+            message (str, optional): 进度说明
+        """
+        now = time.monotonic()
+        if now - self._last_report < PROGRESS_INTERVAL and current != total:
+            return
+        self._last_report = now
+        if self.job_model.update_progress(self.job_id, current, total, message):
+            raise JobCancelled(f"任务 {self.job_id} 已取消")
+
+class JobRunner:
+    """后台任务执行器，每个进程每个数据库一个"""
+    
+    def __init__(self, database_config, workers=JOB_WORKERS):
+        """
+        初始化任务执行器
+        
+        参数:
+            database_config (dict): 数据库配置
+            workers (int): 执行任务的线程数
+        """
+        self.database_config = database_config
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self._running = set()
+        self._lock = threading.Lock()
+        
+        # 定期更新执行中任务的心跳时间，其他进程据此判断任务是否仍在执行
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, name='job-heartbeat', daemon=True)
+        self._heartbeat.start()
+    
+    def submit(self, job_id):
+        """
+        将任务交给线程池执行
+        
+        参数:
+            job_id (int): 任务ID
+        """
+        self.executor.submit(self._execute, job_id)
+    
+    def is_running(self, job_id):
+        """任务是否正在本进程中执行"""
+        with self._lock:
+            return job_id in self._running
+    
+    def recover(self):
+        """标记中断的任务，清理过期的任务、未处理的导入预览文件和较早的成绩变更日志，重新提交排队中的任务"""
+        from models.grade_cube import prune_change_log
+        
+        previews = purge_uploads(IMPORT_PREVIEW_DIR, IMPORT_PREVIEW_MAX_AGE)
+        if previews:
+            logger.info(f"清理 {previews} 个过期的导入预览文件")
+        db = self._connect()
+        try:
+            job_model = self._job_model(db)
+            stale = job_model.fail_stale_jobs(JOB_STALE_SECONDS)
+            purged = job_model.purge_finished(JOB_RETENTION_DAYS)
+            queued = job_model.get_queued_ids()
+            prune_change_log(db.connection)
+        finally:
+            db.close()
+        if stale or purged or queued:
+            logger.info(f"后台任务恢复: {stale} 个中断的任务标记为失败，清理 {purged} 个过期任务，继续执行 {len(queued)} 个排队任务")
+        for job_id in queued:
+            self.submit(job_id)
+    
+    def _connect(self):
+        """创建任务线程使用的数据库连接"""
+        from models.database import Database
+        
+        db = Database(self.database_config)
+        db.connect()
+        return db
+    
+    def _job_model(self, db):
+        """创建任务模型"""
+        from models.job import Job
+        
+        return Job(db)
+    
+    def _execute(self, job_id):
+        """线程池中执行单个任务"""
+        from models.user import User
+        from controllers.lazy_controllers import LazyControllers
+        
+        db = self._connect()
+        try:
+            job_model = self._job_model(db)
+            if not job_model.claim_job(job_id):
+                return  # 已被其他线程或进程认领，或已取消
+            with self._lock:
+                self._running.add(job_id)
+            
+            job = job_model.get_job(job_id)
+            user = User(db).get_user(job['username']) if job['username'] else None
+            try:
+                LazyControllers(db, user)['job'].run_job(job_id, JobContext(job_model, job_id))
+            except Exception as e:
+                job_model.finish_job(job_id, 'failed', f"任务执行出错: {e}")
+                raise
+        except Exception as e:
+            logger.error(f"后台任务 {job_id} 出错: {e}", exc_info=True)
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+            db.close()
+    
+    def _heartbeat_loop(self):
+        """心跳线程入口"""
+        while True:
+            time.sleep(JOB_STALE_SECONDS / 5)
+            with self._lock:
+                running = list(self._running)
+            if not running:
+                continue
+            try:
+                db = self._connect()
+                try:
+                    self._job_model(db).touch_jobs(running)
+                finally:
+                    db.close()
+            except Exception as e:
+                logger.warning(f"更新后台任务心跳失败: {e}")
+
+# 按数据库文件共享的执行器
+_runners = {}
+_runners_lock = threading.Lock()
+
+def get_job_runner(database_config):
+    """
+    获取数据库对应的任务执行器，第一次获取时创建执行器并恢复中断和排队的任务
+    
+    参数:
+        database_config (dict): 数据库配置
+    
+    返回:
+        JobRunner: 任务执行器
+    """
+    with _runners_lock:
+        runner = _runners.get(database_config['name'])
+        if runner is not None:
+            return runner
+        runner = _runners[database_config['name']] = JobRunner(database_config)
+    runner.recover()
+    return runner
\ No newline at end of file
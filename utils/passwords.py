@@ -0,0 +1,142 @@
+"""
+密码哈希模块
+
+统一处理密码的哈希和验证，格式为 pbkdf2:sha256:{迭代次数}${盐值}${哈希值}。
+新密码使用随机盐值和配置的迭代次数；旧的固定盐值哈希仍可验证，并在登录成功后自动重新哈希。
+Web应用可启用进程池，在独立进程中计算哈希，避免占满请求线程。
+"""
+import os
+import hmac
+import hashlib
+import secrets
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config.settings import PASSWORD_HASH_ITERATIONS, PASSWORD_VERIFY_CACHE_TTL
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# 早期版本所有密码共用的固定盐值
+LEGACY_SALT = "xtR9ZGgI"
+
+# 进程池配置，由 init_hash_pool 设置，进程池在首次使用时按进程创建
+_pool_workers = 0
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+# 最近验证成功的凭据，只缓存成功结果，错误密码每次都完整计算
+_verified = TTLCache(1024, PASSWORD_VERIFY_CACHE_TTL)
+_verified_key = secrets.token_bytes(32)
+
+def _pbkdf2(password, salt, iterations):
+    """计算PBKDF2-SHA256哈希，在进程池中执行时需要为模块级函数"""
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('utf-8'), iterations).hex()
+
+def init_hash_pool(workers):
+    """
+    启用密码哈希进程池
+    
+    参数:
+        workers (int): 进程数，0表示在调用线程中计算
+    """
+    global _pool_workers
+    _pool_workers = workers
+
+def _get_pool():
+    """获取当前进程的进程池，fork出的子进程不能复用父进程的进程池"""
+    global _pool, _pool_pid
+    if not _pool_workers:
+        return None
+    
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=_pool_workers)
+            _pool_pid = os.getpid()
+        return _pool
+
+def _compute(password, salt, iterations):
+    """计算哈希，启用进程池时在进程池中执行，进程池不可用时退回当前线程"""
+    global _pool
+    pool = _get_pool()
+    if pool is not None:
+        try:
+            return pool.submit(_pbkdf2, password, salt, iterations).result()
+        except (BrokenProcessPool, OSError) as e:
+            logger.error(f"密码哈希进程池不可用，改为在当前线程计算: {e}")
+            with _pool_lock:
+                _pool = None
+    return _pbkdf2(password, salt, iterations)
+
+def hash_password(password, iterations=None):
+    """
+    使用随机盐值对密码进行哈希处理
+    
+    参数:
+        password (str): 原始密码
+        iterations (int): 迭代次数，默认使用配置值
+    
+    返回:
+        str: 哈希后的密码
+    """
+    iterations = iterations or PASSWORD_HASH_ITERATIONS
+    salt = secrets.token_urlsafe(12)
+    return f"pbkdf2:sha256:{iterations}${salt}${_compute(password, salt, iterations)}"
+
+def _parse(hashed):
+    """解析哈希字符串，返回(迭代次数, 盐值, 哈希值)，格式错误返回None"""
+    try:
+        method, salt, digest = hashed.split('$', 2)
+        algorithm, hash_name, iterations = method.split(':')
+        if algorithm != 'pbkdf2' or hash_name != 'sha256':
+            return None
+        return int(iterations), salt, digest
+    except (AttributeError, ValueError):
+        return None
+
+def verify_password(password, hashed):
+    """
+    验证密码
+    
+    参数:
+        password (str): 原始密码
+        hashed (str): 保存的哈希密码
+    
+    返回:
+        bool: 密码正确返回True，否则返回False
+    """
+    parsed = _parse(hashed)
+    if not parsed:
+        logger.error("无法识别的密码哈希格式")
+        return False
+    
+    cache_key = hmac.new(_verified_key, f"{hashed}\0{password}".encode('utf-8'), hashlib.sha256).digest()
+    if PASSWORD_VERIFY_CACHE_TTL and _verified.get(cache_key):
+        return True
+    
+    iterations, salt, digest = parsed
+    if not hmac.compare_digest(_compute(password, salt, iterations), digest):
+        return False
+    
+    if PASSWORD_VERIFY_CACHE_TTL:
+        _verified.set(cache_key, True)
+    return True
+
+def needs_rehash(hashed):
+    """
+    判断哈希密码是否需要按当前配置重新哈希(固定盐值或迭代次数与配置不一致)
+    
+    参数:
+        hashed (str): 保存的哈希密码
+    
+    返回:
+        bool: 需要重新哈希返回True
+    """
+    parsed = _parse(hashed)
+    if not parsed:
+        return False
+    iterations, salt, _ = parsed
+    return salt == LEGACY_SALT or iterations != PASSWORD_HASH_ITERATIONS
\ No newline at end of file
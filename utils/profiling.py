@@ -0,0 +1,151 @@
+"""
+性能分析模块
+
+对单个Web请求或命令行菜单操作进行性能分析，结果保存在 logs/profiles 下：
+    - cprofile: 使用cProfile记录所有函数调用，保存为 .pstats 文件，可用 pstats、snakeviz 等工具查看
+    - sample: 后台线程定时采样被分析线程的调用栈，保存为折叠栈(.folded)文件，
+      可直接用 flamegraph.pl、speedscope 等工具生成火焰图
+
+只有在请求或操作明确开启分析时才会创建分析器，未开启时没有任何额外开销。
+"""
+import os
+import re
+import sys
+import time
+import cProfile
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# 支持的分析模式
+PROFILE_MODES = ('cprofile', 'sample')
+
+class StackSampler:
+    """调用栈采样器，在后台线程中定时记录目标线程的调用栈"""
+    
+    def __init__(self, thread_id, interval=0.005):
+        """
+        初始化采样器
+        
+        参数:
+            thread_id (int): 被采样线程的标识
+            interval (float): 采样间隔(秒)
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        """开始采样"""
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """停止采样"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+    
+    def _run(self):
+        """采样循环"""
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            # 折叠栈格式从最外层调用开始，以分号分隔
+            self.samples[';'.join(reversed(stack))] += 1
+    
+    def write(self, path):
+        """
+        以折叠栈格式写入采样结果，每行为 "调用栈 次数"
+        
+        参数:
+            path (str): 输出文件路径
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+class Profiler:
+    """单次操作的性能分析器"""
+    
+    def __init__(self, mode, name, output_dir, interval=0.005):
+        """
+        初始化分析器
+        
+        参数:
+            mode (str): 分析模式，cprofile 或 sample
+            name (str): 被分析的操作名称，用于生成文件名
+            output_dir (str): 结果保存目录
+            interval (float): sample模式的采样间隔(秒)
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"不支持的分析模式: {mode}")
+        self.mode = mode
+        self.name = name
+        self.output_dir = output_dir
+        self.interval = interval
+        self._profile = None
+        self._sampler = None
+        self._started = None
+    
+    def start(self):
+        """
+        开始分析当前线程
+        
+        返回:
+            bool: 是否成功开始，同一线程中已有其他cProfile分析时返回False
+        """
+        self._started = time.perf_counter()
+        if self.mode == 'cprofile':
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError as e:
+                logger.warning(f"无法开始性能分析 [{self.name}]: {e}")
+                return False
+            self._profile = profile
+        else:
+            self._sampler = StackSampler(threading.get_ident(), self.interval)
+            self._sampler.start()
+        return True
+    
+    def stop(self):
+        """
+        停止分析并保存结果
+        
+        返回:
+            str: 结果文件路径，保存失败时返回None
+        """
+        if self._profile:
+            self._profile.disable()
+        if self._sampler:
+            self._sampler.stop()
+        elapsed = time.perf_counter() - self._started
+        
+        safe_name = re.sub(r'[^\w.-]+', '_', self.name).strip('_')[:80] or 'profile'
+        filename = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{safe_name}-{os.getpid()}"
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            if self._profile:
+                path = os.path.join(self.output_dir, f"{filename}.pstats")
+                self._profile.dump_stats(path)
+            else:
+                path = os.path.join(self.output_dir, f"{filename}.folded")
+                self._sampler.write(path)
+        except OSError as e:
+            logger.error(f"保存性能分析结果失败: {e}")
+            return None
+        
+        logger.info(f"性能分析 [{self.name}] 耗时 {elapsed * 1000:.1f}ms，结果已保存: {path}")
+        return path
\ No newline at end of file
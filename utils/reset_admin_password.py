@@ -4,23 +4,13 @@
 import os
 import sys
 import sqlite3
-import hashlib
 
 # 添加项目根目录到系统路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.database import TABLES
 from config.settings import DATABASE_CONFIG
-
-def hash_password(password):
-    """对密码进行哈希处理"""
-    salt = "xtR9ZGgI"
-    iterations = 150000
-    
-    dk = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('utf-8'), iterations)
-    hashed = f"pbkdf2:sha256:{iterations}${salt}${dk.hex()}"
-    
-    return hashed
+from utils.passwords import hash_password
 
 def reset_admin_password(new_password="admin123"):
     """重置管理员密码为指定值"""
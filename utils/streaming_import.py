@@ -0,0 +1,143 @@
+"""
+流式CSV导入模块
+
+上传的文件直接写入磁盘，导入时逐行读取并按批交给控制器处理，内存占用与文件大小无关。
+每批数据与导入进度(文件中的字节位置)在同一事务中提交，导入中断后从最后提交的位置继续。
+"""
+import os
+import re
+import csv
+import time
+import uuid
+import logging
+
+from config.settings import IMPORT_UPLOAD_DIR, IMPORT_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+# save_upload 生成的文件名，请求中传回的文件名必须符合该格式，防止访问导入目录之外的文件
+UPLOAD_NAME_PATTERN = re.compile(r'^[0-9a-f]{32}\.csv$')
+
+def save_upload(file, upload_dir=IMPORT_UPLOAD_DIR):
+    """
+    将上传的文件分块写入导入目录
+    
+    参数:
+        file (FileStorage): 上传的文件
+        upload_dir (str): 导入目录
+    
+    返回:
+        str: 保存的文件路径
+    """
+    os.makedirs(upload_dir, exist_ok=True)
+    path = os.path.join(upload_dir, f"{uuid.uuid4().hex}.csv")
+    file.save(path)
+    return path
+
+def remove_upload(path):
+    """删除已保存的上传文件，文件已被删除时忽略"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def purge_uploads(upload_dir, max_age):
+    """
+    删除目录中超过保留时间的上传文件
+    
+    参数:
+        upload_dir (str): 上传文件目录
+        max_age (int): 保留的秒数
+    
+    返回:
+        int: 删除的文件数
+    """
+    if not os.path.isdir(upload_dir):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for name in os.listdir(upload_dir):
+        path = os.path.join(upload_dir, name)
+        try:
+            if UPLOAD_NAME_PATTERN.match(name) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError as e:
+            logger.warning(f"清理上传文件 {path} 失败: {e}")
+    return removed
+
+def get_upload_path(upload_name, upload_dir=IMPORT_UPLOAD_DIR):
+    """
+    根据 save_upload 生成的文件名获取已保存的文件路径
+    
+    参数:
+        upload_name (str): 文件名
+        upload_dir (str): 导入目录
+    
+    返回:
+        str: 文件路径，文件名格式不正确或文件不存在时返回None
+    """
+    if not upload_name or not UPLOAD_NAME_PATTERN.match(upload_name):
+        return None
+    path = os.path.join(upload_dir, upload_name)
+    return path if os.path.isfile(path) else None
+
+def read_csv_chunks(path, byte_offset=0, fieldnames=None, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    从指定的字节位置开始分批读取CSV文件
+    
+    csv模块只在需要时读取下一行，因此每产出一批数据时已读取的字节数就是这一批在文件中的结束位置，
+    从该位置重新打开文件即可继续读取。
+    
+    参数:
+        path (str): 文件路径
+        byte_offset (int): 开始位置，0表示从文件头开始并读取表头
+        fieldnames (list, optional): 从中间位置继续时使用的字段名
+        chunk_size (int): 每批的行数
+    
+    生成:
+        tuple: (字段名, 行字典列表, 这一批的结束位置)
+    """
+    with open(path, 'rb') as f:
+        f.seek(byte_offset)
+        position = byte_offset
+        
+        def lines():
+            nonlocal position
+            for line in f:
+                position += len(line)
+                yield line.decode('utf-8')
+        
+        line_iter = lines()
+        if byte_offset == 0:
+            header = next(csv.reader(line_iter), None)
+            if not header:
+                return
+            # 去掉Excel保存的UTF-8文件开头的BOM
+            fieldnames = [name.lstrip('\ufeff').strip() for name in header]
+        
+        rows = []
+        for values in csv.reader(line_iter):
+            if not values:
+                continue  # 空行
+            rows.append(dict(zip(fieldnames, values)))
+            if len(rows) >= chunk_size:
+                yield fieldnames, rows, position
+                rows = []
+        if rows:
+            yield fieldnames, rows, position
+
+def read_csv_rows(path):
+    """
+    读取整个CSV文件为行字典列表
+    
+    参数:
+        path (str): 文件路径
+    
+    返回:
+        list: 行字典列表
+    """
+    rows = []
+    for _, chunk, _ in read_csv_chunks(path):
+        rows.extend(chunk)
+    return rows
\ No newline at end of file
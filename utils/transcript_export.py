@@ -0,0 +1,371 @@
+"""
+批量成绩单导出模块
+
+为整届学生(或某个班级)批量生成成绩单文件：
+    - 用一个游标按学号顺序流式读取所有成绩，边读边按学生组装成绩单，同一时间只保留少量学生的数据
+    - 在进程池中渲染并写入每名学生的成绩单文件：CSV，以及带打印样式的HTML(可直接用浏览器打印或转换为PDF)
+    - 每完成一名学生就追加一行到清单文件 manifest.csv；中断后以续传方式重新运行时跳过清单中已完成的学生
+
+用法:
+    python -m utils.transcript_export [--output 目录] [--class-name 班级] [--formats csv,html] [--jobs 4] [--resume]
+"""
+import os
+import sys
+import csv
+import html
+import time
+import logging
+import argparse
+import multiprocessing
+from io import StringIO
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED, ALL_COMPLETED
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.database import TABLES
+from config.settings import DATABASE_CONFIG, TRANSCRIPT_EXPORT_DIR, TRANSCRIPT_EXPORT_JOBS
+from models.database import Database
+from models.grade import Grade
+
+logger = logging.getLogger(__name__)
+
+# 支持的成绩单格式
+TRANSCRIPT_FORMATS = ('csv', 'html')
+
+# 清单文件名及其列
+MANIFEST_NAME = 'manifest.csv'
+MANIFEST_FIELDS = ['student_id', 'name', 'class_name', 'course_count', 'total_credit', 'gpa', 'weighted_avg',
+                   'files', 'generated_at']
+
+# 每个渲染任务包含的成绩单数量，减少进程间通信的次数
+TASK_SIZE = 25
+
+# 每个进程同时排队的渲染任务数量，限制内存占用
+QUEUE_PER_WORKER = 2
+
+# 进程池以spawn方式启动子进程，后台任务线程中导出时不会把Web进程中其他线程持有的锁fork到子进程中
+POOL_CONTEXT = multiprocessing.get_context('spawn')
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>学生成绩单 - {name}</title>
+<style>
+    @page {{ size: A4; margin: 18mm; }}
+    body {{ font-family: "SimSun", "Songti SC", serif; font-size: 12px; }}
+    h1 {{ text-align: center; font-size: 20px; }}
+    h2 {{ font-size: 14px; margin: 16px 0 4px; }}
+    table {{ width: 100%; border-collapse: collapse; }}
+    th, td {{ border: 1px solid #999; padding: 3px 6px; text-align: left; }}
+    .info th, .info td {{ border: none; }}
+    .summary {{ color: #555; font-weight: normal; font-size: 12px; margin-left: 8px; }}
+    .fail {{ color: #c00; }}
+    tr {{ break-inside: avoid; }}
+</style>
+</head>
+<body>
+<h1>学生成绩单</h1>
+<table class="info">
+<tr><th>学号</th><td>{student_id}</td><th>姓名</th><td>{name}</td><th>班级</th><td>{class_name}</td></tr>
+<tr><th>总学分</th><td>{total_credit}</td><th>GPA</th><td>{gpa}</td><th>加权平均分</th><td>{weighted_avg}</td></tr>
+</table>
+{semesters}
+<p style="text-align: right; color: #777;">生成时间: {generated_at}</p>
+</body>
+</html>
+"""
+
+def _escape(value):
+    """转义HTML特殊字符，None显示为空"""
+    return html.escape(str(value if value is not None else ''))
+
+def render_csv(transcript):
+    """
+    生成CSV格式的成绩单，每门课程一行，并附带学期和累计GPA
+    
+    参数:
+        transcript (dict): 成绩单
+    
+    返回:
+        str: CSV内容
+    """
+    output = StringIO()
+    writer = csv.writer(output)
+    writer.writerow(['学号', '姓名', '班级', '学期', '课程编号', '课程名称', '学分', '成绩', '绩点',
+                     '学期GPA', '学期加权平均分', '累计GPA'])
+    for semester in transcript['semesters']:
+        for course in semester['courses']:
+            writer.writerow([
+                transcript['student_id'], transcript['name'], transcript['class_name'] or '',
+                semester['semester'], course['course_id'], course['course_name'], course['credit'],
+                course['score'], course['grade_point'],
+                semester['gpa'], semester['weighted_avg'], semester['cumulative_gpa']
+            ])
+    writer.writerow([])
+    writer.writerow(['总学分', transcript['total_credit'], 'GPA', transcript['gpa'],
+                     '加权平均分', transcript['weighted_avg']])
+    return output.getvalue()
+
+def render_html(transcript, generated_at):
+    """
+    生成带打印样式(A4)的HTML成绩单
+    
+    参数:
+        transcript (dict): 成绩单
+        generated_at (str): 生成时间
+    
+    返回:
+        str: HTML内容
+    """
+    sections = []
+    for semester in transcript['semesters']:
+        rows = []
+        for course in semester['courses']:
+            score_class = ' class="fail"' if course['score'] < 60 else ''
+            rows.append(
+                f"<tr><td>{_escape(course['course_id'])}</td><td>{_escape(course['course_name'])}</td>"
+                f"<td>{_escape(course['credit'])}</td><td{score_class}>{_escape(course['score'])}</td>"
+                f"<td>{_escape(course['grade_point'])}</td></tr>\n"
+            )
+        sections.append(
+            f"<h2>{_escape(semester['semester'])}<span class=\"summary\">学分 {_escape(semester['total_credit'])} · "
+            f"GPA {_escape(semester['gpa'])} · 加权平均分 {_escape(semester['weighted_avg'])} · "
+            f"累计GPA {_escape(semester['cumulative_gpa'])}</span></h2>\n"
+            f"<table>\n<tr><th>课程编号</th><th>课程名称</th><th>学分</th><th>成绩</th><th>绩点</th></tr>\n{''.join(rows)}</table>"
+        )
+    
+    return HTML_TEMPLATE.format(
+        student_id=_escape(transcript['student_id']),
+        name=_escape(transcript['name']),
+        class_name=_escape(transcript['class_name']),
+        total_credit=_escape(transcript['total_credit']),
+        gpa=_escape(transcript['gpa']),
+        weighted_avg=_escape(transcript['weighted_avg']),
+        semesters='\n'.join(sections) or '<p>暂无成绩记录</p>',
+        generated_at=_escape(generated_at)
+    )
+
+def _safe_filename(value):
+    """将学号转换为安全的文件名"""
+    return ''.join(char if char.isalnum() or char in '-_' else '_' for char in str(value)) or 'unknown'
+
+def write_transcript(transcript, output_dir, formats):
+    """
+    写入一名学生的成绩单文件，在进程池中执行
+    
+    文件先写入临时文件再重命名，中断时不会留下不完整的成绩单。
+    
+    参数:
+        transcript (dict): 成绩单
+        output_dir (str): 输出目录
+        formats (tuple): 成绩单格式
+    
+    返回:
+        dict: 清单记录
+    """
+    generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    # 按班级分目录，避免单个目录中文件过多
+    directory = os.path.join(output_dir, _safe_filename(transcript['class_name'] or 'unassigned'))
+    os.makedirs(directory, exist_ok=True)
+    
+    files = []
+    for fmt in formats:
+        if fmt == 'csv':
+            # 带BOM，便于Excel直接打开
+            content, encoding = render_csv(transcript), 'utf-8-sig'
+        else:
+            content, encoding = render_html(transcript, generated_at), 'utf-8'
+        path = os.path.join(directory, f"{_safe_filename(transcript['student_id'])}.{fmt}")
+        with open(f"{path}.tmp", 'w', encoding=encoding, newline='') as f:
+            f.write(content)
+        os.replace(f"{path}.tmp", path)
+        files.append(os.path.relpath(path, output_dir))
+    
+    return {
+        'student_id': transcript['student_id'],
+        'name': transcript['name'],
+        'class_name': transcript['class_name'] or '',
+        'course_count': transcript['course_count'],
+        'total_credit': transcript['total_credit'],
+        'gpa': transcript['gpa'],
+        'weighted_avg': transcript['weighted_avg'],
+        'files': ';'.join(files),
+        'generated_at': generated_at
+    }
+
+def write_transcripts(transcripts, output_dir, formats):
+    """
+    写入一批成绩单，单个学生失败不影响同批的其他学生
+    
+    参数:
+        transcripts (list): 成绩单列表
+        output_dir (str): 输出目录
+        formats (tuple): 成绩单格式
+    
+    返回:
+        list: 每名学生的处理结果 (学号, 清单记录, 错误信息)，成功时错误信息为None
+    """
+    results = []
+    for transcript in transcripts:
+        try:
+            results.append((transcript['student_id'], write_transcript(transcript, output_dir, formats), None))
+        except Exception as e:
+            results.append((transcript['student_id'], None, str(e)))
+    return results
+
+def read_manifest(path):
+    """
+    读取清单中已完成的学号
+    
+    参数:
+        path (str): 清单文件路径
+    
+    返回:
+        set: 已完成的学号集合，清单不存在时为空集合
+    """
+    if not os.path.exists(path):
+        return set()
+    with open(path, newline='', encoding='utf-8') as f:
+        return {row['student_id'] for row in csv.DictReader(f) if row.get('student_id')}
+
+def export_transcripts(db, output_dir=TRANSCRIPT_EXPORT_DIR, class_name=None, formats=TRANSCRIPT_FORMATS,
+                       jobs=TRANSCRIPT_EXPORT_JOBS, resume=False, progress=None):
+    """
+    批量导出成绩单
+    
+    参数:
+        db (Database): 数据库实例
+        output_dir (str): 输出目录
+        class_name (str, optional): 班级，不提供时导出所有学生
+        formats (tuple): 成绩单格式，csv 和/或 html
+        jobs (int): 渲染进程数，为1时在当前进程中渲染
+        resume (bool): 是否跳过清单中已完成的学生，否则重新生成清单
+        progress (callable, optional): 进度回调，参数为 (已处理人数, 总人数)
+    
+    返回:
+        dict: 导出结果，包含总人数、本次写入、跳过和失败的人数、清单路径和耗时
+    """
+    formats = tuple(fmt for fmt in formats if fmt in TRANSCRIPT_FORMATS)
+    if not formats:
+        raise ValueError(f"不支持的成绩单格式，可选: {', '.join(TRANSCRIPT_FORMATS)}")
+    
+    started = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    done = read_manifest(manifest_path) if resume else set()
+    
+    sql = f"SELECT COUNT(*) FROM {TABLES['students']}"
+    params = []
+    if class_name:
+        sql += " WHERE class_name = ?"
+        params.append(class_name)
+    total = db.connection.execute(sql, params).fetchone()[0]
+    
+    summary = {'total': total, 'written': 0, 'skipped': 0, 'failed': 0, 'failed_students': [],
+               'output_dir': output_dir, 'manifest': manifest_path}
+    processed = 0
+    
+    new_manifest = not resume or not os.path.exists(manifest_path)
+    with open(manifest_path, 'w' if new_manifest else 'a', newline='', encoding='utf-8') as manifest_file:
+        manifest = csv.DictWriter(manifest_file, fieldnames=MANIFEST_FIELDS)
+        if new_manifest:
+            manifest.writeheader()
+        
+        def record(student_id, entry=None, error=None):
+            """记录一名学生的处理结果，清单每行立即写入磁盘"""
+            nonlocal processed
+            processed += 1
+            if error is not None:
+                summary['failed'] += 1
+                summary['failed_students'].append(student_id)
+                logger.error(f"生成学生 {student_id} 的成绩单失败: {error}")
+            else:
+                manifest.writerow(entry)
+                manifest_file.flush()
+                summary['written'] += 1
+            if progress:
+                progress(processed, total)
+        
+        def batches():
+            """流式读取成绩单并分批，跳过续传前已完成的学生"""
+            nonlocal processed
+            batch = []
+            for transcript in Grade(db).iter_transcripts(class_name):
+                if transcript['student_id'] in done:
+                    summary['skipped'] += 1
+                    processed += 1
+                    continue
+                batch.append(transcript)
+                if len(batch) >= TASK_SIZE:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        
+        if jobs <= 1:
+            for batch in batches():
+                for result in write_transcripts(batch, output_dir, formats):
+                    record(*result)
+        else:
+            with ProcessPoolExecutor(max_workers=jobs, mp_context=POOL_CONTEXT) as pool:
+                pending = set()
+                
+                def drain(return_when):
+                    """等待并记录已完成的渲染任务"""
+                    finished, _ = wait(pending, return_when=return_when)
+                    for future in finished:
+                        pending.discard(future)
+                        for result in future.result():
+                            record(*result)
+                
+                for batch in batches():
+                    pending.add(pool.submit(write_transcripts, batch, output_dir, formats))
+                    # 限制排队的任务数量，读取速度快于渲染时不会占用过多内存
+                    if len(pending) >= jobs * QUEUE_PER_WORKER:
+                        drain(FIRST_COMPLETED)
+                if pending:
+                    drain(ALL_COMPLETED)
+    
+    summary['elapsed'] = round(time.perf_counter() - started, 2)
+    logger.info(f"成绩单导出完成: 共 {total} 人，写入 {summary['written']}，跳过 {summary['skipped']}，"
+                f"失败 {summary['failed']}，耗时 {summary['elapsed']}s，清单: {manifest_path}")
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description='批量导出学生成绩单')
+    parser.add_argument('--output', default=TRANSCRIPT_EXPORT_DIR, help='输出目录')
+    parser.add_argument('--class-name', help='只导出该班级的学生')
+    parser.add_argument('--formats', default=','.join(TRANSCRIPT_FORMATS), help='成绩单格式，以逗号分隔')
+    parser.add_argument('--jobs', type=int, default=TRANSCRIPT_EXPORT_JOBS, help='渲染进程数')
+    parser.add_argument('--resume', action='store_true', help='跳过清单中已完成的学生，继续上次中断的导出')
+    parser.add_argument('--db', default=DATABASE_CONFIG['name'], help='数据库文件路径')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    
+    db = Database(dict(DATABASE_CONFIG, name=args.db))
+    db.connect()
+    
+    def show_progress(processed, total):
+        if processed % 100 == 0 or processed == total:
+            print(f"\r已处理 {processed}/{total}", end='', flush=True)
+    
+    try:
+        summary = export_transcripts(
+            db, args.output, args.class_name, tuple(args.formats.split(',')), args.jobs, args.resume, show_progress
+        )
+    except ValueError as e:
+        print(e)
+        return 2
+    finally:
+        db.close()
+    
+    print(f"\n共 {summary['total']} 人，写入 {summary['written']}，跳过 {summary['skipped']}，"
+          f"失败 {summary['failed']}，耗时 {summary['elapsed']}s")
+    print(f"清单: {summary['manifest']}")
+    return 1 if summary['failed'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -35,6 +35,11 @@ class BaseView:
         logger.debug(f"Setting current user in BaseView: {user}")
         self.current_user = user
         
+        # 按需创建的控制器集合自行更新已创建和之后创建的控制器
+        if hasattr(self.controllers, 'set_current_user'):
+            self.controllers.set_current_user(user)
+            return
+        
         # 同步更新所有控制器实例的 current_user
         if self.controllers:
             for controller_name, controller_instance in self.controllers.items():
@@ -0,0 +1,391 @@
+"""
+命令行批处理视图模块
+
+以子命令方式执行导入、导出、统计和清理等操作，不显示菜单也不清屏，便于在定时任务和脚本中调用：
+    python main.py import-grades grades1.csv grades2.csv --jobs 4
+    python main.py import-grades grades.csv --dry-run
+    python main.py export-students --class-name 计算机1班 --output students.csv
+    python main.py stats --semester 2023-2024-1 --json
+    python main.py clear-logs --days 180
+    python main.py recompute-grade-points
+
+退出码:
+    0 - 成功
+    1 - 操作失败
+    2 - 参数错误或用户不存在
+    3 - 部分记录处理失败
+"""
+import os
+import sys
+import csv
+import json
+import logging
+import argparse
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# 退出码
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_PARTIAL = 3
+
+# 导出学生的字段，与学生导入的字段一致，导出的文件可直接重新导入
+STUDENT_FIELDS = ['student_id', 'name', 'gender', 'birth_date', 'class_name', 'admission_date',
+                  'contact_phone', 'email', 'address', 'status']
+
+# 文本输出中每个文件最多列出的失败记录数，完整列表使用 --json 查看
+FAILED_DISPLAY_LIMIT = 20
+
+def build_parser():
+    """
+    创建批处理命令的参数解析器
+    
+    返回:
+        argparse.ArgumentParser: 参数解析器
+    """
+    # 通用选项既可以写在子命令之前也可以写在之后；子命令中的默认值为SUPPRESS，
+    # 未在子命令后提供时不会覆盖子命令前给出的值，实际的默认值由顶层解析器设置
+    def add_common_arguments(target, defaults):
+        target.add_argument('--user', default=defaults.get('user', argparse.SUPPRESS),
+                            help='执行操作的用户名，决定操作权限并记录在操作日志中(默认为环境变量SMS_USER或admin)')
+        target.add_argument('--json', action='store_true', default=defaults.get('json', argparse.SUPPRESS),
+                            help='以JSON格式输出结果')
+        target.add_argument('--verbose', action='store_true', default=defaults.get('verbose', argparse.SUPPRESS),
+                            help='在标准错误输出中显示INFO级别日志')
+    
+    common = argparse.ArgumentParser(add_help=False)
+    add_common_arguments(common, {})
+    
+    parser = argparse.ArgumentParser(prog='main.py', description='学生管理系统批处理命令，不提供子命令时启动交互式界面')
+    add_common_arguments(parser, {'user': os.environ.get('SMS_USER', 'admin'), 'json': False, 'verbose': False})
+    subparsers = parser.add_subparsers(dest='command', required=True, metavar='command')
+    add_parser = functools.partial(subparsers.add_parser, parents=[common])
+    
+    import_grades = add_parser('import-grades', help='从CSV文件导入成绩')
+    import_grades.add_argument('files', nargs='+', help='CSV文件，字段为 student_id,course_id,semester,score')
+    import_grades.add_argument('--jobs', type=int, default=1, help='并行读取文件的进程数')
+    import_grades.add_argument('--dry-run', action='store_true', help='只显示将新增、更新和校验失败的记录数，不写入数据库')
+    import_grades.add_argument('--update-existing', action='store_true', help='更新已有的成绩记录，默认跳过并计为失败')
+    
+    import_students = add_parser('import-students', help='从CSV文件导入学生')
+    import_students.add_argument('files', nargs='+', help='CSV文件，字段与 export-students 的输出一致')
+    import_students.add_argument('--jobs', type=int, default=1, help='并行读取文件的进程数')
+    
+    export_students = add_parser('export-students', help='导出学生为CSV')
+    export_students.add_argument('--output', default='-', help='输出文件，默认为标准输出')
+    export_students.add_argument('--class-name', help='只导出该班级的学生')
+    export_students.add_argument('--status', help='只导出该状态的学生')
+    
+    export_transcripts = add_parser('export-transcripts', help='批量导出学生成绩单')
+    export_transcripts.add_argument('--output', help='输出目录')
+    export_transcripts.add_argument('--class-name', help='只导出该班级的学生')
+    export_transcripts.add_argument('--formats', default='csv,html', help='成绩单格式，以逗号分隔')
+    export_transcripts.add_argument('--jobs', type=int, help='渲染进程数')
+    export_transcripts.add_argument('--resume', action='store_true', help='跳过清单中已完成的学生')
+    
+    stats = add_parser('stats', help='输出成绩统计')
+    stats.add_argument('--semester', help='学期')
+    stats.add_argument('--class-name', help='班级')
+    stats.add_argument('--course-id', help='课程编号')
+    
+    clear_logs = add_parser('clear-logs', help='清除旧的操作日志')
+    clear_logs.add_argument('--days', type=int, required=True, help='保留最近多少天的日志')
+    
+    add_parser('recompute-grade-points', help='按配置的绩点表重新计算所有成绩的绩点')
+    
+    return parser
+
+def read_csv_file(path):
+    """
+    读取CSV文件为字典列表，在进程池中执行
+    
+    参数:
+        path (str): 文件路径
+    
+    返回:
+        tuple: (文件路径, 记录列表, 错误信息)，读取成功时错误信息为None
+    """
+    try:
+        # utf-8-sig 兼容Excel保存的带BOM文件
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            return path, list(csv.DictReader(f)), None
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        return path, [], str(e)
+
+class CLIBatchView:
+    """命令行批处理视图类，执行子命令并返回退出码"""
+    
+    def __init__(self, controllers, as_json=False):
+        """
+        初始化批处理视图
+        
+        参数:
+            controllers (dict): 控制器字典
+            as_json (bool): 是否以JSON格式输出结果
+        """
+        self.controllers = controllers
+        self.as_json = as_json
+    
+    def run(self, args):
+        """
+        执行子命令
+        
+        参数:
+            args (argparse.Namespace): 解析后的参数
+        
+        返回:
+            int: 退出码
+        """
+        handlers = {
+            'import-grades': self.import_grades,
+            'import-students': self.import_students,
+            'export-students': self.export_students,
+            'export-transcripts': self.export_transcripts,
+            'stats': self.show_stats,
+            'clear-logs': self.clear_logs,
+            'recompute-grade-points': self.recompute_grade_points,
+        }
+        try:
+            return handlers[args.command](args)
+        except BrokenPipeError:
+            # 输出被管道截断(如 | head)，后续输出重定向到空设备，避免解释器退出时再次报错
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return EXIT_FAILED
+        except Exception as e:
+            logger.error(f"执行命令 {args.command} 出错: {e}", exc_info=True)
+            self.output({'success': False, 'message': str(e)}, [f"执行出错: {e}"])
+            return EXIT_FAILED
+    
+    def output(self, result, lines):
+        """
+        输出命令结果
+        
+        参数:
+            result (dict): 结果，使用 --json 时原样输出
+            lines (list): 文本输出的各行
+        """
+        if self.as_json:
+            print(json.dumps(result, ensure_ascii=False, indent=2, default=str))
+        else:
+            for line in lines:
+                print(line)
+    
+    def exit_code(self, result, failed_count=0):
+        """根据控制器响应和失败记录数确定退出码"""
+        if not result['success']:
+            return EXIT_FAILED
+        return EXIT_PARTIAL if failed_count else EXIT_OK
+    
+    def read_files(self, files, jobs):
+        """
+        读取多个CSV文件，jobs大于1时在进程池中并行读取
+        
+        参数:
+            files (list): 文件路径列表
+            jobs (int): 进程数
+        
+        返回:
+            list: 按输入顺序排列的 (文件路径, 记录列表, 错误信息)
+        """
+        if jobs > 1 and len(files) > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as pool:
+                return list(pool.map(read_csv_file, files))
+        return [read_csv_file(path) for path in files]
+    
+    def import_files(self, args, import_func):
+        """
+        读取CSV文件并逐个导入
+        
+        参数:
+            args (argparse.Namespace): 解析后的参数
+            import_func (callable): 控制器的导入方法
+        
+        返回:
+            int: 退出码
+        """
+        summary = {'success': True, 'files': [], 'success_count': 0, 'failed_count': 0}
+        lines = []
+        for path, records, error in self.read_files(args.files, args.jobs):
+            if error is not None:
+                file_result = {'file': path, 'success': False, 'message': f"读取文件失败: {error}"}
+            elif not records:
+                file_result = {'file': path, 'success': False, 'message': "文件中没有数据"}
+            else:
+                # 导入按文件顺序执行，SQLite同一时间只允许一个写入者
+                result = import_func(records)
+                file_result = {'file': path, 'success': result['success'], 'message': result['message']}
+                if result['success']:
+                    data = result['data']
+                    file_result.update(data)
+                    summary['success_count'] += data['success_count']
+                    summary['failed_count'] += data['failed_count']
+            if not file_result['success']:
+                summary['success'] = False
+            summary['files'].append(file_result)
+            
+            lines.append(f"{path}: {file_result['message']}")
+            failed_records = file_result.get('failed_records', [])
+            for record in failed_records[:FAILED_DISPLAY_LIMIT]:
+                lines.append(f"  失败: {record['data']} - {record['reason']}")
+            if len(failed_records) > FAILED_DISPLAY_LIMIT:
+                lines.append(f"  ... 另有 {len(failed_records) - FAILED_DISPLAY_LIMIT} 条失败记录，使用 --json 查看全部")
+        
+        lines.append(f"共导入 {summary['success_count']} 条记录，失败 {summary['failed_count']} 条")
+        self.output(summary, lines)
+        return self.exit_code(summary, summary['failed_count'])
+    
+    def import_grades(self, args):
+        """导入成绩"""
+        if args.dry_run:
+            return self.plan_grade_files(args)
+        grade_controller = self.controllers['grade']
+        import_func = grade_controller.apply_grade_import if args.update_existing else grade_controller.import_grades
+        return self.import_files(args, import_func)
+    
+    def plan_grade_files(self, args):
+        """
+        预览成绩导入，逐个文件显示将新增、更新、未变化和校验失败的记录数
+        
+        参数:
+            args (argparse.Namespace): 解析后的参数
+        
+        返回:
+            int: 退出码，有校验失败的记录时为部分失败
+        """
+        summary = {'success': True, 'files': [], 'failed_count': 0}
+        lines = []
+        for path, records, error in self.read_files(args.files, args.jobs):
+            if error is not None:
+                file_result = {'file': path, 'success': False, 'message': f"读取文件失败: {error}"}
+            elif not records:
+                file_result = {'file': path, 'success': False, 'message': "文件中没有数据"}
+            else:
+                result = self.controllers['grade'].plan_grade_import(records)
+                file_result = {'file': path, 'success': result['success'], 'message': result['message']}
+                if result['success']:
+                    file_result.update(result['data'])
+                    summary['failed_count'] += result['data']['failed_count']
+            if not file_result['success']:
+                summary['success'] = False
+            summary['files'].append(file_result)
+            
+            lines.append(f"{path}: {file_result['message']}")
+            for update in file_result.get('updates', [])[:FAILED_DISPLAY_LIMIT]:
+                data = update['data']
+                lines.append(f"  更新: {data['student_id']} {data['course_id']} {data['semester']} "
+                             f"{update['old_score']} -> {update['new_score']}")
+            failed_records = file_result.get('failed_records', [])
+            for record in failed_records[:FAILED_DISPLAY_LIMIT]:
+                lines.append(f"  失败: {record['data']} - {record['reason']}")
+            if len(failed_records) > FAILED_DISPLAY_LIMIT:
+                lines.append(f"  ... 另有 {len(failed_records) - FAILED_DISPLAY_LIMIT} 条失败记录，使用 --json 查看全部")
+        
+        lines.append("预览模式，未写入数据库；使用 --update-existing 导入并更新已有的成绩记录")
+        self.output(summary, lines)
+        return self.exit_code(summary, summary['failed_count'])
+    
+    def import_students(self, args):
+        """导入学生"""
+        return self.import_files(args, self.controllers['student'].import_students)
+    
+    def export_students(self, args):
+        """导出学生为CSV"""
+        filters = {}
+        if args.class_name:
+            filters['class_name'] = args.class_name
+        if args.status:
+            filters['status'] = args.status
+        
+        student_controller = self.controllers['student']
+        output = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', encoding='utf-8-sig')
+        try:
+            writer = csv.DictWriter(output, fieldnames=STUDENT_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            page = 1
+            count = 0
+            while True:
+                result = student_controller.get_all_students(filters, page, 1000, order_by='student_id')
+                if not result['success']:
+                    print(result['message'], file=sys.stderr)
+                    return EXIT_FAILED
+                writer.writerows(result['data']['items'])
+                count += len(result['data']['items'])
+                if page >= result['data']['total_pages']:
+                    break
+                page += 1
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        
+        # 导出到标准输出时结果信息写入标准错误，不混入CSV数据
+        if args.output != '-':
+            self.output({'success': True, 'count': count, 'output': args.output},
+                        [f"已导出 {count} 名学生到 {args.output}"])
+        else:
+            print(f"已导出 {count} 名学生", file=sys.stderr)
+        return EXIT_OK
+    
+    def export_transcripts(self, args):
+        """批量导出成绩单"""
+        formats = tuple(fmt.strip() for fmt in args.formats.split(',') if fmt.strip())
+        result = self.controllers['grade'].export_transcripts(args.output, args.class_name, formats,
+                                                              args.jobs, args.resume)
+        data = result['data']
+        lines = [result['message']]
+        if data:
+            lines.append(f"共 {data['total']} 人，写入 {data['written']}，跳过 {data['skipped']}，"
+                         f"失败 {data['failed']}，耗时 {data['elapsed']}s")
+            lines.append(f"清单: {data['manifest']}")
+        self.output(result, lines)
+        if data and data['failed']:
+            return EXIT_PARTIAL
+        return self.exit_code(result)
+    
+    def show_stats(self, args):
+        """输出成绩统计"""
+        filters = {}
+        for key in ('semester', 'class_name', 'course_id'):
+            if getattr(args, key):
+                filters[key] = getattr(args, key)
+        
+        result = self.controllers['grade'].get_grade_statistics(filters)
+        if not result['success']:
+            self.output(result, [result['message']])
+            return EXIT_FAILED
+        
+        stats = result['data']
+        lines = [
+            f"成绩记录数: {stats.get('total_count', 0)}",
+            f"学生数: {stats.get('total_students', 0)}",
+            f"平均分: {stats.get('average_score', 0)}",
+            f"最高分: {stats.get('highest_score', 0)}  最低分: {stats.get('lowest_score', 0)}",
+            f"及格率: {stats.get('pass_rate', 0)}%  优秀率: {stats.get('excellent_rate', 0)}%",
+            f"平均GPA: {stats.get('average_gpa', 0)}",
+        ]
+        distribution = stats.get('score_distribution') or {}
+        if distribution:
+            lines.append("分数段: " + ", ".join(f"{key} {value}人次" for key, value in distribution.items()))
+        for semester, semester_stats in (stats.get('semester_stats') or {}).items():
+            lines.append(f"{semester}: {semester_stats['count']} 条成绩，平均分 {semester_stats['avg_score']}，"
+                         f"及格率 {semester_stats['pass_rate']}%")
+        self.output(result, lines)
+        return EXIT_OK
+    
+    def clear_logs(self, args):
+        """清除旧的操作日志"""
+        if args.days < 0:
+            self.output({'success': False, 'message': "天数不能为负数"}, ["天数不能为负数"])
+            return EXIT_USAGE
+        
+        result = self.controllers['log'].clear_old_logs(args.days)
+        self.output(result, [result['message']])
+        return self.exit_code(result)
+    
+    def recompute_grade_points(self, args):
+        """按配置的绩点表重新计算成绩绩点"""
+        result = self.controllers['grade'].recompute_grade_points()
+        self.output(result, [result['message']])
+        return self.exit_code(result)
\ No newline at end of file
@@ -5,6 +5,9 @@ import os
 import logging
 from datetime import datetime
 
+from utils import transcript_export
+from utils.analytics import parse_edges
+
 logger = logging.getLogger(__name__)
 
 class CLIGradeView:
@@ -38,10 +41,11 @@ class CLIGradeView:
             print("5. 删除成绩记录")
             print("6. 成绩统计分析")
             print("7. 导入成绩数据")
+            print("8. 批量导出成绩单")
             print("0. 返回主菜单")
             print()
             
-            choice = input("请选择操作 [0-7]: ").strip()
+            choice = input("请选择操作 [0-8]: ").strip()
             
             if choice == "1":
                 self.show_student_grades()
@@ -57,6 +61,8 @@ class CLIGradeView:
                 self.show_grade_statistics()
             elif choice == "7":
                 self.show_import_grades()
+            elif choice == "8":
+                self.show_export_transcripts()
             elif choice == "0":
                 break
             else:
@@ -431,15 +437,18 @@ class CLIGradeView:
         
         print("1. 学生GPA分析")
         print("2. 课程成绩分析")
+        print("3. 成绩分布分析")
         print("0. 返回")
         print()
         
-        choice = input("请选择操作 [0-2]: ").strip()
+        choice = input("请选择操作 [0-3]: ").strip()
         
         if choice == "1":
             self.show_student_gpa_analysis()
         elif choice == "2":
             self.show_course_grade_analysis()
+        elif choice == "3":
+            self.show_grade_distribution_analysis()
         elif choice == "0":
             return
         else:
@@ -459,45 +468,34 @@ class CLIGradeView:
             input("\n按回车键继续...")
             return
         
-        # 获取学生信息
-        if self.student_controller:
-            student_result = self.student_controller.get_student(student_id)
-            if not student_result['success']:
-                self.cli_view.show_message(student_result['message'], "error")
-                input("\n按回车键继续...")
-                return
-            
-            student = student_result['data']
-            print(f"\n学生信息: {student['name']} ({student['student_id']}), 班级: {student.get('class_name', '未知')}")
-        
-        # 计算总体GPA
-        gpa_result = self.grade_controller.calculate_student_gpa(student_id)
-        if not gpa_result['success']:
-            self.cli_view.show_message(gpa_result['message'], "error")
+        # 一次查询获取成绩单，包含总体、每学期和累计GPA
+        transcript_result = self.grade_controller.get_student_transcript(student_id)
+        if not transcript_result['success']:
+            self.cli_view.show_message(transcript_result['message'], "error")
             input("\n按回车键继续...")
             return
         
-        gpa_data = gpa_result['data']
+        transcript = transcript_result['data']
+        print(f"\n学生信息: {transcript['name']} ({transcript['student_id']}), 班级: {transcript.get('class_name') or '未知'}")
         
         print("\n总体GPA统计:")
-        print(f"总学分: {gpa_data['total_credit']}")
-        print(f"GPA: {gpa_data['gpa']}")
-        print(f"加权平均分: {gpa_data['weighted_avg']}")
-        
-        # 获取学期列表
-        student_grades_result = self.grade_controller.get_student_grades(student_id)
-        if student_grades_result['success']:
-            semesters = set()
-            for grade in student_grades_result['data']['items']:
-                semesters.add(grade['semester'])
+        print(f"总学分: {transcript['total_credit']}")
+        print(f"GPA: {transcript['gpa']}")
+        print(f"加权平均分: {transcript['weighted_avg']}")
+        
+        if transcript['semesters']:
+            print("\n各学期GPA:")
+            for semester in transcript['semesters']:
+                print(f"{semester['semester']}: GPA {semester['gpa']}, 加权平均分 {semester['weighted_avg']}, "
+                      f"学分 {semester['total_credit']}, 累计GPA {semester['cumulative_gpa']}")
             
-            if semesters:
-                print("\n各学期GPA:")
-                for semester in sorted(semesters):
-                    semester_gpa_result = self.grade_controller.calculate_student_gpa(student_id, semester)
-                    if semester_gpa_result['success']:
-                        semester_gpa_data = semester_gpa_result['data']
-                        print(f"{semester}: GPA {semester_gpa_data['gpa']}, 加权平均分 {semester_gpa_data['weighted_avg']}, 学分 {semester_gpa_data['total_credit']}")
+            if input("\n是否显示各课程成绩？(y/n): ").strip().lower() == 'y':
+                for semester in transcript['semesters']:
+                    print(f"\n{semester['semester']}:")
+                    print(f"{'课程编号':<10} {'课程名称':<20} {'学分':<5} {'成绩':<5} {'绩点':<5}")
+                    print("-" * 60)
+                    for course in semester['courses']:
+                        print(f"{course['course_id']:<10} {course['course_name']:<20} {course['credit']:<5} {course['score']:<5} {course['grade_point']:<5}")
         
         input("\n按回车键继续...")
     
@@ -553,6 +551,59 @@ class CLIGradeView:
         
         input("\n按回车键继续...")
     
+    def show_grade_distribution_analysis(self):
+        """显示成绩分布分析界面：中位数、标准差、四分位数、自定义分数段、标准分和百分位排名"""
+        self.cli_view.clear_screen()
+        self.cli_view.show_header("成绩分布分析")
+        
+        # 输入过滤条件，均可留空
+        filters = {}
+        for key, prompt in (('semester', '学期'), ('class_name', '班级'), ('course_id', '课程编号')):
+            value = input(f"请输入{prompt} (留空表示全部): ").strip()
+            if value:
+                filters[key] = value
+        
+        edges = None
+        edges_text = input("请输入分数段边界，以逗号分隔 (留空使用 0,60,70,80,90,100): ").strip()
+        if edges_text:
+            edges = parse_edges(edges_text)
+            if edges is None:
+                self.cli_view.show_message("分数段边界格式无效，应为0-100之间递增的数字，如 0,60,75,90,100", "error")
+                input("\n按回车键继续...")
+                return
+        
+        # 指定了课程时列出每个学生的标准分和百分位排名
+        include_records = 'course_id' in filters
+        result = self.grade_controller.get_grade_analytics(filters, edges, include_records=include_records)
+        if not result['success']:
+            self.cli_view.show_message(result['message'], "error")
+            input("\n按回车键继续...")
+            return
+        
+        stats = result['data']
+        if not stats['count']:
+            self.cli_view.show_message("没有符合条件的成绩记录", "info")
+            input("\n按回车键继续...")
+            return
+        
+        print(f"\n成绩记录数: {stats['count']}, 学生数: {stats['student_count']}")
+        print(f"平均分: {stats['mean']}, 学分加权平均分: {stats.get('weighted_mean', '-')}")
+        print(f"中位数: {stats['median']}, 标准差: {stats['std']}")
+        print(f"最低分: {stats['min']}, Q1: {stats['q1']}, Q3: {stats['q3']}, 最高分: {stats['max']}, 四分位距: {stats['iqr']}")
+        print(f"及格率: {stats['pass_rate']}%, 学分加权GPA: {stats.get('weighted_gpa', '-')}")
+        
+        print("\n分数段分布:")
+        for bucket in stats['buckets']:
+            print(f"{bucket['range']:<14}{bucket['count']:>6}人次 ({bucket['percent']}%)")
+        
+        if include_records:
+            print(f"\n{'学号':<12}{'姓名':<10}{'学期':<14}{'成绩':>6}{'标准分':>8}{'百分位':>8}")
+            for record in stats['records']:
+                print(f"{record['student_id']:<12}{record['student_name'] or '':<10}{record['semester']:<14}"
+                      f"{record['score']:>6}{record['z_score']:>8}{record['percentile_rank']:>8}")
+        
+        input("\n按回车键继续...")
+    
     def show_import_grades(self):
         """显示导入成绩数据界面"""
         self.cli_view.clear_screen()
@@ -621,4 +672,34 @@ class CLIGradeView:
             input("\n按回车键继续...")
         except Exception as e:
             self.cli_view.show_message(f"导入过程中出错: {str(e)}", "error")
-            input("\n按回车键继续...")
\ No newline at end of file
+            input("\n按回车键继续...")
+    
+    def show_export_transcripts(self):
+        """显示批量导出成绩单界面"""
+        self.cli_view.clear_screen()
+        self.cli_view.show_header("批量导出成绩单")
+        
+        class_name = input("请输入班级 (留空导出所有学生): ").strip()
+        output_dir = input(f"请输入输出目录 (留空使用 {transcript_export.TRANSCRIPT_EXPORT_DIR}): ").strip()
+        formats_text = input("请输入成绩单格式，以逗号分隔 (留空使用 csv,html): ").strip()
+        formats = tuple(fmt.strip() for fmt in formats_text.split(',')) if formats_text else None
+        
+        output_dir = output_dir or transcript_export.TRANSCRIPT_EXPORT_DIR
+        resume = False
+        if os.path.exists(os.path.join(output_dir, transcript_export.MANIFEST_NAME)):
+            resume = self.cli_view.show_confirmation("输出目录中已有导出清单，是否跳过已完成的学生继续导出?")
+        
+        def show_progress(processed, total):
+            if processed % 100 == 0 or processed == total:
+                print(f"\r已处理 {processed}/{total}", end='', flush=True)
+        
+        result = self.grade_controller.export_transcripts(output_dir, class_name or None, formats,
+                                                          resume=resume, progress=show_progress)
+        print()
+        
+        data = result['data']
+        if data:
+            print(f"\n共 {data['total']} 人，写入 {data['written']}，跳过 {data['skipped']}，失败 {data['failed']}，耗时 {data['elapsed']}s")
+            print(f"清单: {data['manifest']}")
+        self.cli_view.show_message(result['message'], "success" if result['success'] else "error")
+        input("\n按回车键继续...")
\ No newline at end of file
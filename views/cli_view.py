@@ -7,12 +7,10 @@ import logging
 import getpass
 from datetime import datetime
 
+from config.settings import PROFILE_DIR, PROFILE_SAMPLE_INTERVAL, PROFILE_CLI_MODE
 from views.base_view import BaseView
-from controllers.student_controller import StudentController
-from controllers.course_controller import CourseController
-from controllers.grade_controller import GradeController
-from controllers.user_controller import UserController
-from controllers.log_controller import LogController
+from controllers.lazy_controllers import LazyControllers, load_controller_class
+from utils.profiling import Profiler, PROFILE_MODES
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +27,8 @@ class CommandLineView(BaseView):
         """
         super().__init__(controllers, db)
         self.running = False
+        # 菜单操作的性能分析模式，None表示关闭
+        self.profile_mode = PROFILE_CLI_MODE if PROFILE_CLI_MODE in PROFILE_MODES else None
     
     def run(self):
         """启动命令行界面"""
@@ -57,13 +57,7 @@ class CommandLineView(BaseView):
             logger.error("数据库实例未初始化，无法创建控制器")
             return
             
-        self.controllers = {
-            'student': StudentController(self.db),
-            'course': CourseController(self.db),
-            'grade': GradeController(self.db),
-            'user': UserController(self.db),
-            'log': LogController(self.db)
-        }
+        self.controllers = LazyControllers(self.db, self.current_user)
     
     def clear_screen(self):
         """清屏"""
@@ -118,7 +112,7 @@ class CommandLineView(BaseView):
                 if not self.db:
                     logger.error("数据库实例未初始化，无法创建用户控制器")
                     return False
-                user_controller = UserController(self.db)
+                user_controller = load_controller_class('user')(self.db)
                 self.controllers['user'] = user_controller
             
             result = user_controller.login(username, password)
@@ -162,30 +156,70 @@ class CommandLineView(BaseView):
             if role in option["roles"]:
                 print(f"{option['key']}. {option['text']}")
         
+        if role == "admin":
+            print(f"P. 性能分析 (当前: {self.profile_mode or '关闭'})")
+        
         print()
-        choice = input("请选择操作 [0-7]: ").strip()
+        choice = input("请选择操作 [0-7, P]: " if role == "admin" else "请选择操作 [0-7]: ").strip()
         
         # 处理用户选择
         if choice == "1" and role in ["admin", "teacher"]:
-            self.show_student_management()
+            self.run_action("学生管理", self.show_student_management)
         elif choice == "2" and role in ["admin", "teacher"]:
-            self.show_course_management()
+            self.run_action("课程管理", self.show_course_management)
         elif choice == "3" and role in ["admin", "teacher"]:
-            self.show_grade_management()
+            self.run_action("成绩管理", self.show_grade_management)
         elif choice == "4" and role in ["admin"]:
-            self.show_user_management()
+            self.run_action("用户管理", self.show_user_management)
         elif choice == "5" and role in ["admin"]:
-            self.show_system_logs()
+            self.run_action("系统日志", self.show_system_logs)
         elif choice == "6":
-            self.show_personal_info()
+            self.run_action("个人信息", self.show_personal_info)
         elif choice == "7":
-            self.show_change_password()
+            self.run_action("修改密码", self.show_change_password)
+        elif choice.upper() == "P" and role == "admin":
+            self.toggle_profiling()
         elif choice == "0":
             self.exit()
         else:
             self.show_message("无效的选择，请重新输入！", "warning")
             input("\n按回车键继续...")
     
+    def run_action(self, name, action):
+        """
+        执行菜单操作，启用SQL统计时按操作汇总SQL执行情况
+        
+        参数:
+            name (str): 操作名称
+            action (callable): 操作函数
+        """
+        profiler = None
+        if self.profile_mode:
+            profiler = Profiler(self.profile_mode, f"cli-{name}", PROFILE_DIR, PROFILE_SAMPLE_INTERVAL)
+            if not profiler.start():
+                profiler = None
+        
+        try:
+            if self.db is None:
+                return action()
+            with self.db.query_statistics(f"菜单: {name}"):
+                return action()
+        finally:
+            if profiler is not None:
+                path = profiler.stop()
+                if path:
+                    print(f"\n性能分析结果已保存: {path}")
+    
+    def toggle_profiling(self):
+        """切换菜单操作的性能分析模式: 关闭 -> cprofile -> sample -> 关闭"""
+        modes = [None, *PROFILE_MODES]
+        self.profile_mode = modes[(modes.index(self.profile_mode) + 1) % len(modes)]
+        if self.profile_mode:
+            self.show_message(f"已开启性能分析({self.profile_mode})，之后的每个菜单操作都会保存分析结果到 {PROFILE_DIR}", "info")
+        else:
+            self.show_message("已关闭性能分析", "info")
+        input("\n按回车键继续...")
+    
     def show_header(self, title):
         """
         显示页面标题
@@ -4,25 +4,37 @@
 import os
 import sys
 import logging
-from flask import Flask, session, g, redirect, url_for
-from flask_session import Session
+from flask import Flask, session, g, request, redirect, url_for
 
 # 添加项目根目录到系统路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # 导入配置
-from config.settings import LOGGING_CONFIG, DATABASE_CONFIG
+from config.settings import (LOGGING_CONFIG, DATABASE_CONFIG, SECRET_KEY_FILE, SESSION_BACKEND,
+                             SESSION_DB_PATH, SESSION_LIFETIME, SESSION_PURGE_INTERVAL, PASSWORD_HASH_WORKERS,
+                             RATE_LIMIT_ENABLED, RATE_LIMITS, SQL_STATS_ENABLED, SQL_SLOW_QUERY_MS,
+                             SQL_EXPLAIN_SLOW_QUERIES, SQL_SLOW_QUERY_LOG, METRICS_ENABLED, METRICS_TOKEN,
+                             PROFILE_DIR, PROFILE_SAMPLE_INTERVAL)
 
-# 导入控制器
-from controllers.student_controller import StudentController
-from controllers.course_controller import CourseController
-from controllers.grade_controller import GradeController
-from controllers.user_controller import UserController
-from controllers.log_controller import LogController
-from controllers.schedule_controller import ScheduleController
+# 导入控制器集合，各控制器在请求中第一次使用时才导入
+from controllers.lazy_controllers import LazyControllers
 
 # 导入数据库
 from models.database import Database
+from models.query_stats import enable_query_stats
+
+# 导入HTTP缓存
+from web.http_cache import cached_fragment
+from web.session_backends import configure_sessions, load_secret_key
+from web.rate_limit import init_rate_limits
+from web.metrics import init_metrics
+from web.profiling import init_profiling
+
+# 导入密码哈希
+from utils.passwords import init_hash_pool
+
+# 导入后台任务执行器
+from utils.job_runner import get_job_runner
 
 # 导入Web视图
 from web.views.auth_view import auth_bp
@@ -31,10 +43,19 @@ from web.views.course_view import course_bp
 from web.views.grade_view import grade_bp
 from web.views.user_view import user_bp
 from web.views.schedule_view import schedule_bp
+from web.views.import_view import import_bp
+from web.views.job_view import job_bp
 from web.views.api_view import api_bp
 
-def create_app():
-    """创建Flask应用实例"""
+def create_app(database_config=None):
+    """
+    创建Flask应用实例
+    
+    参数:
+        database_config (dict): 数据库配置，默认使用 config.settings.DATABASE_CONFIG
+    """
+    database_config = database_config or DATABASE_CONFIG
+    
     # 创建应用实例
     app = Flask(__name__, 
                 template_folder=os.path.join(os.path.dirname(__file__), 'templates'),
@@ -42,16 +63,30 @@ def create_app():
     
     # 配置应用
     app.config.update(
-        SECRET_KEY=os.urandom(24),
-        SESSION_TYPE='filesystem',
-        SESSION_FILE_DIR=os.path.join(os.path.dirname(__file__), 'flask_session'),
+        # 密钥持久化保存，会话在重启后仍然有效并可在多个worker之间共享
+        SECRET_KEY=os.environ.get('SECRET_KEY') or load_secret_key(SECRET_KEY_FILE),
         SESSION_PERMANENT=False,
-        SESSION_USE_SIGNER=True,
-        PERMANENT_SESSION_LIFETIME=1800  # 30分钟
+        PERMANENT_SESSION_LIFETIME=SESSION_LIFETIME
     )
     
     # 初始化Session
-    Session(app)
+    configure_sessions(
+        app,
+        SESSION_BACKEND,
+        session_db=SESSION_DB_PATH,
+        purge_interval=SESSION_PURGE_INTERVAL,
+        file_dir=os.path.join(os.path.dirname(__file__), 'flask_session')
+    )
+    
+    # SQL执行统计，启用后按请求汇总并记录慢查询
+    if SQL_STATS_ENABLED:
+        enable_query_stats(SQL_SLOW_QUERY_MS, SQL_EXPLAIN_SLOW_QUERIES, SQL_SLOW_QUERY_LOG)
+    
+    # 登录时的密码哈希在进程池中计算，不占用请求线程
+    init_hash_pool(PASSWORD_HASH_WORKERS)
+    
+    # 后台任务在进程内的线程池中执行，启动时继续执行上次退出前仍在排队的任务
+    get_job_runner(database_config)
     
     # 添加上下文处理器，注入当前日期时间
     @app.context_processor
@@ -60,6 +95,9 @@ def create_app():
         from datetime import datetime
         return {'now': datetime.now()}
     
+    # 注册模板片段缓存函数
+    app.jinja_env.globals['cached_fragment'] = cached_fragment
+    
     # 注册蓝图
     app.register_blueprint(auth_bp)
     app.register_blueprint(student_bp, url_prefix='/students')
@@ -67,25 +105,36 @@ def create_app():
     app.register_blueprint(grade_bp, url_prefix='/grades')
     app.register_blueprint(user_bp, url_prefix='/users')
     app.register_blueprint(schedule_bp, url_prefix='/schedules')
+    app.register_blueprint(import_bp, url_prefix='/imports')
+    app.register_blueprint(job_bp, url_prefix='/jobs')
     app.register_blueprint(api_bp)
     
+    # 请求指标，最先注册使耗时包含限流和连接数据库
+    if METRICS_ENABLED:
+        init_metrics(app, token=METRICS_TOKEN)
+    
+    # 管理员按请求开启的性能分析
+    init_profiling(app, PROFILE_DIR, PROFILE_SAMPLE_INTERVAL)
+    
+    # 请求限流，在连接数据库之前执行
+    if RATE_LIMIT_ENABLED:
+        init_rate_limits(app, RATE_LIMITS)
+    
     # 请求前处理
     @app.before_request
     def before_request():
         """每个请求前执行的操作"""
         # 为每个请求创建新的数据库连接
-        g.db = Database(DATABASE_CONFIG)
+        g.db = Database(database_config)
         g.db.connect()
+        # 启用请求指标时即使未启用SQL统计也为语句计时，用于统计每个请求的数据库耗时
+        g.db.begin_query_scope(f"{request.method} {request.path}", timed=METRICS_ENABLED)
+        
+        # 激活请求级身份映射，请求内重复的主键查询直接从内存返回
+        g.db.identity_map.begin()
         
-        # 初始化控制器
-        g.controllers = {
-            'student': StudentController(g.db, session.get('user')),
-            'course': CourseController(g.db, session.get('user')),
-            'grade': GradeController(g.db, session.get('user')),
-            'user': UserController(g.db, session.get('user')),
-            'log': LogController(g.db, session.get('user')),
-            'schedule': ScheduleController(g.db, session.get('user'))
-        }
+        # 初始化控制器，按需创建
+        g.controllers = LazyControllers(g.db, session.get('user'))
     
     # 请求后处理
     @app.teardown_request
@@ -94,6 +143,8 @@ def create_app():
         # 关闭数据库连接
         db = g.pop('db', None)
         if db is not None:
+            db.end_query_scope()
+            db.identity_map.end()
             db.close()
     
     # 主页路由
@@ -104,9 +155,6 @@ def create_app():
             return redirect(url_for('auth.login'))
         return redirect(url_for('student.list'))
     
-    # 创建session目录
-    os.makedirs(app.config['SESSION_FILE_DIR'], exist_ok=True)
-    
     return app
 
 if __name__ == '__main__':
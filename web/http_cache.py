@@ -0,0 +1,108 @@
+"""
+HTTP缓存模块
+
+为只读页面和JSON接口提供基于数据版本的条件请求(ETag)支持：
+数据未变化时在执行任何控制器操作之前直接返回304。
+同时提供模板片段缓存，缓存与当前用户无关的渲染结果。
+"""
+import os
+import logging
+import hashlib
+import functools
+from flask import request, session, g, current_app
+from markupsafe import Markup
+
+from config.database import TABLES
+from config.settings import VERSION, FRAGMENT_CACHE_SIZE, FRAGMENT_CACHE_TTL
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# 模板片段缓存
+fragment_cache = TTLCache(FRAGMENT_CACHE_SIZE, FRAGMENT_CACHE_TTL)
+
+def _build_stamp():
+    """根据系统版本和模板、视图文件的修改时间生成构建标识，部署新模板后ETag随之改变"""
+    web_dir = os.path.dirname(os.path.abspath(__file__))
+    latest = 0
+    for directory in ('templates', 'views'):
+        for root, _, files in os.walk(os.path.join(web_dir, directory)):
+            for name in files:
+                latest = max(latest, os.path.getmtime(os.path.join(root, name)))
+    return f"{VERSION}-{int(latest)}"
+
+BUILD_STAMP = _build_stamp()
+
+def conditional_get(*entities):
+    """
+    视图装饰器，为GET请求添加基于数据版本的ETag
+    
+    ETag由视图依赖的数据实体版本、当前用户及其角色、请求URL和构建标识计算得到，
+    请求的If-None-Match与之匹配时直接返回304，不执行视图函数。
+    不包含用户表的版本：登录时间和密码哈希的更新都会改变该版本，任何用户登录都会使所有页面的缓存失效；
+    影响权限的角色已从会话中计入。
+    
+    参数:
+        entities (str): 视图依赖的数据实体(TABLES中的键)
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            # 未登录时交给视图处理跳转；有待显示的提示消息时必须重新渲染
+            if request.method != 'GET' or 'user' not in session or session.get('_flashes'):
+                return view(*args, **kwargs)
+            
+            versions = g.db.get_data_versions()
+            if versions is None:
+                return view(*args, **kwargs)
+            
+            user = session['user']
+            parts = [BUILD_STAMP, user.get('username'), user.get('role'), request.full_path]
+            parts.extend(f"{entity}:{versions.get(TABLES[entity])}" for entity in entities)
+            etag = hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+            
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            
+            response.set_etag(etag)
+            # 页面包含用户信息，只允许浏览器缓存，且每次使用前都需重新验证
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
+
+def cached_fragment(name, *vary, entities=(), caller=None):
+    """
+    模板片段缓存，在模板中通过call块使用:
+        
+        {% call cached_fragment('course-options', filters.course_id, entities=('courses',)) %}
+            ...
+        {% endcall %}
+    
+    只应用于与当前用户无关的片段，缓存键由片段名称、vary参数和依赖数据实体的版本组成。
+    
+    参数:
+        name (str): 片段名称
+        vary: 影响渲染结果的其他值
+        entities (tuple): 片段依赖的数据实体(TABLES中的键)
+        caller: Jinja传入的片段渲染函数
+    
+    返回:
+        Markup: 渲染结果
+    """
+    versions = g.db.get_data_versions() if 'db' in g else None
+    if versions is None:
+        return Markup(caller())
+    
+    key = (g.db.config['name'], name, vary)
+    version = tuple(versions.get(TABLES[entity]) for entity in entities)
+    
+    content = fragment_cache.get(key, version)
+    if content is None:
+        content = Markup(caller())
+        fragment_cache.set(key, content, version)
+    return content
\ No newline at end of file
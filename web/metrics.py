@@ -0,0 +1,239 @@
+"""
+请求指标模块
+
+为每个请求记录耗时、数据库耗时、SQL语句数、使用的控制器数和响应大小，按端点汇总，
+并通过 /metrics 以Prometheus文本格式输出。
+
+指标保存在当前进程(worker)内并分片，每个线程第一次记录请求时依次分配一个分片，之后一直使用该分片，
+每个分片独立加锁，线程数不超过分片数时请求之间没有锁竞争；
+多进程部署时每个worker输出各自的指标，由Prometheus按实例汇总。
+"""
+import time
+import bisect
+import hmac
+import logging
+import itertools
+import threading
+from flask import request, session, g, Response
+
+logger = logging.getLogger(__name__)
+
+# 默认的耗时直方图分桶(秒)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class EndpointMetrics:
+    """单个端点在一个分片内的指标"""
+    
+    __slots__ = ('latency', 'latency_sum', 'db', 'db_sum', 'count', 'queries', 'controllers', 'bytes', 'statuses')
+    
+    def __init__(self, bucket_count):
+        """
+        初始化端点指标
+        
+        参数:
+            bucket_count (int): 直方图分桶数量
+        """
+        # 最后一个分桶对应 +Inf
+        self.latency = [0] * (bucket_count + 1)
+        self.latency_sum = 0.0
+        self.db = [0] * (bucket_count + 1)
+        self.db_sum = 0.0
+        self.count = 0
+        self.queries = 0
+        self.controllers = 0
+        self.bytes = 0
+        self.statuses = {}
+    
+    def merge(self, other):
+        """累加另一个分片中同一端点的指标"""
+        self.latency = [a + b for a, b in zip(self.latency, other.latency)]
+        self.latency_sum += other.latency_sum
+        self.db = [a + b for a, b in zip(self.db, other.db)]
+        self.db_sum += other.db_sum
+        self.count += other.count
+        self.queries += other.queries
+        self.controllers += other.controllers
+        self.bytes += other.bytes
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+
+class RequestMetrics:
+    """进程内的请求指标存储"""
+    
+    def __init__(self, buckets=DEFAULT_BUCKETS, shards=16):
+        """
+        初始化指标存储
+        
+        参数:
+            buckets (tuple): 耗时直方图分桶上限(秒)，从小到大
+            shards (int): 分片数量，按线程轮流分配
+        """
+        self.buckets = tuple(buckets)
+        self.started = time.time()
+        self._shards = [(threading.Lock(), {}) for _ in range(shards)]
+        self._next_shard = itertools.count()
+        self._local = threading.local()
+    
+    def _shard(self):
+        """
+        获取当前线程使用的分片
+        
+        不能用 threading.get_ident() 取模选择分片：Linux上线程标识是按页对齐的地址，取模结果总是0。
+        """
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            # itertools.count 的 next() 在GIL下是原子操作
+            shard = self._local.shard = self._shards[next(self._next_shard) % len(self._shards)]
+        return shard
+    
+    def observe(self, endpoint, method, status, latency, db_time, queries, controllers, size):
+        """
+        记录一个请求
+        
+        参数:
+            endpoint (str): 端点名称
+            method (str): 请求方法
+            status (int): 响应状态码
+            latency (float): 请求耗时(秒)
+            db_time (float): 数据库耗时(秒)
+            queries (int): SQL语句数
+            controllers (int): 使用的控制器数
+            size (int): 响应体字节数
+        """
+        lock, endpoints = self._shard()
+        key = (endpoint, method)
+        with lock:
+            entry = endpoints.get(key)
+            if entry is None:
+                entry = endpoints[key] = EndpointMetrics(len(self.buckets))
+            entry.latency[bisect.bisect_left(self.buckets, latency)] += 1
+            entry.latency_sum += latency
+            entry.db[bisect.bisect_left(self.buckets, db_time)] += 1
+            entry.db_sum += db_time
+            entry.count += 1
+            entry.queries += queries
+            entry.controllers += controllers
+            entry.bytes += size
+            entry.statuses[status] = entry.statuses.get(status, 0) + 1
+    
+    def snapshot(self):
+        """
+        合并所有分片的指标
+        
+        返回:
+            dict: {(端点, 请求方法): EndpointMetrics}
+        """
+        merged = {}
+        for lock, endpoints in self._shards:
+            with lock:
+                for key, entry in endpoints.items():
+                    if key not in merged:
+                        merged[key] = EndpointMetrics(len(self.buckets))
+                    merged[key].merge(entry)
+        return merged
+    
+    def render(self):
+        """
+        以Prometheus文本格式输出指标
+        
+        返回:
+            str: 指标文本
+        """
+        snapshot = sorted(self.snapshot().items())
+        lines = []
+        
+        def histogram(name, help_text, counts_attr, sum_attr):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (endpoint, method), entry in snapshot:
+                labels = f'endpoint="{endpoint}",method="{method}"'
+                cumulative = 0
+                counts = getattr(entry, counts_attr)
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {entry.count}')
+                lines.append(f"{name}_sum{{{labels}}} {getattr(entry, sum_attr):.6f}")
+                lines.append(f"{name}_count{{{labels}}} {entry.count}")
+        
+        def counter(name, help_text, attr):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for (endpoint, method), entry in snapshot:
+                lines.append(f'{name}{{endpoint="{endpoint}",method="{method}"}} {getattr(entry, attr)}')
+        
+        histogram('http_request_duration_seconds', 'Request latency in seconds', 'latency', 'latency_sum')
+        histogram('http_request_db_seconds', 'Time spent in Database.execute per request', 'db', 'db_sum')
+        
+        lines.append("# HELP http_requests_total Requests by status code")
+        lines.append("# TYPE http_requests_total counter")
+        for (endpoint, method), entry in snapshot:
+            for status, count in sorted(entry.statuses.items()):
+                lines.append(f'http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}')
+        
+        counter('http_request_db_queries_total', 'SQL statements executed', 'queries')
+        counter('http_request_controllers_total', 'Controllers instantiated', 'controllers')
+        counter('http_response_size_bytes_total', 'Response body bytes', 'bytes')
+        
+        lines.append("# HELP process_start_time_seconds Start time of this worker since unix epoch")
+        lines.append("# TYPE process_start_time_seconds gauge")
+        lines.append(f"process_start_time_seconds {self.started:.3f}")
+        return '\n'.join(lines) + '\n'
+
+def init_metrics(app, token=None, buckets=DEFAULT_BUCKETS):
+    """
+    为应用注册请求指标收集和 /metrics 端点，需要在其他请求前处理函数之前调用，使耗时包含整个请求
+    
+    参数:
+        app (Flask): 应用实例
+        token (str): 抓取指标使用的Bearer令牌，未提供时只允许已登录的管理员访问
+        buckets (tuple): 耗时直方图分桶上限(秒)
+    
+    返回:
+        RequestMetrics: 指标存储
+    """
+    metrics = RequestMetrics(buckets)
+    
+    @app.before_request
+    def start_timer():
+        """记录请求开始时间"""
+        g.request_started = time.perf_counter()
+    
+    @app.after_request
+    def record_metrics(response):
+        """请求结束时记录指标"""
+        started = g.get('request_started')
+        if started is None or request.endpoint == 'metrics':
+            return response
+        
+        scope = None
+        db = g.get('db')
+        if db is not None:
+            scope = db.query_scope
+        controllers = g.get('controllers')
+        
+        metrics.observe(
+            request.endpoint or 'unmatched',
+            request.method,
+            response.status_code,
+            time.perf_counter() - started,
+            scope.time if scope else 0.0,
+            scope.count if scope else 0,
+            len(controllers) if controllers is not None else 0,
+            response.content_length or 0
+        )
+        return response
+    
+    @app.route('/metrics', endpoint='metrics')
+    def metrics_endpoint():
+        """以Prometheus文本格式输出当前worker的请求指标(仅管理员)"""
+        authorization = request.headers.get('Authorization', '')
+        authorized = bool(token) and hmac.compare_digest(authorization, f"Bearer {token}")
+        if not authorized:
+            user = session.get('user')
+            if not user or user.get('role') != 'admin':
+                return Response('forbidden\n', status=403, mimetype='text/plain')
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+    
+    app.extensions['request_metrics'] = metrics
+    return metrics
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""
+Web请求性能分析模块
+
+管理员可以为单个请求开启性能分析：
+    - 请求头 X-Profile: cprofile 或 X-Profile: sample
+    - 查询参数 ?_profile=cprofile 或 ?_profile=sample
+
+结果保存在 logs/profiles 下，文件名通过响应头 X-Profile-File 返回。
+没有请求开启分析时，每个请求只多一次请求头和查询参数的查找。
+"""
+import os
+import logging
+from flask import request, session, g
+
+from utils.profiling import Profiler, PROFILE_MODES
+
+logger = logging.getLogger(__name__)
+
+def init_profiling(app, output_dir, interval=0.005):
+    """
+    为应用注册按请求开启的性能分析，需要尽早调用，使分析范围包含其他请求前处理函数
+    
+    参数:
+        app (Flask): 应用实例
+        output_dir (str): 结果保存目录
+        interval (float): sample模式的采样间隔(秒)
+    """
+    @app.before_request
+    def start_profiler():
+        """请求开启分析且当前用户为管理员时开始分析"""
+        mode = request.headers.get('X-Profile') or request.args.get('_profile')
+        if not mode:
+            return None
+        
+        user = session.get('user')
+        if not user or user.get('role') != 'admin' or mode not in PROFILE_MODES:
+            logger.warning(f"忽略性能分析请求: 用户 {user.get('username') if user else '-'} 模式 {mode}")
+            return None
+        
+        profiler = Profiler(mode, f"{request.method} {request.path}", output_dir, interval)
+        if profiler.start():
+            g.profiler = profiler
+        return None
+    
+    @app.after_request
+    def stop_profiler(response):
+        """停止分析并在响应头中返回结果文件名"""
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            path = profiler.stop()
+            if path:
+                response.headers['X-Profile-File'] = os.path.basename(path)
+        return response
+    
+    @app.teardown_request
+    def discard_profiler(exception=None):
+        """请求异常结束时也要停止分析"""
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.stop()
\ No newline at end of file
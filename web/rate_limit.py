@@ -0,0 +1,188 @@
+"""
+请求限流模块
+
+基于令牌桶算法限制登录和API请求的频率：
+    - 登录: 按IP限流所有登录提交，防止大量登录请求消耗CPU(每次验证都要计算PBKDF2)；
+            另按 (用户名, IP) 限制验证失败的次数，减慢猜测密码，又不会让他人通过错误登录锁定该用户
+    - API: 已登录用户按用户名限流，未登录请求按IP限流
+
+令牌桶保存在分片的内存字典中，每个分片独立加锁，桶恢复满额后自动清理。
+限流状态在每个进程内独立保存，多进程部署时实际限额为配置值乘以进程数。
+"""
+import time
+import logging
+import threading
+import zlib
+from flask import request, session, jsonify, render_template, flash
+
+logger = logging.getLogger(__name__)
+
+class TokenBucketStore:
+    """分片的令牌桶存储"""
+    
+    def __init__(self, shards=16, sweep_every=1024):
+        """
+        初始化令牌桶存储
+        
+        参数:
+            shards (int): 分片数量
+            sweep_every (int): 每个分片每处理多少次请求清理一次已满的令牌桶
+        """
+        self.sweep_every = sweep_every
+        self._shards = [(threading.Lock(), {}, [0]) for _ in range(shards)]
+    
+    def _shard(self, key):
+        """获取键所在的分片"""
+        return self._shards[zlib.crc32(key.encode('utf-8')) % len(self._shards)]
+    
+    def consume(self, key, capacity, period, cost=1, dry_run=False):
+        """
+        从令牌桶中取出令牌
+        
+        参数:
+            key (str): 令牌桶键
+            capacity (int): 令牌桶容量(period内允许的请求数)
+            period (float): 令牌桶从空到满的秒数
+            cost (int): 本次请求消耗的令牌数
+            dry_run (bool): 只检查令牌是否足够，不取出令牌
+        
+        返回:
+            float: 允许请求返回0，否则返回需要等待的秒数
+        """
+        rate = capacity / period
+        now = time.monotonic()
+        lock, buckets, counter = self._shard(key)
+        
+        with lock:
+            entry = buckets.get(key)
+            if entry:
+                tokens = min(capacity, entry[0] + (now - entry[1]) * rate)
+            else:
+                tokens = capacity
+            
+            if dry_run:
+                return 0 if tokens >= cost else (cost - tokens) / rate
+            
+            if tokens >= cost:
+                tokens -= cost
+                retry_after = 0
+            else:
+                retry_after = (cost - tokens) / rate
+            
+            # 令牌桶恢复满额的时间，之后可以安全删除
+            buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+            
+            counter[0] += 1
+            if counter[0] >= self.sweep_every:
+                counter[0] = 0
+                for expired in [k for k, v in buckets.items() if v[2] <= now]:
+                    del buckets[expired]
+        
+        return retry_after
+    
+    def __len__(self):
+        """当前保存的令牌桶数量"""
+        return sum(len(buckets) for _, buckets, _ in self._shards)
+
+class RateLimiter:
+    """登录和API请求限流器"""
+    
+    def __init__(self, limits, store=None):
+        """
+        初始化限流器
+        
+        参数:
+            limits (dict): 限流配置 {规则名: (次数, 秒数)}，规则名为 login_ip, login_user, api_ip, api_user
+            store (TokenBucketStore): 令牌桶存储
+        """
+        self.limits = limits
+        self.store = store or TokenBucketStore()
+    
+    def _check(self, rule, identity, dry_run=False):
+        """按规则检查请求是否允许，返回需要等待的秒数"""
+        limit = self.limits.get(rule)
+        if not limit or not identity:
+            return 0
+        capacity, period = limit
+        return self.store.consume(f"{rule}:{identity}", capacity, period, dry_run=dry_run)
+    
+    def _login_user_identity(self):
+        """登录失败次数的限流键，同时包含用户名和IP，其他IP的错误登录不影响该用户"""
+        username = (request.form.get('username') or '').strip().lower()
+        return f"{username}@{request.remote_addr}" if username else None
+    
+    def check_login(self):
+        """检查登录请求，只限制提交登录表单的请求"""
+        if request.method != 'POST':
+            return None
+        
+        retry_after = self._check('login_ip', request.remote_addr)
+        if not retry_after:
+            # 只检查失败次数是否已达上限，验证失败后才在 record_login 中计数
+            retry_after = self._check('login_user', self._login_user_identity(), dry_run=True)
+        if not retry_after:
+            return None
+        
+        logger.warning(f"登录请求被限流: IP {request.remote_addr} 用户名 {request.form.get('username')}")
+        flash(f"登录尝试过于频繁，请 {int(retry_after) + 1} 秒后再试", 'error')
+        return render_template('login.html'), 429, {'Retry-After': str(int(retry_after) + 1)}
+    
+    def record_login(self, response):
+        """
+        登录验证失败时计入 (用户名, IP) 的失败次数
+        
+        登录成功时跳转(302)，验证失败时重新显示登录页(200)，被限流的请求(429)未经验证，不计数。
+        """
+        if request.method == 'POST' and response.status_code == 200:
+            self._check('login_user', self._login_user_identity())
+        return response
+    
+    def check_api(self):
+        """检查API请求，已登录用户按用户名限流，否则按IP限流"""
+        user = session.get('user')
+        if user:
+            retry_after = self._check('api_user', user.get('username'))
+        else:
+            retry_after = self._check('api_ip', request.remote_addr)
+        
+        if not retry_after:
+            return None
+        
+        logger.warning(f"API请求被限流: IP {request.remote_addr} 路径 {request.path}")
+        response = jsonify({
+            'success': False,
+            'message': '请求过于频繁，请稍后再试',
+            'code': 429
+        })
+        response.status_code = 429
+        response.headers['Retry-After'] = str(int(retry_after) + 1)
+        return response
+
+def init_rate_limits(app, limits):
+    """
+    为应用注册限流检查，需要在其他请求前处理函数之前调用，使被限流的请求不再连接数据库
+    
+    参数:
+        app (Flask): 应用实例
+        limits (dict): 限流配置
+    """
+    limiter = RateLimiter(limits)
+    
+    @app.before_request
+    def rate_limit():
+        """按蓝图对请求限流"""
+        if request.blueprint == 'auth' and request.endpoint == 'auth.login':
+            return limiter.check_login()
+        if request.blueprint == 'api':
+            return limiter.check_api()
+        return None
+    
+    @app.after_request
+    def record_login(response):
+        """记录登录失败次数"""
+        if request.endpoint == 'auth.login':
+            return limiter.record_login(response)
+        return response
+    
+    app.extensions['rate_limiter'] = limiter
+    return limiter
\ No newline at end of file
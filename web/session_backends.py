@@ -0,0 +1,227 @@
+"""
+Web会话后端模块
+
+提供以下会话后端，通过 config.settings.SESSION_BACKEND 选择：
+    - cookie: 签名的无状态Cookie会话(Flask内置)，服务端不保存任何数据
+    - sqlite: 会话数据保存在SQLite表中，按过期时间建立索引并定期清理
+    - filesystem: flask_session文件会话(旧方式)
+"""
+import os
+import time
+import sqlite3
+import secrets
+import logging
+from flask.sessions import SessionInterface, SessionMixin
+from flask.json.tag import TaggedJSONSerializer
+from itsdangerous import Signer, BadSignature
+from werkzeug.datastructures import CallbackDict
+
+logger = logging.getLogger(__name__)
+
+def load_secret_key(path):
+    """
+    加载持久化的密钥，不存在时生成
+    
+    多个worker同时启动时只有一个能创建密钥文件，其余读取同一文件，保证会话可在worker之间共享。
+    
+    参数:
+        path (str): 密钥文件路径
+    
+    返回:
+        bytes: 密钥
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(path, 'rb') as f:
+            key = f.read()
+        if key:
+            return key
+        # 另一个进程刚创建文件尚未写入，稍后再读
+        time.sleep(0.1)
+        with open(path, 'rb') as f:
+            return f.read()
+    
+    key = secrets.token_hex(32).encode('ascii')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    logger.info(f"已生成新的会话密钥: {path}")
+    return key
+
+class SqliteSession(CallbackDict, SessionMixin):
+    """SQLite后端的会话对象"""
+    
+    def __init__(self, initial=None, sid=None, new=False, expiry=None):
+        def on_update(self):
+            self.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.expiry = expiry
+        self.modified = False
+
+class SqliteSessionInterface(SessionInterface):
+    """将会话数据保存在SQLite表中的会话接口"""
+    
+    serializer = TaggedJSONSerializer()
+    session_class = SqliteSession
+    
+    def __init__(self, db_path, table='web_sessions', purge_interval=600, timeout=15):
+        """
+        初始化会话接口
+        
+        参数:
+            db_path (str): 会话数据库文件路径
+            table (str): 会话表名
+            purge_interval (int): 清理过期会话的间隔秒数
+            timeout (int): 数据库锁等待超时秒数
+        """
+        self.db_path = db_path
+        self.table = table
+        self.purge_interval = purge_interval
+        self.timeout = timeout
+        self._last_purge = 0
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._init_table()
+    
+    def _connect(self):
+        """建立会话数据库连接"""
+        return sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None)
+    
+    def _init_table(self):
+        """创建会话表和过期时间索引"""
+        conn = self._connect()
+        try:
+            # WAL模式下读会话不会被写会话阻塞
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                sid TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                expiry REAL NOT NULL
+            )
+            ''')
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_expiry ON {self.table} (expiry)")
+        finally:
+            conn.close()
+    
+    def _signer(self, app):
+        """获取会话ID签名器"""
+        return Signer(app.secret_key, salt='flask-sqlite-session')
+    
+    def _lifetime(self, app):
+        """会话在服务端的有效秒数"""
+        return app.permanent_session_lifetime.total_seconds()
+    
+    def _purge_expired(self, conn):
+        """按间隔清理过期会话，利用过期时间索引只扫描已过期的记录"""
+        now = time.time()
+        if now - self._last_purge < self.purge_interval:
+            return
+        self._last_purge = now
+        cursor = conn.execute(f"DELETE FROM {self.table} WHERE expiry < ?", (now,))
+        if cursor.rowcount:
+            logger.info(f"已清理 {cursor.rowcount} 个过期会话")
+    
+    def open_session(self, app, request):
+        """从Cookie中的会话ID加载会话"""
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode('ascii')
+            except BadSignature:
+                sid = None
+            
+            if sid:
+                conn = self._connect()
+                try:
+                    row = conn.execute(
+                        f"SELECT data, expiry FROM {self.table} WHERE sid = ?", (sid,)
+                    ).fetchone()
+                finally:
+                    conn.close()
+                
+                if row and row[1] > time.time():
+                    try:
+                        return self.session_class(self.serializer.loads(row[0]), sid=sid, expiry=row[1])
+                    except ValueError:
+                        logger.warning("会话数据损坏，已重新创建会话")
+        
+        return self.session_class(sid=secrets.token_urlsafe(32), new=True)
+    
+    def save_session(self, app, session, response):
+        """保存会话数据并设置Cookie"""
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        now = time.time()
+        lifetime = self._lifetime(app)
+        
+        conn = self._connect()
+        try:
+            self._purge_expired(conn)
+            
+            # 会话被清空(如退出登录)时删除记录和Cookie
+            if not session:
+                if session.modified and not session.new:
+                    conn.execute(f"DELETE FROM {self.table} WHERE sid = ?", (session.sid,))
+                    response.delete_cookie(name, domain=domain, path=path)
+                return
+            
+            if session.modified:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (sid, data, expiry) VALUES (?, ?, ?)",
+                    (session.sid, self.serializer.dumps(dict(session)), now + lifetime)
+                )
+            elif session.expiry and session.expiry - now < lifetime * 0.9:
+                # 会话未修改时只在距上次续期超过有效期的十分之一后才续期，避免每个请求都写库
+                conn.execute(f"UPDATE {self.table} SET expiry = ? WHERE sid = ?", (now + lifetime, session.sid))
+            else:
+                return
+        finally:
+            conn.close()
+        
+        expires = self.get_expiration_time(app, session)
+        response.set_cookie(
+            name,
+            self._signer(app).sign(session.sid.encode('ascii')).decode('ascii'),
+            expires=expires,
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
+        response.vary.add('Cookie')
+
+def configure_sessions(app, backend, session_db=None, purge_interval=600, file_dir=None):
+    """
+    为应用配置会话后端
+    
+    参数:
+        app (Flask): 应用实例
+        backend (str): 会话后端(cookie, sqlite, filesystem)
+        session_db (str): sqlite后端的会话数据库文件路径
+        purge_interval (int): sqlite后端清理过期会话的间隔秒数
+        file_dir (str): filesystem后端的会话文件目录
+    """
+    if backend == 'cookie':
+        # Flask内置的签名Cookie会话，无需额外配置
+        pass
+    elif backend == 'sqlite':
+        app.session_interface = SqliteSessionInterface(session_db, purge_interval=purge_interval)
+    elif backend == 'filesystem':
+        from flask_session import Session
+        
+        app.config.update(
+            SESSION_TYPE='filesystem',
+            SESSION_FILE_DIR=file_dir,
+            SESSION_USE_SIGNER=True
+        )
+        os.makedirs(file_dir, exist_ok=True)
+        Session(app)
+    else:
+        raise ValueError(f"不支持的会话后端: {backend}")
+    
+    logger.info(f"Web会话后端: {backend}")
\ No newline at end of file
@@ -5,6 +5,8 @@ import logging
 import json
 from flask import Blueprint, request, jsonify, session, g
 
+from web.http_cache import conditional_get
+
 logger = logging.getLogger(__name__)
 
 # 创建API蓝图
@@ -26,8 +28,34 @@ def check_login():
         return False
     return True
 
+# SQL执行统计API路由
+@api_bp.route('/query-stats', methods=['GET'])
+def get_query_stats():
+    """获取开销最大的SQL指纹API(仅管理员)"""
+    if not check_login():
+        return error_response('未登录', 401)
+    
+    if session['user'].get('role') != 'admin':
+        return error_response('权限不足', 403)
+    
+    query_stats = g.db.query_stats
+    if query_stats is None:
+        return error_response('SQL执行统计未启用，请设置环境变量 SQL_STATS=1 后重启', 404)
+    
+    limit = request.args.get('limit', 20, type=int)
+    order_by = request.args.get('order_by', 'total_ms')
+    if order_by not in ('total_ms', 'calls', 'avg_ms', 'max_ms', 'rows'):
+        return error_response('无效的排序字段')
+    
+    return jsonify({
+        'success': True,
+        'message': '获取SQL执行统计成功',
+        'data': query_stats.top(limit, order_by)
+    })
+
 # 课程API路由
 @api_bp.route('/courses', methods=['GET'])
+@conditional_get('courses')
 def get_courses():
     """获取课程列表API"""
     if not check_login():
@@ -55,8 +83,125 @@ def get_courses():
     
     return jsonify(result)
 
+# 排名API路由
+@api_bp.route('/rankings/course/<course_id>', methods=['GET'])
+@conditional_get('grades', 'students', 'courses')
+def get_course_ranking(course_id):
+    """获取课程成绩排名API"""
+    if not check_login():
+        return error_response('未登录', 401)
+    
+    semester = request.args.get('semester', '')
+    if not semester:
+        return error_response('缺少学期参数')
+    
+    grade_controller = g.controllers.get('grade')
+    result = grade_controller.get_course_ranking(course_id, semester)
+    
+    if not result['success']:
+        return error_response(result['message'])
+    
+    return jsonify(result)
+
+@api_bp.route('/rankings/class/<class_name>', methods=['GET'])
+@conditional_get('grades', 'students', 'courses')
+def get_class_ranking(class_name):
+    """获取班级GPA排名API"""
+    if not check_login():
+        return error_response('未登录', 401)
+    
+    semester = request.args.get('semester', '')
+    
+    grade_controller = g.controllers.get('grade')
+    result = grade_controller.get_class_ranking(class_name, semester)
+    
+    if not result['success']:
+        return error_response(result['message'])
+    
+    return jsonify(result)
+
+@api_bp.route('/grade-cube', methods=['GET'])
+@conditional_get('grades', 'students', 'courses')
+def get_grade_cube():
+    """获取成绩多维分析API，查询参数为维度过滤条件和分组维度group_by"""
+    if not check_login():
+        return error_response('未登录', 401)
+    
+    filters = {key: value for key, value in request.args.items() if key != 'group_by'}
+    
+    grade_controller = g.controllers.get('grade')
+    result = grade_controller.get_grade_cube(filters, request.args.get('group_by'))
+    
+    if not result['success']:
+        return error_response(result['message'])
+    
+    return jsonify(result)
+
+# 导入任务API路由
+@api_bp.route('/imports/<int:job_id>', methods=['GET'])
+def get_import_job(job_id):
+    """获取导入任务进度API，供导入进度页面轮询"""
+    if not check_login():
+        return error_response('未登录', 401)
+    
+    error_limit = request.args.get('error_limit', 100, type=int)
+    
+    import_controller = g.controllers.get('import')
+    result = import_controller.get_import_job(job_id, error_limit)
+    
+    if not result['success']:
+        return error_response(result['message'], 404)
+    
+    return jsonify(result)
+
+# 后台任务API路由
+@api_bp.route('/jobs', methods=['GET'])
+def get_jobs():
+    """获取最近的后台任务API"""
+    if not check_login():
+        return error_response('未登录', 401)
+    
+    limit = request.args.get('limit', 50, type=int)
+    
+    job_controller = g.controllers.get('job')
+    result = job_controller.get_jobs(limit)
+    
+    if not result['success']:
+        return error_response(result['message'])
+    
+    return jsonify(result)
+
+@api_bp.route('/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """获取后台任务的状态、进度和结果API"""
+    if not check_login():
+        return error_response('未登录', 401)
+    
+    job_controller = g.controllers.get('job')
+    result = job_controller.get_job(job_id)
+    
+    if not result['success']:
+        return error_response(result['message'], 404)
+    
+    return jsonify(result)
+
+@api_bp.route('/jobs/<int:job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """取消后台任务API"""
+    if not check_login():
+        return error_response('未登录', 401)
+    
+    job_controller = g.controllers.get('job')
+    result = job_controller.cancel_job(job_id)
+    
+    if not result['success']:
+        return error_response(result['message'])
+    
+    return jsonify(result)
+
 # 课程表API路由
 @api_bp.route('/schedules', methods=['GET'])
+@conditional_get('schedules', 'courses')
 def get_schedules():
     """获取课程表API"""
     if not check_login():
@@ -85,6 +230,7 @@ def get_schedules():
     return jsonify(result)
 
 @api_bp.route('/schedules/<int:schedule_id>', methods=['GET'])
+@conditional_get('schedules', 'courses')
 def get_schedule_item(schedule_id):
     """获取单个课程表项API"""
     if not check_login():
@@ -160,6 +306,7 @@ def delete_schedule_item(schedule_id):
     return jsonify(result)
 
 @api_bp.route('/schedules/semesters', methods=['GET'])
+@conditional_get('schedules')
 def get_semesters():
     """获取学期列表API"""
     if not check_login():
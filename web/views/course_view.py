@@ -4,6 +4,8 @@ Web课程管理视图模块
 import logging
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session, g
 
+from web.http_cache import conditional_get
+
 logger = logging.getLogger(__name__)
 
 # 创建蓝图
@@ -11,6 +13,7 @@ course_bp = Blueprint('course', __name__)
 
 @course_bp.route('/')
 @course_bp.route('/list')
+@conditional_get('courses', 'grades')
 def list():
     """课程列表页面"""
     # 检查用户是否登录
@@ -73,14 +76,22 @@ def view(course_id):
     # 获取选修该课程的学生列表
     grade_controller = g.controllers.get('grade')
     
-    # 获取当前学期（从请求参数获取，或使用默认值）
-    semester = request.args.get('semester', '当前学期')
+    # 获取当前学期（从请求参数获取，默认为课程所属学期）
+    semester = request.args.get('semester') or course.get('semester') or ''
     
     # 使用get_course_grades方法替代不存在的get_course_students方法
     student_result = grade_controller.get_course_grades(course_id, semester)
     students = student_result['data']['items'] if student_result['success'] else []
     
-    return render_template('courses/view.html', course=course, students=students)
+    # 为教师和管理员附加每个学生在本课程本学期的名次和百分位
+    ranking = {}
+    if session['user'].get('role') in ['admin', 'teacher']:
+        ranking_result = grade_controller.get_course_ranking(course_id, semester)
+        if ranking_result['success']:
+            ranking = {item['student_id']: item for item in ranking_result['data']['items']}
+    
+    return render_template('courses/view.html', course=course, students=students,
+                           semester=semester, ranking=ranking)
 
 @course_bp.route('/add', methods=['GET', 'POST'])
 def add():
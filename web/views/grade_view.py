@@ -2,10 +2,17 @@
 Web成绩管理视图模块
 """
 import logging
+import os
 import csv
 from io import StringIO, BytesIO
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session, g, send_file
 
+from web.http_cache import conditional_get
+from utils import streaming_import
+from config.settings import IMPORT_PREVIEW_DIR, IMPORT_PREVIEW_MAX_AGE
+from utils.analytics import parse_edges
+from models.grade_cube import DIMENSIONS as CUBE_DIMENSIONS
+
 logger = logging.getLogger(__name__)
 
 # 创建蓝图
@@ -198,38 +205,77 @@ def import_grades():
             return redirect(request.url)
         
         if file and file.filename.endswith('.csv'):
+            file_path = None
             try:
-                # 读取CSV文件
-                content = file.read().decode('utf-8')
-                csv_file = StringIO(content)
-                reader = csv.DictReader(csv_file)
-                grades_data = [row for row in reader]
-                
-                if not grades_data:
-                    flash('CSV文件中没有数据', 'error')
+                if request.form.get('action') == 'preview':
+                    # 预览时只计算导入计划，文件保留到确认导入或放弃，未处理的预览文件超时后清理
+                    streaming_import.purge_uploads(IMPORT_PREVIEW_DIR, IMPORT_PREVIEW_MAX_AGE)
+                    file_path = streaming_import.save_upload(file, IMPORT_PREVIEW_DIR)
+                    result = g.controllers.get('grade').plan_grade_import(streaming_import.read_csv_rows(file_path))
+                    if result['success']:
+                        return render_template('grades/import_plan.html', plan=result['data'],
+                                               message=result['message'], filename=file.filename,
+                                               upload_name=os.path.basename(file_path))
+                    streaming_import.remove_upload(file_path)
+                    flash(result['message'], 'error')
                     return redirect(request.url)
                 
-                # 导入成绩数据
-                grade_controller = g.controllers.get('grade')
-                result = grade_controller.import_grades(grades_data)
+                # 文件保存到磁盘后由后台任务分批导入，页面跳转到导入进度
+                file_path = streaming_import.save_upload(file)
+                import_controller = g.controllers.get('import')
+                result = import_controller.create_import_job('grades', file_path, file.filename)
                 
                 if result['success']:
-                    data = result['data']
-                    flash(f"成功导入 {data['success_count']} 条记录，失败 {data['failed_count']} 条记录", 'success')
-                    
-                    # 如果有失败记录，显示详情
-                    if data['failed_count'] > 0:
-                        for record in data['failed_records']:
-                            flash(f"学号: {record['data'].get('student_id', '')}, 课程: {record['data'].get('course_id', '')}, 原因: {record['reason']}", 'warning')
-                else:
-                    flash(result['message'], 'error')
+                    return redirect(url_for('imports.status', job_id=result['data']))
+                streaming_import.remove_upload(file_path)
+                flash(result['message'], 'error')
             except Exception as e:
+                if file_path:
+                    streaming_import.remove_upload(file_path)
                 flash(f'导入过程中出错: {str(e)}', 'error')
         else:
             flash('只支持CSV文件格式', 'error')
     
     return render_template('grades/import.html')
 
+@grade_bp.route('/import/apply', methods=['POST'])
+def apply_import():
+    """按预览的导入计划导入成绩，已有的成绩记录被更新"""
+    # 检查用户是否登录
+    if 'user' not in session:
+        flash('请先登录', 'error')
+        return redirect(url_for('auth.login'))
+    
+    # 检查权限
+    user_role = session['user'].get('role')
+    if user_role not in ['admin', 'teacher']:
+        flash('您没有权限执行此操作', 'error')
+        return redirect(url_for('grade.list'))
+    
+    file_path = streaming_import.get_upload_path(request.form.get('upload_name'), IMPORT_PREVIEW_DIR)
+    if file_path is None:
+        flash('导入文件不存在或已过期，请重新上传', 'error')
+        return redirect(url_for('grade.import_grades'))
+    
+    if request.form.get('action') == 'cancel':
+        streaming_import.remove_upload(file_path)
+        flash('已放弃导入', 'info')
+        return redirect(url_for('grade.import_grades'))
+    
+    try:
+        result = g.controllers.get('grade').apply_grade_import(streaming_import.read_csv_rows(file_path))
+    except Exception as e:
+        flash(f'导入过程中出错: {str(e)}', 'error')
+        return redirect(url_for('grade.import_grades'))
+    finally:
+        streaming_import.remove_upload(file_path)
+    
+    if result['success']:
+        flash(result['message'], 'success' if result['data']['failed_count'] == 0 else 'warning')
+        return redirect(url_for('grade.list'))
+    flash(result['message'], 'error')
+    return redirect(url_for('grade.import_grades'))
+
 @grade_bp.route('/export')
 def export_grades():
     """导出成绩数据"""
@@ -293,6 +339,7 @@ def export_grades():
     )
 
 @grade_bp.route('/statistics')
+@conditional_get('grades', 'students', 'courses')
 def statistics():
     """成绩统计分析"""
     # 检查用户是否登录
@@ -304,6 +351,7 @@ def statistics():
     semester = request.args.get('semester', '')
     class_name = request.args.get('class_name', '')
     course_id = request.args.get('course_id', '')
+    edges_text = request.args.get('edges', '').strip()
     
     # 构建过滤条件
     filters = {}
@@ -314,13 +362,24 @@ def statistics():
     if course_id:
         filters['course_id'] = course_id
     
+    # 自定义分数段边界
+    edges = None
+    if edges_text:
+        edges = parse_edges(edges_text)
+        if edges is None:
+            flash('分数段边界格式无效，应为0-100之间递增的数字并以逗号分隔，如 0,60,75,90,100', 'warning')
+    
     # 获取成绩统计数据
     grade_controller = g.controllers.get('grade')
     result = grade_controller.get_grade_statistics(filters)
     
     if not result['success']:
         flash(result['message'], 'error')
-        return render_template('grades/statistics.html', statistics={}, filters={})
+        return render_template('grades/statistics.html', statistics={}, analytics={}, filters={})
+    
+    # 获取成绩分布分析(中位数、标准差、四分位数、分数段)
+    analytics_result = grade_controller.get_grade_analytics(filters, edges)
+    analytics = analytics_result['data'] if analytics_result['success'] else {}
     
     # 获取学期和班级列表（用于过滤）
     course_controller = g.controllers.get('course')
@@ -336,7 +395,87 @@ def statistics():
     
     return render_template('grades/statistics.html', 
                            statistics=result['data'], 
-                           filters={'semester': semester, 'class_name': class_name, 'course_id': course_id},
+                           analytics=analytics,
+                           filters={'semester': semester, 'class_name': class_name, 'course_id': course_id,
+                                    'edges': edges_text},
                            semester_list=semester_list,
                            class_list=class_list,
-                           courses=courses)
\ No newline at end of file
+                           courses=courses)
+
+@grade_bp.route('/cube')
+@conditional_get('grades', 'students', 'courses')
+def cube():
+    """成绩多维分析"""
+    # 检查用户是否登录
+    if 'user' not in session:
+        flash('请先登录', 'error')
+        return redirect(url_for('auth.login'))
+    
+    # 获取维度过滤条件和分组维度
+    filters = {dimension: request.args.get(dimension, '') for dimension in CUBE_DIMENSIONS}
+    group_by = request.args.get('group_by', 'class_name')
+    
+    # 点击分组下钻时固定该分组的取值，并改为按下一个未筛选的维度分组
+    drill_by = next(
+        (dimension for dimension in CUBE_DIMENSIONS if dimension != group_by and not filters[dimension]),
+        group_by
+    )
+    
+    grade_controller = g.controllers.get('grade')
+    result = grade_controller.get_grade_cube(filters, group_by)
+    
+    if not result['success']:
+        flash(result['message'], 'error')
+        return render_template('grades/cube.html', cube={}, filters=filters, group_by=group_by,
+                               drill_by=drill_by, dimensions=CUBE_DIMENSIONS)
+    
+    return render_template('grades/cube.html',
+                           cube=result['data'],
+                           filters=filters,
+                           group_by=group_by,
+                           drill_by=drill_by,
+                           dimensions=CUBE_DIMENSIONS)
+
+@grade_bp.route('/transcript')
+@conditional_get('grades', 'students', 'courses')
+def transcript():
+    """学生成绩单，提供班级时批量显示全班成绩单用于打印"""
+    # 检查用户是否登录
+    if 'user' not in session:
+        flash('请先登录', 'error')
+        return redirect(url_for('auth.login'))
+    
+    user = session['user']
+    student_id = request.args.get('student_id', '').strip()
+    class_name = request.args.get('class_name', '').strip()
+    
+    # 学生只能查看自己的成绩单
+    if user.get('role') == 'student':
+        student_id = user.get('username')
+        class_name = ''
+    
+    grade_controller = g.controllers.get('grade')
+    transcripts = []
+    if class_name:
+        result = grade_controller.get_transcripts(class_name=class_name)
+        if result['success']:
+            transcripts = result['data']
+        else:
+            flash(result['message'], 'error')
+    elif student_id:
+        result = grade_controller.get_student_transcript(student_id)
+        if result['success']:
+            transcripts = [result['data']]
+        else:
+            flash(result['message'], 'error')
+    
+    # 获取班级列表（用于批量打印）
+    class_list = []
+    if user.get('role') in ['admin', 'teacher']:
+        class_result = g.controllers.get('student').get_class_list()
+        class_list = class_result['data'] if class_result['success'] else []
+    
+    return render_template('grades/transcript.html',
+                           transcripts=transcripts,
+                           filters={'student_id': student_id, 'class_name': class_name},
+                           class_list=class_list)
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+Web导入任务视图模块
+"""
+import logging
+from flask import Blueprint, render_template, redirect, url_for, flash, session, g
+
+logger = logging.getLogger(__name__)
+
+# 创建蓝图
+import_bp = Blueprint('imports', __name__)
+
+# 各导入类型的名称和重新上传的页面
+IMPORT_KIND_LABELS = {
+    'grades': ('成绩', 'grade.import_grades'),
+    'students': ('学生', 'student.import_students')
+}
+
+@import_bp.route('/')
+def list():
+    """导入任务列表页面"""
+    # 检查用户是否登录
+    if 'user' not in session:
+        flash('请先登录', 'error')
+        return redirect(url_for('auth.login'))
+    
+    import_controller = g.controllers.get('import')
+    result = import_controller.get_import_jobs()
+    
+    if not result['success']:
+        flash(result['message'], 'error')
+        return redirect(url_for('index'))
+    
+    return render_template('imports/list.html', jobs=result['data'], kinds=IMPORT_KIND_LABELS)
+
+@import_bp.route('/<int:job_id>')
+def status(job_id):
+    """导入进度页面，进行中的任务通过 /api/imports/<job_id> 轮询进度"""
+    # 检查用户是否登录
+    if 'user' not in session:
+        flash('请先登录', 'error')
+        return redirect(url_for('auth.login'))
+    
+    import_controller = g.controllers.get('import')
+    result = import_controller.get_import_job(job_id)
+    
+    if not result['success']:
+        flash(result['message'], 'error')
+        return redirect(url_for('imports.list'))
+    
+    return render_template('imports/status.html', job=result['data'], kinds=IMPORT_KIND_LABELS)
+
+@import_bp.route('/<int:job_id>/resume', methods=['POST'])
+def resume(job_id):
+    """继续执行失败或中断的导入任务"""
+    # 检查用户是否登录
+    if 'user' not in session:
+        flash('请先登录', 'error')
+        return redirect(url_for('auth.login'))
+    
+    import_controller = g.controllers.get('import')
+    result = import_controller.resume_import_job(job_id)
+    
+    flash(result['message'], 'success' if result['success'] else 'error')
+    return redirect(url_for('imports.status', job_id=job_id))
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+Web后台任务视图模块
+"""
+import logging
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, g
+
+logger = logging.getLogger(__name__)
+
+# 创建蓝图
+job_bp = Blueprint('jobs', __name__)
+
+# 可以在任务页面直接提交的任务类型及其表单参数，导入任务由上传文件的页面提交
+SUBMITTABLE_JOBS = {
+    'export_transcripts': ('class_name', 'resume'),
+    'rebuild_statistics': (),
+    'recompute_grade_points': (),
+    'clear_logs': ('days',)
+}
+
+@job_bp.route('/')
+def list():
+    """后台任务列表页面"""
+    # 检查用户是否登录
+    if 'user' not in session:
+        flash('请先登录', 'error')
+        return redirect(url_for('auth.login'))
+    
+    job_controller = g.controllers.get('job')
+    result = job_controller.get_jobs()
+    
+    if not result['success']:
+        flash(result['message'], 'error')
+        return redirect(url_for('index'))
+    
+    jobs = result['data']
+    active = any(job['status'] in ('queued', 'running') and not job['stale'] for job in jobs)
+    return render_template('jobs/list.html', jobs=jobs, active=active)
+
+@job_bp.route('/submit', methods=['POST'])
+def submit():
+    """提交后台任务"""
+    # 检查用户是否登录
+    if 'user' not in session:
+        flash('请先登录', 'error')
+        return redirect(url_for('auth.login'))
+    
+    kind = request.form.get('kind', '')
+    if kind not in SUBMITTABLE_JOBS:
+        flash('不支持的任务类型', 'error')
+        return redirect(url_for('jobs.list'))
+    
+    params = {}
+    for name in SUBMITTABLE_JOBS[kind]:
+        value = request.form.get(name, '').strip()
+        if value:
+            params[name] = value
+    if 'days' in params:
+        if not params['days'].isdigit():
+            flash('保留天数必须为非负整数', 'error')
+            return redirect(url_for('jobs.list'))
+        params['days'] = int(params['days'])
+    
+    job_controller = g.controllers.get('job')
+    result = job_controller.submit_job(kind, params)
+    
+    flash(result['message'], 'success' if result['success'] else 'error')
+    return redirect(url_for('jobs.list'))
+
+@job_bp.route('/<int:job_id>/cancel', methods=['POST'])
+def cancel(job_id):
+    """取消后台任务"""
+    # 检查用户是否登录
+    if 'user' not in session:
+        flash('请先登录', 'error')
+        return redirect(url_for('auth.login'))
+    
+    job_controller = g.controllers.get('job')
+    result = job_controller.cancel_job(job_id)
+    
+    flash(result['message'], 'success' if result['success'] else 'error')
+    return redirect(url_for('jobs.list'))
\ No newline at end of file
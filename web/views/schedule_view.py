@@ -1,14 +1,39 @@
 """
 Web课程表管理视图模块
 """
+import hmac
 import logging
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, g
+import hashlib
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, g, Response, current_app
+from itsdangerous import URLSafeSerializer, BadSignature
+
+from controllers.lazy_controllers import load_controller_class
 
 logger = logging.getLogger(__name__)
 
 # 创建蓝图
 schedule_bp = Blueprint('schedule', __name__)
 
+def _feed_serializer():
+    """获取日历订阅令牌的签名器"""
+    return URLSafeSerializer(current_app.secret_key, salt='schedule-ics-feed')
+
+def _feed_fingerprint(username):
+    """获取用户当前的订阅令牌指纹，修改或重置密码后之前签发的订阅链接失效"""
+    return g.controllers['user'].user_model.password_fingerprint(username, current_app.secret_key)
+
+def _ics_response(result):
+    """将日历导出结果转换为支持条件请求的响应"""
+    if not result['success']:
+        return Response(result['message'], status=400, mimetype='text/plain')
+    
+    data = result['data']
+    response = Response(data['content'], mimetype='text/calendar')
+    response.headers['Content-Disposition'] = f"attachment; filename={data['filename']}"
+    response.headers['Cache-Control'] = 'private, max-age=900'
+    response.set_etag(hashlib.sha1(data['version'].encode('utf-8')).hexdigest())
+    return response.make_conditional(request)
+
 @schedule_bp.route('/')
 @schedule_bp.route('/index')
 def index():
@@ -18,5 +43,53 @@ def index():
         flash('请先登录', 'error')
         return redirect(url_for('auth.login'))
     
+    # 日历订阅令牌，日历客户端无法携带登录状态，通过签名令牌识别用户；
+    # 令牌包含密码哈希的指纹，用户修改密码或管理员重置密码即可吊销已分发的订阅链接
+    username = session['user'].get('username')
+    feed_token = _feed_serializer().dumps({'u': username, 'p': _feed_fingerprint(username)})
+    
     # 课程表页面不需要直接获取数据，数据将通过AJAX API请求加载
-    return render_template('schedules/index.html')
\ No newline at end of file
+    return render_template('schedules/index.html', feed_token=feed_token)
+
+@schedule_bp.route('/export.ics')
+def export_ics():
+    """导出课程表日历文件"""
+    # 检查用户是否登录
+    if 'user' not in session:
+        flash('请先登录', 'error')
+        return redirect(url_for('auth.login'))
+    
+    semester = request.args.get('semester', '')
+    teacher = request.args.get('teacher', '')
+    student_id = request.args.get('student_id', '')
+    
+    schedule_controller = g.controllers.get('schedule')
+    result = schedule_controller.export_ics(semester, teacher or None, student_id or None)
+    
+    return _ics_response(result)
+
+@schedule_bp.route('/feed/<token>.ics')
+def feed(token):
+    """课程表日历订阅源，供日历客户端定期拉取"""
+    try:
+        payload = _feed_serializer().loads(token)
+    except BadSignature:
+        return Response('无效的订阅链接', status=403, mimetype='text/plain')
+    
+    username = payload.get('u')
+    fingerprint = _feed_fingerprint(username) if username else None
+    if not fingerprint or not hmac.compare_digest(str(payload.get('p', '')), fingerprint):
+        return Response('无效的订阅链接', status=403, mimetype='text/plain')
+    
+    user = g.controllers['user'].user_model.get_user(username)
+    if not user:
+        return Response('无效的订阅链接', status=403, mimetype='text/plain')
+    
+    semester = request.args.get('semester', '')
+    teacher = request.args.get('teacher', '')
+    
+    # 订阅链接不依赖登录会话，以链接中的用户身份创建控制器
+    schedule_controller = load_controller_class('schedule')(g.db, user)
+    result = schedule_controller.export_ics(semester, teacher or None)
+    
+    return _ics_response(result)
\ No newline at end of file
@@ -2,11 +2,13 @@
 Web学生管理视图模块
 """
 import logging
-import os
 import csv
 from io import StringIO
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session, g, jsonify, send_file
 
+from web.http_cache import conditional_get
+from utils import streaming_import
+
 logger = logging.getLogger(__name__)
 
 # 创建蓝图
@@ -14,6 +16,7 @@ student_bp = Blueprint('student', __name__)
 
 @student_bp.route('/')
 @student_bp.route('/list')
+@conditional_get('students')
 def list():
     """学生列表页面"""
     # 检查用户是否登录
@@ -234,32 +237,20 @@ def import_students():
             return redirect(request.url)
         
         if file and file.filename.endswith('.csv'):
+            file_path = None
             try:
-                # 读取CSV文件
-                content = file.read().decode('utf-8')
-                csv_file = StringIO(content)
-                reader = csv.DictReader(csv_file)
-                students_data = [row for row in reader]
-                
-                if not students_data:
-                    flash('CSV文件中没有数据', 'error')
-                    return redirect(request.url)
-                
-                # 导入学生数据
-                student_controller = g.controllers.get('student')
-                result = student_controller.import_students(students_data)
+                # 文件保存到磁盘后由后台任务分批导入，页面跳转到导入进度
+                file_path = streaming_import.save_upload(file)
+                import_controller = g.controllers.get('import')
+                result = import_controller.create_import_job('students', file_path, file.filename)
                 
                 if result['success']:
-                    data = result['data']
-                    flash(f"成功导入 {data['success_count']} 条记录，失败 {data['failed_count']} 条记录", 'success')
-                    
-                    # 如果有失败记录，显示详情
-                    if data['failed_count'] > 0:
-                        for record in data['failed_records']:
-                            flash(f"学号: {record['data'].get('student_id', '')}, 姓名: {record['data'].get('name', '')}, 原因: {record['reason']}", 'warning')
-                else:
-                    flash(result['message'], 'error')
+                    return redirect(url_for('imports.status', job_id=result['data']))
+                streaming_import.remove_upload(file_path)
+                flash(result['message'], 'error')
             except Exception as e:
+                if file_path:
+                    streaming_import.remove_upload(file_path)
                 flash(f'导入过程中出错: {str(e)}', 'error')
         else:
             flash('只支持CSV文件格式', 'error')